@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Time the system archive writer serially and with a compression thread pool.
+
+`zipfile` is the builder before the raw writer: ZipFile.write deflating every member, media
+included. `serial` is write_archive with --jobs 1 and `parallel` the same writer with a thread
+pool; both must produce identical bytes. The cases run on the real tree and on a synthetic tree
+whose icons/ holds --icon-scale copies of the shipped icons (hard-linked where possible).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import build_system_zip as archive  # noqa: E402
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def synthetic_tree(root: Path, icon_scale: int) -> None:
+    """The packaged tree at root, with icons/ repeated icon_scale times under icons/copy-N/."""
+    for item in archive.INCLUDE:
+        source = REPO_ROOT / item
+        if item == "icons" or not source.exists():
+            continue
+        if source.is_dir():
+            for path in source.rglob("*"):
+                if path.is_file():
+                    _link_or_copy(path, root / path.relative_to(REPO_ROOT))
+        else:
+            _link_or_copy(source, root / item)
+    icons = REPO_ROOT / "icons"
+    for copy in range(icon_scale):
+        for path in icons.rglob("*"):
+            if path.is_file():
+                _link_or_copy(path, root / "icons" / f"copy-{copy}" / path.relative_to(icons))
+
+
+def _zipfile_archive(path: str) -> None:
+    """The previous builder: ZipFile.write with ZIP_DEFLATED for every member."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for arcname, full in archive.archive_members():
+            zf.write(full, arcname)
+
+
+def _best(run, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _run_cases(label: str, scratch: Path, jobs: int, rounds: int) -> None:
+    serial_path = str(scratch / "serial.zip")
+    parallel_path = str(scratch / "parallel.zip")
+    members = archive.archive_members()
+    size = sum(os.path.getsize(full) for _, full in members)
+    timings = {
+        "zipfile": _best(lambda: _zipfile_archive(str(scratch / "zipfile.zip")), rounds),
+        "serial": _best(lambda: archive.write_archive(serial_path, jobs=1), rounds),
+        f"parallel ({jobs} jobs)": _best(lambda: archive.write_archive(parallel_path, jobs=jobs), rounds),
+    }
+    if Path(serial_path).read_bytes() != Path(parallel_path).read_bytes():
+        raise SystemExit(f"{label}: parallel archive differs from the serial archive")
+    print(f"{label}: {len(members)} members, {size / 1e6:.1f} MB in, {os.path.getsize(serial_path) / 1e6:.1f} MB out")
+    for name, seconds in timings.items():
+        print(f"  {name}: {seconds * 1000:.0f} ms ({timings['zipfile'] / seconds:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark serial vs thread-pool system archive compression.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker threads for the parallel case (default: CPU count).")
+    parser.add_argument("--icon-scale", type=int, default=10, help="Copies of icons/ in the synthetic tree (default: 10).")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed passes per case; the best is reported (default: 3).")
+    args = parser.parse_args()
+    if args.jobs < 1 or args.icon_scale < 1 or args.rounds < 1:
+        parser.error("--jobs, --icon-scale and --rounds must be >= 1")
+
+    with tempfile.TemporaryDirectory(prefix="laundry-archive-bench-") as scratch:
+        scratch = Path(scratch)
+        # Keep the real build's member manifest out of the benchmark.
+        archive.MEMBER_MANIFEST = str(scratch / "members.json")
+        _run_cases("real tree", scratch, args.jobs, args.rounds)
+
+        tree = scratch / "tree"
+        synthetic_tree(tree, args.icon_scale)
+        archive.ROOT = str(tree)
+        _run_cases(f"{args.icon_scale}x icons", scratch, args.jobs, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
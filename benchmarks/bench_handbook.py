@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Measure the handbook parser on a synthetic multi-book text.
+
+The text is rendered in pdftotext -layout shape from the shipped talents, assignments, spells,
+weapons, armour and gear, then concatenated --books times (later books get volume-suffixed
+names). `per-extractor` reproduces the previous behaviour: every extractor rescans the whole
+text for its own start lines, and spells find their headings and schools with a list.index and
+a walk over all group headings per spell. `single-pass` indexes the text once with
+index_handbook and feeds every extractor from it. Both must produce identical output.
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import build_compendiums as handbook  # noqa: E402
+
+SPELL_GROUPS = ("PROTECTION", "CONTROL", "DIVINATION", "ENFORCEMENT", "PERCEPTION", "DEFENCE")
+SPELLS_PER_GROUP = 4
+
+
+def _source(name: str) -> list[dict]:
+    return json.loads((REPO_ROOT / name).read_text(encoding="utf-8"))
+
+
+def _plain(text: str, limit: int = 160) -> str:
+    return html.unescape(re.sub(r"<[^>]+>", " ", text or "")).split(".")[0].strip()[:limit] or "See text."
+
+
+def _row(*cols: str) -> str:
+    return "    ".join(col for col in cols if col)
+
+
+def _book(volume: int, sources: dict[str, list[dict]]) -> list[str]:
+    suffix = "" if volume == 1 else f" Vol {volume}"
+    out = [f"THE LAUNDRY OPERATIVE'S HANDBOOK{suffix.upper()}", ""]
+
+    for item in sources["assignments"]:
+        system = item["system"]
+        attributes = system["attributes"]
+        out += [
+            _plain(system.get("description")),
+            "",
+            f"{item['name']}{suffix}",
+            "Body    Mind    Spirit",
+            f"  {attributes['body']}       {attributes['mind']}       {attributes['spirit']}",
+            f"Core Skill: {system.get('coreSkill', '')}",
+            f"Skills (10 XP): {system.get('skillOptions', '')}",
+            f"Core Talent: {system.get('coreTalent', '')}",
+            f"Talents (Choose {system.get('talentChoices', 2)}): {system.get('talents', '')}",
+            f"Equipment: {system.get('equipment', '')}",
+            "",
+        ]
+
+    for item in sources["talents"]:
+        out += [
+            f"{item['name']}{suffix}".upper(),
+            f"REQUIREMENTS: {item['system'].get('requirements') or 'None'}",
+            _plain(item["system"].get("description")),
+            "",
+        ]
+
+    spells = sources["spells"]
+    out += ["SPELLS SUMMARY", _row("SPELL", "DN", "CASTING TIME")]
+    for item in spells:
+        system = item["system"]
+        out.append(_row(f"{item['name']}{suffix}", f"{system['dn']}:{system['complexity']}", system.get("castingTime", "")))
+    out += ["COMMON SPELLS", ""]
+    for position, item in enumerate(spells):
+        system = item["system"]
+        if position % SPELLS_PER_GROUP == 0:
+            out += [SPELL_GROUPS[position // SPELLS_PER_GROUP % len(SPELL_GROUPS)], ""]
+        out += [
+            f"{item['name']}{suffix}".upper(),
+            f"DN: {system['dn']}:{system['complexity']}",
+            f"Casting Time: {system.get('castingTime', '')}",
+            f"Target: {system.get('target', '')}",
+            f"Range: {system.get('range', '')}",
+            f"Duration: {system.get('duration', '')}",
+            _plain(system.get("description")),
+            "",
+        ]
+
+    out += ["WEAPON TABLE"]
+    for position, item in enumerate(sources["weapons"]):
+        system = item["system"]
+        out.append(_row(f"{item['name']}{suffix}", f"{position % 4 + 1}:1", system.get("damage") or "S", system.get("traits", "")))
+    out += ["", _row("TYPE", "REQ.", "PREREQ.", "ARMOUR"), ""]
+    for position, item in enumerate(sources["armour"]):
+        system = item["system"]
+        out += [_row(f"{item['name']}{suffix}", f"{position % 4 + 1}:1", system.get("traits") or "None", str(system["protection"])), ""]
+    out += ["DISGUISED PISTOL", ""]
+
+    for item in sources["gear"]:
+        requisition = item["system"].get("requisition") or {}
+        out += [
+            f"{item['name']}{suffix}".upper(),
+            f"REQUISITION DN {requisition.get('dn', 2)}:{requisition.get('complexity', 1)}",
+            f"REQUIREMENTS: {requisition.get('requirements') or 'None'}",
+            _plain(item["system"].get("description")),
+            "",
+        ]
+    return out
+
+
+def handbook_lines(books: int) -> list[str]:
+    """books concatenated synthetic handbooks, as pdftotext -layout lines."""
+    sources = {
+        name: _source(f"{name}.json")
+        for name in ("assignments", "talents", "spells", "weapons", "armour", "gear")
+    }
+    return [line for volume in range(1, books + 1) for line in _book(volume, sources)]
+
+
+def _legacy_spells(lines: list[str]) -> list[dict]:
+    """extract_spells as it was before the handbook index: a list.index and group walk per spell."""
+    spell_names = handbook.extract_spell_names(lines)
+    spell_entries = []
+
+    upper_lines = [l.strip().upper() for l in lines]
+
+    current_group = ''
+    group_indices = {}
+    for i, line in enumerate(lines):
+        s = line.strip()
+        if s.isupper() and 5 < len(s) <= 40 and 'SPELLS' not in s:
+            if any(x in s for x in handbook.SPELL_GROUP_WORDS):
+                current_group = handbook.title_case(s)
+            group_indices[i] = current_group
+
+    for name in spell_names:
+        up = name.upper()
+        try:
+            idx = upper_lines.index(up)
+        except ValueError:
+            idx = None
+        dn = 4
+        complexity = 1
+        casting = ''
+        target = ''
+        range_ = ''
+        duration = ''
+        school = ''
+        if idx is not None:
+            for gi in sorted(group_indices.keys()):
+                if gi <= idx:
+                    school = group_indices[gi]
+                else:
+                    break
+
+            for j in range(idx, min(idx + 40, len(lines))):
+                l = lines[j].strip()
+                if l.startswith('DN:'):
+                    dn_part = l.split('DN:', 1)[1].strip()
+                    m = re.match(r"(\d+):(\w+)", dn_part)
+                    if m:
+                        dn = int(m.group(1))
+                        comp = m.group(2)
+                        if comp.isdigit():
+                            complexity = int(comp)
+                        else:
+                            complexity = 1
+                    else:
+                        m = re.match(r"(\d+)", dn_part)
+                        if m:
+                            dn = int(m.group(1))
+                elif l.startswith('Casting Time:'):
+                    casting = l.split('Casting Time:', 1)[1].strip()
+                elif l.startswith('Target:'):
+                    target = l.split('Target:', 1)[1].strip()
+                elif l.startswith('Range:'):
+                    range_ = l.split('Range:', 1)[1].strip()
+                elif l.startswith('Duration:'):
+                    duration = l.split('Duration:', 1)[1].strip()
+
+        spell_entries.append({
+            'name': name,
+            'system': {
+                'level': 1,
+                'dn': dn,
+                'complexity': complexity,
+                'castingTime': casting,
+                'target': target,
+                'range': range_,
+                'duration': duration,
+                'school': school,
+                'description': ''
+            }
+        })
+
+    return spell_entries
+
+
+def _per_extractor(lines: list[str]) -> dict:
+    """Every extractor with its own full scan for its start lines, as before the shared index."""
+    def scan(test) -> list[int]:
+        return [i for i, line in enumerate(lines) if test(line)]
+
+    def first(test) -> int | None:
+        return next((i for i, line in enumerate(lines) if test(line)), None)
+
+    weapon_table = handbook.extract_weapon_table(lines, {
+        "first_upper": {"WEAPON TABLE": first(lambda line: line.strip().upper() == "WEAPON TABLE")}
+    })
+    armour_table = handbook.extract_armour_table(lines, {
+        "armour_header": first(lambda line: handbook.ARMOUR_HEADER.search(line))
+    })
+    existing_names = {w["name"] for w in weapon_table} | {a["name"] for a in armour_table}
+    return {
+        "talents": handbook.extract_talents(lines, {"requirements": scan(lambda line: "REQUIREMENTS:" in line)}),
+        "assignments": handbook.extract_assignments(lines, {
+            "attribute_headers": scan(lambda line: "Body" in line and "Mind" in line and "Spirit" in line
+                                      and handbook.ATTRIBUTE_HEADER.search(line))
+        }),
+        "spells": _legacy_spells(lines),
+        "weapons": weapon_table,
+        "armour": armour_table,
+        "gear": handbook.extract_gear(lines, existing_names, {
+            "requisitions": scan(lambda line: "REQUISITION" in line and "DN" in line)
+        }),
+    }
+
+
+def _best(run, rounds: int) -> tuple[float, dict]:
+    best = float("inf")
+    result = {}
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-extractor scans vs the single-pass handbook parser.")
+    parser.add_argument("--books", default="1,10,40", help="Comma-separated numbers of concatenated books (default: 1,10,40).")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed passes; the best is reported (default: 3).")
+    args = parser.parse_args()
+    if args.rounds < 1:
+        parser.error("--rounds must be >= 1")
+    try:
+        counts = [int(value) for value in args.books.split(",") if value.strip()]
+    except ValueError:
+        parser.error("--books must be a comma-separated list of integers")
+    if not counts or min(counts) < 1:
+        parser.error("--books must list counts of at least 1")
+
+    for books in counts:
+        lines = handbook_lines(books)
+        per_extractor, expected = _best(lambda: _per_extractor(lines), args.rounds)
+        single_pass, parsed = _best(lambda: handbook.parse_handbook(lines), args.rounds)
+        if parsed != expected:
+            raise SystemExit(f"{books} books: single-pass output differs from the per-extractor output")
+        counts_text = " ".join(f"{name}={len(items)}" for name, items in parsed.items())
+        print(f"{books} book(s), {len(lines):,} lines: {counts_text}")
+        print(f"  per-extractor: {per_extractor * 1000:.1f} ms")
+        print(f"  single-pass: {single_pass * 1000:.1f} ms ({per_extractor / single_pass:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
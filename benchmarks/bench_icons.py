@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Time per-icon rendering for the item icon generator.
+`cold` clears the memoized background/gradient layers before every icon, which matches the
+per-icon work done before layer caching; `warm` reuses them as a normal generator run does.
+Each rasterizer is also timed on the grit pass alone, where the splat fields dominate.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import generate_item_icons as icons  # noqa: E402
+
+LAYER_CACHES = (
+    icons._background_base_layer,
+    icons._glow_layers,
+    icons._vignette_layers,
+)
+
+SAMPLE = [
+    ("Skill", "skill", "badge"),
+    ("Glock 17", "weapon", "pistol"),
+    ("Kevlar Vest", "armour", "vest"),
+    ("Basilisk Gun", "gear", "scanner"),
+    ("Cleaner", "assignment", "document"),
+    ("Eye of Belphegor", "spell", "rune_circle"),
+    ("Feeder", "enemy", "tentacle"),
+]
+
+
+def _clear_layer_caches() -> None:
+    for cached in LAYER_CACHES:
+        cached.cache_clear()
+
+
+def _time_icons(rounds: int, cold: bool, rasterizer: str) -> list[float]:
+    samples: list[float] = []
+    for round_index in range(rounds):
+        for name, item_type, motif in SAMPLE:
+            if cold:
+                _clear_layer_caches()
+            started = time.perf_counter()
+            icons.build_icon(f"{name} {round_index}", item_type, motif, rasterizer)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _time_grit(rounds: int, rasterizer: str) -> list[float]:
+    palette = icons._palette_for("gear")
+    samples: list[float] = []
+    for round_index in range(rounds * len(SAMPLE)):
+        canvas = icons.Image.new("RGBA", (icons.ICON_SIZE, icons.ICON_SIZE), (0, 0, 0, 0))
+        rng = random.Random(round_index)
+        started = time.perf_counter()
+        icons._add_global_grit(canvas, palette, rng, rasterizer)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label}: {len(samples)} runs, "
+        f"mean {statistics.mean(samples) * 1000:.1f} ms, "
+        f"median {statistics.median(samples) * 1000:.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-icon render time with and without layer caching.")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds over the sample motif set (default: 3).")
+    args = parser.parse_args()
+
+    rasterizers = [name for name in icons.RASTERIZERS if name != "numpy" or icons.np is not None]
+    _clear_layer_caches()
+    for rasterizer in rasterizers:
+        icons.build_icon("warmup", "gear", "gadget", rasterizer)
+
+    _report("icon cold/pil", _time_icons(args.rounds, True, "pil"))
+    for rasterizer in rasterizers:
+        _report(f"icon warm/{rasterizer}", _time_icons(args.rounds, False, rasterizer))
+    for rasterizer in rasterizers:
+        _report(f"grit/{rasterizer}", _time_grit(args.rounds, rasterizer))
+
+
+if __name__ == "__main__":
+    main()
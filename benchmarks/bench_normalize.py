@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Measure item `system` normalization throughput in documents per second.
+`handwritten` is the per-type if/elif chain the pack build used before item schemas; `compiled`
+is the generated per-type normalizer from scripts/item_schema.py. Both run over the item source
+documents repeated --scale times and must produce identical output.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import item_schema  # noqa: E402
+import rebuild_packs_from_json as rebuild  # noqa: E402
+
+ITEM_SOURCES = {
+    "skills.json": "skill",
+    "talents.json": "talent",
+    "assignments.json": "assignment",
+    "weapons.json": "weapon",
+    "armour.json": "armour",
+    "gear.json": "gear",
+    "spells.json": "spell",
+}
+
+
+def _handwritten(item_type: str, system: dict) -> dict:
+    src = system if isinstance(system, dict) else {}
+    out = dict(src)
+
+    if item_type == "skill":
+        out["attribute"] = str(out.get("attribute") or "mind").lower()
+        if out["attribute"] not in {"body", "mind", "spirit"}:
+            out["attribute"] = "mind"
+        out["training"] = max(0, int(out.get("training", 0) or 0))
+        out["focus"] = max(0, int(out.get("focus", 0) or 0))
+        out["description"] = str(out.get("description") or "").strip()
+    elif item_type == "talent":
+        out["requirements"] = str(out.get("requirements") or "None").strip() or "None"
+        out["description"] = str(out.get("description") or "").strip()
+    elif item_type == "assignment":
+        attrs = out.get("attributes", {}) if isinstance(out.get("attributes"), dict) else {}
+        raw_skill_xp = out.get("skillXP", 12)
+        raw_talent_choices = out.get("talentChoices", 2)
+        out["attributes"] = {
+            "body": int(attrs.get("body", 1) or 1),
+            "mind": int(attrs.get("mind", 1) or 1),
+            "spirit": int(attrs.get("spirit", 1) or 1)
+        }
+        out["skillXP"] = max(0, int(12 if raw_skill_xp in (None, "") else raw_skill_xp))
+        out["talentChoices"] = max(0, int(2 if raw_talent_choices in (None, "") else raw_talent_choices))
+        for key in ("description", "coreSkills", "coreSkill", "skillOptions", "coreTalent", "talents", "equipment"):
+            out[key] = str(out.get(key) or "").strip()
+    elif item_type == "weapon":
+        out["description"] = str(out.get("description") or "").strip()
+        out["damage"] = str(out.get("damage") or "1d6").strip()
+        out["range"] = str(out.get("range") or "Close").strip()
+        out["skill"] = str(out.get("skill") or "Close Combat").strip()
+        out["traits"] = str(out.get("traits") or "").strip()
+        out["ammo"] = max(0, int(out.get("ammo", 0) or 0))
+        out["ammoMax"] = max(0, int(out.get("ammoMax", 0) or 0))
+        out["areaDistance"] = max(1, int(out.get("areaDistance", 2) or 2))
+        out["equipped"] = bool(out.get("equipped", False))
+    elif item_type == "armour":
+        out["description"] = str(out.get("description") or "").strip()
+        out["protection"] = max(0, int(out.get("protection", 0) or 0))
+        out["traits"] = str(out.get("traits") or "").strip()
+        out["equipped"] = bool(out.get("equipped", False))
+    elif item_type == "gear":
+        out["description"] = str(out.get("description") or "").strip()
+        out["quantity"] = max(0, int(out.get("quantity", 1) or 1))
+        out["weight"] = max(0, int(out.get("weight", 0) or 0))
+        requisition = dict(out["requisition"]) if isinstance(out.get("requisition"), dict) else {}
+        requisition["id"] = str(requisition.get("id") or "").strip()
+        requisition["dn"] = max(2, min(6, int(requisition.get("dn", 4) or 4)))
+        requisition["complexity"] = max(1, int(requisition.get("complexity", 1) or 1))
+        requisition["requirements"] = str(requisition.get("requirements") or "").strip()
+        requisition["source"] = str(requisition.get("source") or "").strip()
+        requisition["sourcePage"] = str(requisition.get("sourcePage") or "").strip() or item_schema.extract_source_page(
+            requisition["source"],
+            fallback=str(out.get("sourcePage") or "")
+        )
+        out["requisition"] = requisition
+        if requisition["sourcePage"]:
+            out["sourcePage"] = requisition["sourcePage"]
+    elif item_type == "spell":
+        out["description"] = str(out.get("description") or "").strip()
+        out["level"] = max(1, int(out.get("level", 1) or 1))
+        out["castingTime"] = str(out.get("castingTime") or "").strip()
+        out["dn"] = max(2, min(6, int(out.get("dn", 4) or 4)))
+        out["complexity"] = max(1, int(out.get("complexity", out["level"]) or out["level"]))
+        out["target"] = str(out.get("target") or "").strip()
+        out["range"] = str(out.get("range") or "").strip()
+        out["duration"] = str(out.get("duration") or "").strip()
+        out["school"] = str(out.get("school") or "").strip()
+        if not out.get("category") and out["school"]:
+            out["category"] = f"Spells // {out['school']}"
+    return out
+
+
+def _compiled(item_type: str, system: dict) -> dict:
+    return item_schema.ITEM_NORMALIZERS[item_type](system)
+
+
+def _load_systems() -> list[tuple[str, dict]]:
+    systems: list[tuple[str, dict]] = []
+    for source_name, item_type in ITEM_SOURCES.items():
+        try:
+            entries = rebuild._read_source(source_name)
+        except FileNotFoundError:
+            continue
+        systems.extend((item_type, entry.get("system") or {}) for entry in entries if isinstance(entry, dict))
+    return systems
+
+
+def _throughput(normalize, systems: list[tuple[str, dict]], rounds: int) -> float:
+    best = 0.0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item_type, system in systems:
+            normalize(item_type, system)
+        best = max(best, len(systems) / (time.perf_counter() - started))
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark handwritten vs schema-compiled item normalization.")
+    parser.add_argument("--scale", type=int, default=50, help="Times the item corpus is repeated (default: 50).")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed passes; the best is reported (default: 5).")
+    args = parser.parse_args()
+
+    systems = _load_systems()
+    for item_type, system in systems:
+        expected = json.dumps(_handwritten(item_type, system))
+        if json.dumps(_compiled(item_type, system)) != expected:
+            raise SystemExit(f"compiled {item_type} normalizer diverges from the handwritten chain")
+    systems = systems * args.scale
+
+    handwritten = _throughput(_handwritten, systems, args.rounds)
+    compiled = _throughput(_compiled, systems, args.rounds)
+    print(f"documents: {len(systems)}")
+    print(f"handwritten: {handwritten:,.0f} docs/s")
+    print(f"compiled: {compiled:,.0f} docs/s ({compiled / handwritten:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
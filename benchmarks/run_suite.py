@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Time every build stage and the public builders behind it, and compare against a stored baseline.
+
+Stages are whole script runs (wall time, including interpreter start-up); builders are timed
+in-process. Corpus-dependent cases run once per --scales entry against a synthetic tree from
+scale_corpus.py; icon, archive and handbook cases do not depend on the corpus and run once.
+Every case gets --warmup discarded runs and --repeat timed runs.
+
+Results are written as JSON. Timings only mean something on the machine that produced them, so the
+baseline lives in .cache/ next to the results: record one with --save-baseline, then later runs
+fail when a case's median is more than --threshold percent (and --noise-floor seconds) slower.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = REPO_ROOT / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+import scale_corpus  # noqa: E402
+
+RESULTS_DIR = REPO_ROOT / ".cache" / "benchmarks"
+RESULTS = RESULTS_DIR / "results.json"
+BASELINE = RESULTS_DIR / "baseline.json"
+RESULTS_VERSION = 1
+DEFAULT_SCALES = (1, 10)
+ICON_CASES = ("icons.build_icon", "icons._encode_icon")
+HANDBOOK_EXTRACTORS = (
+    "extract_talents",
+    "extract_assignments",
+    "extract_spell_names",
+    "extract_spells",
+    "extract_weapon_table",
+    "extract_armour_table",
+)
+
+
+def _measure(run, warmup: int, repeat: int) -> dict:
+    """Time run() repeat times after warmup untimed calls."""
+    samples: list[float] = []
+    for index in range(warmup + repeat):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        if index >= warmup:
+            samples.append(elapsed)
+    return {
+        "runs": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "max": max(samples),
+    }
+
+
+def _script_stage(script: str, *args: str, env: dict[str, str] | None = None):
+    command = [sys.executable, str(SCRIPTS / script), *args]
+
+    def run() -> None:
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env={**os.environ, **(env or {})})
+    return run
+
+
+def _corpus_stage_cases(root: Path, slow: bool) -> dict:
+    env = {"LAUNDRY_RPG_ROOT": str(root)}
+    cases = {
+        "stage.rebuild_packs_from_json": _script_stage("rebuild_packs_from_json.py", env=env),
+        "stage.rebuild_packs_from_json --incremental": _script_stage("rebuild_packs_from_json.py", "--incremental", env=env),
+        "stage.stage_extracted_sources": _script_stage("stage_extracted_sources.py", env=env),
+    }
+    if slow:
+        cases["stage.generate_item_icons"] = _script_stage("generate_item_icons.py", env=env)
+    return cases
+
+
+def _measure_builders(warmup: int, repeat: int) -> dict[str, dict]:
+    """In-process builder timings for the corpus LAUNDRY_RPG_ROOT points at (run in a child process)."""
+    import rebuild_packs_from_json as rebuild
+    import stage_extracted_sources as stage
+
+    def uncached(builder):
+        # Builders parse their sources; clear the parse cache so every run includes it.
+        def run():
+            rebuild._SOURCE_CACHE.clear()
+            return builder()
+        return run
+
+    results: dict[str, dict] = {}
+    for name in (
+        "build_talents",
+        "build_assignments",
+        "build_weapons",
+        "build_armour",
+        "build_skills",
+        "build_spells",
+        "build_gear",
+        "build_enemies",
+        "build_servant_npcs",
+        "build_servant_tables",
+        "build_rules_journal",
+        "build_servant_journal",
+        "build_vashnotik_journal",
+        "build_macros",
+    ):
+        results[f"rebuild.{name}"] = _measure(uncached(getattr(rebuild, name)), warmup, repeat)
+
+    items = [
+        item
+        for name in ("skills.json", "talents.json", "assignments.json", "weapons.json", "armour.json", "gear.json", "spells.json")
+        for item in rebuild._read_source(name)
+    ]
+    results["rebuild._normalize_item"] = _measure(lambda: [rebuild._normalize_item(item) for item in items], warmup, repeat)
+
+    collections: dict[str, list[dict]] = {}
+    for name in rebuild._collection_order(rebuild.COLLECTION_BUILDERS):
+        upstream = {dep: collections[dep] for dep in rebuild.COLLECTION_DEPENDENCIES[name][1]}
+        collections[name] = rebuild.COLLECTION_BUILDERS[name](upstream)
+    item_collections = [collections[name] for name in ("skills", "talents", "assignments", "weapons", "armour", "spells", "gear")]
+    results["rebuild.build_all_items"] = _measure(lambda: rebuild.build_all_items(item_collections), warmup, repeat)
+    packs = {filename: collections[collection] for filename, collection in rebuild.PACK_COLLECTIONS.items()}
+    results["rebuild.build_search_index"] = _measure(lambda: rebuild.build_search_index(packs), warmup, repeat)
+
+    for filename in stage.TARGET_FILES:
+        path = stage.ROOT / filename
+        if path.exists():
+            entries = stage._read_json(path)
+            results[f"stage._normalize[{filename}]"] = _measure(lambda: stage._normalize(filename, entries), warmup, repeat)
+    return results
+
+
+def _fixed_cases(scratch: Path, handbook_text: Path | None, wanted) -> tuple[dict, list[str]]:
+    """Cases that do not depend on the corpus and that wanted(name) selects, plus notes on any skipped.
+
+    Each group's modules are only imported when one of its cases is selected, so e.g. a rebuild-only
+    run does not need Pillow.
+    """
+    notes: list[str] = []
+    cases: dict = {}
+
+    if any(wanted(name) for name in ICON_CASES):
+        import generate_item_icons as icons
+        from bench_icons import SAMPLE
+
+        probe = icons.build_icon("Benchmark Probe", "gear", "gadget")
+        cases["icons.build_icon"] = lambda: [icons.build_icon(name, item_type, motif) for name, item_type, motif in SAMPLE]
+        cases["icons._encode_icon"] = lambda: icons._encode_icon(probe)
+
+    if wanted("zip.write_archive"):
+        import build_system_zip
+
+        def write_archive() -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_system_zip.write_archive(str(scratch / "system.zip"))
+        cases["zip.write_archive"] = write_archive
+
+    if any(wanted(f"handbook.{name}") for name in (*HANDBOOK_EXTRACTORS, "extract_gear", "parse_handbook")):
+        import build_compendiums
+
+        text_path = handbook_text or build_compendiums.TXT_PATH
+        if text_path.is_file():
+            lines = text_path.read_text(encoding="utf-8", errors="ignore").splitlines()
+            for name in HANDBOOK_EXTRACTORS:
+                extractor = getattr(build_compendiums, name)
+                cases[f"handbook.{name}"] = lambda extractor=extractor: extractor(lines)
+            names = {
+                row["name"]
+                for row in [*build_compendiums.extract_weapon_table(lines), *build_compendiums.extract_armour_table(lines)]
+            }
+            cases["handbook.extract_gear"] = lambda: build_compendiums.extract_gear(lines, existing_names=names)
+            cases["handbook.parse_handbook"] = lambda: build_compendiums.parse_handbook(lines)
+        else:
+            notes.append(f"handbook extractors skipped: {text_path} not found (pass --handbook-text)")
+    return cases, notes
+
+
+def _compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float, noise_floor: float) -> list[str]:
+    regressions: list[str] = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"{key}: {current['median'] * 1000:.1f} ms (new)")
+            continue
+        delta = current["median"] - previous["median"]
+        change = delta / previous["median"] * 100 if previous["median"] else 0.0
+        regressed = change > threshold and delta > noise_floor
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{key}: {current['median'] * 1000:.1f} ms (baseline {previous['median'] * 1000:.1f} ms, {change:+.1f}%){marker}")
+        if regressed:
+            regressions.append(f"{key}: {change:+.1f}%")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the build benchmark suite and compare against a baseline.")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)), help="Comma-separated corpus multiples (default: 1,10).")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before each case (default: 1).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (default: 5).")
+    parser.add_argument("--only", help="Only run cases whose name contains this text.")
+    parser.add_argument("--slow", action="store_true", help="Also time the full icon generator stage per scale.")
+    parser.add_argument("--handbook-text", type=Path, help="pdftotext output of the handbook for the extractor cases.")
+    parser.add_argument("--output", type=Path, default=RESULTS, help=f"Results JSON (default: {RESULTS.relative_to(REPO_ROOT)}).")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help=f"Baseline JSON (default: {BASELINE.relative_to(REPO_ROOT)}).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed median slowdown in percent (default: 20).")
+    parser.add_argument("--noise-floor", type=float, default=0.002, help="Ignore slowdowns smaller than this many seconds (default: 0.002).")
+    parser.add_argument("--measure-builders", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.warmup < 0 or args.repeat < 1:
+        parser.error("--warmup must be >= 0 and --repeat >= 1")
+
+    if args.measure_builders:
+        json.dump(_measure_builders(args.warmup, args.repeat), sys.stdout)
+        return
+
+    try:
+        scales = [int(value) for value in args.scales.split(",") if value.strip()]
+    except ValueError:
+        parser.error("--scales must be a comma-separated list of integers")
+    if not scales or min(scales) < 1:
+        parser.error("--scales must list multiples of at least 1")
+
+    def wanted(name: str) -> bool:
+        return args.only is None or args.only in name
+
+    results: dict[str, dict] = {}
+    scratch = Path(tempfile.mkdtemp(prefix="laundry-bench-"))
+    try:
+        for scale in scales:
+            root = scratch / f"{scale}x"
+            scale_corpus.generate_corpus(root, scale)
+            for name, run in _corpus_stage_cases(root, args.slow).items():
+                if wanted(name):
+                    results[f"{name}@{scale}x"] = _measure(run, args.warmup, args.repeat)
+                    print(f"{name}@{scale}x: {results[f'{name}@{scale}x']['median'] * 1000:.1f} ms", flush=True)
+            child = subprocess.run(
+                [sys.executable, __file__, "--measure-builders", "--warmup", str(args.warmup), "--repeat", str(args.repeat)],
+                check=True,
+                capture_output=True,
+                text=True,
+                env={**os.environ, "LAUNDRY_RPG_ROOT": str(root)}
+            )
+            for name, stats in json.loads(child.stdout).items():
+                if wanted(name):
+                    results[f"{name}@{scale}x"] = stats
+            shutil.rmtree(root)
+
+        cases, notes = _fixed_cases(scratch, args.handbook_text, wanted)
+        for name, run in cases.items():
+            if wanted(name):
+                results[name] = _measure(run, args.warmup, args.repeat)
+        for note in notes:
+            print(note)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    payload = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scales": scales,
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "results": dict(sorted(results.items())),
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    print(f"wrote {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"saved baseline {args.baseline}")
+        return
+    if not args.baseline.is_file():
+        print(f"no baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("version") != RESULTS_VERSION:
+        raise SystemExit(f"{args.baseline}: unsupported results version")
+    regressions = _compare(payload["results"], baseline["results"], args.threshold, args.noise_floor)
+    if regressions:
+        raise SystemExit(f"{len(regressions)} case(s) regressed more than {args.threshold:g}%:\n - " + "\n - ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
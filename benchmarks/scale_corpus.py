@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic content tree at a multiple of the shipped data for stress-testing the pipeline.
+Every generated record starts from a shipped record of the same kind (so numbers, enums and markup
+stay schema-valid) and gets a fresh unique name plus prose drawn from that source's own vocabulary,
+keeping each text field's length distribution. Cross references are regenerated against the new
+corpus: assignment talents name generated talents and issued equipment mixes generated gear with
+new kit. Output depends only on --scale and --seed.
+
+Point the pipeline scripts at the result with LAUNDRY_RPG_ROOT:
+    LAUNDRY_RPG_ROOT=/tmp/corpus-10x python3 scripts/rebuild_packs_from_json.py
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import re
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import rebuild_packs_from_json as rebuild  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCALES = (1, 10, 100, 1000)
+# Written into every generated tree; only directories carrying it are ever deleted and regenerated.
+CORPUS_MARKER = ".scale-corpus"
+
+# Sources regenerated at --scale times their shipped size -> fields rewritten with generated prose.
+# A field path is dotted keys; "[]" maps over a list.
+SCALED_SOURCES = {
+    "talents.json": ("system.description", "system.requirements"),
+    "gear.json": ("system.description", "system.requisition.requirements"),
+    "spells.json": ("system.description", "system.target", "system.duration"),
+    "enemies.json": ("quickActions[].name",),
+    "servant-tables.json": ("description", "results[].text"),
+    "gm.json": ("content",),
+    "servant.json": ("content",),
+    "vashnotik.json": ("content",),
+    # Last: assignments reference the generated talents and gear.
+    "assignments.json": ("system.description",),
+}
+# Sources the build needs but that stay at their shipped size.
+COPIED_SOURCES = ("skills.json", "weapons.json", "armour.json", "macros.json", "servant-npcs.json")
+SUPPORT_FILES = ("system.json", "template.json")
+
+WORD_PATTERN = re.compile(r"[^\W\d_]{2,}")
+MARKUP_PATTERN = re.compile(r"(<[^>]*>)")
+
+
+def _read_json(path: Path):
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _write_json(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
+
+
+def _field_values(record, path: str) -> list[str]:
+    head, _, rest = path.partition(".")
+    key = head.removesuffix("[]")
+    value = record.get(key) if isinstance(record, dict) else None
+    if head.endswith("[]"):
+        items = value if isinstance(value, list) else []
+        return [found for item in items for found in (_field_values(item, rest) if rest else [item])]
+    if rest:
+        return _field_values(value, rest)
+    return [value] if isinstance(value, str) else []
+
+
+def _rewrite_field(record, path: str, rewrite) -> None:
+    head, _, rest = path.partition(".")
+    key = head.removesuffix("[]")
+    if not isinstance(record, dict) or key not in record:
+        return
+    if head.endswith("[]"):
+        items = record[key] if isinstance(record[key], list) else []
+        for index, item in enumerate(items):
+            if rest:
+                _rewrite_field(item, rest, rewrite)
+            elif isinstance(item, str):
+                items[index] = rewrite(item)
+    elif rest:
+        _rewrite_field(record[key], rest, rewrite)
+    elif isinstance(record[key], str):
+        record[key] = rewrite(record[key])
+
+
+def _words(values) -> list[str]:
+    return [word for value in values for word in WORD_PATTERN.findall(MARKUP_PATTERN.sub(" ", str(value or "")))]
+
+
+def _sentence_text(rng: random.Random, vocabulary: list[str], length: int) -> str:
+    """Sentences of vocabulary words, stopping at the first word that reaches length characters."""
+    words: list[str] = []
+    total = -1
+    sentence_left = 0
+    while total < length:
+        # Words are drawn in batches sized for the remaining length; rng.choice per word dominates otherwise.
+        for word in rng.choices(vocabulary, k=(length - total) // 6 + 1):
+            word = word.lower()
+            if sentence_left == 0:
+                if words:
+                    words[-1] += "."
+                word = word[:1].upper() + word[1:]
+                sentence_left = rng.randint(4, 16)
+            words.append(word)
+            total += len(word) + 1
+            sentence_left -= 1
+            if total >= length:
+                break
+    return " ".join(words) + "."
+
+
+def _prose(rng: random.Random, vocabulary: list[str], template: str) -> str:
+    """Replace the text of template (between any tags) with generated text of the same lengths."""
+    parts = MARKUP_PATTERN.split(template)
+    out: list[str] = []
+    for part in parts:
+        if part.startswith("<") or not part.strip():
+            out.append(part)
+            continue
+        lead = part[:len(part) - len(part.lstrip())]
+        trail = part[len(part.rstrip()):]
+        out.append(lead + _sentence_text(rng, vocabulary, len(part.strip())) + trail)
+    return "".join(out)
+
+
+class _Names:
+    """Unique title-case names built from a source's name vocabulary, matching shipped word counts."""
+
+    def __init__(self, rng: random.Random, vocabulary: list[str]):
+        self.rng = rng
+        self.vocabulary = vocabulary
+        self.seen: set[str] = set()
+
+    def make(self, template: str, lower: bool = False) -> str:
+        count = max(1, len(_words([template])))
+        for attempt in range(64):
+            # Repeated collisions mean the vocabulary is exhausted at this length; add words.
+            words = [self.rng.choice(self.vocabulary) for _ in range(count + attempt // 8)]
+            name = " ".join(word.lower() if lower else word[:1].upper() + word[1:].lower() for word in words)
+            if rebuild._slugify(name) and name.casefold() not in self.seen:
+                self.seen.add(name.casefold())
+                return name
+        raise RuntimeError(f"could not find a unique name like {template!r}")
+
+
+def _scaled_records(
+    filename: str,
+    records: list[dict],
+    scale: int,
+    seed: int,
+    generated: dict[str, list[dict]]
+) -> list[dict]:
+    rng = random.Random(f"{seed}:{filename}")
+    prose_fields = SCALED_SOURCES[filename]
+    prose_vocabulary = _words(value for record in records for path in prose_fields for value in _field_values(record, path))
+    names = _Names(rng, _words(record.get("name") for record in records))
+    talents = [record["name"] for record in generated.get("talents.json", [])]
+    gear = [record["name"] for record in generated.get("gear.json", [])]
+    # Issued equipment: the shipped share of entries naming real gear, the rest drawn from a kit
+    # list that grows with the corpus, so assignments share kit the way shipped ones do.
+    shipped_kit = [item for record in records for item in rebuild._parse_csv(record.get("system", {}).get("equipment"))]
+    shipped_gear = {str(record.get("name") or "").casefold() for record in _read_json(REPO_ROOT / "gear.json")}
+    gear_share = sum(item.casefold() in shipped_gear for item in shipped_kit) / len(shipped_kit) if shipped_kit else 0.0
+    kit_names = _Names(rng, _words(shipped_kit) or ["kit"])
+    kit = [kit_names.make(item, lower=True) for item in sorted(set(shipped_kit), key=str.casefold) for _ in range(scale)]
+
+    out: list[dict] = []
+    for index in range(len(records) * scale):
+        template = records[index % len(records)]
+        record = copy.deepcopy(template)
+        name = names.make(str(template.get("name") or ""))
+        record["name"] = name
+        for path in prose_fields:
+            _rewrite_field(record, path, lambda value: _prose(rng, prose_vocabulary, value))
+        system = record.get("system") if isinstance(record.get("system"), dict) else {}
+
+        if "id" in record:
+            record["id"] = rebuild._slugify(name)
+        if isinstance(system.get("requisition"), dict):
+            system["requisition"]["id"] = rebuild._slugify(name)
+        for key in ("searchKeywords", "tags"):
+            for container in (record, system):
+                if isinstance(container.get(key), list):
+                    container[key] = [name if value == template.get("name") else value for value in container[key]]
+        if "img" in record and filename in {"talents.json", "gear.json", "spells.json", "assignments.json"}:
+            record["img"] = ""
+
+        if filename == "assignments.json":
+            wanted = len(rebuild._parse_csv(system.get("coreTalent"))) + len(rebuild._parse_csv(system.get("talents")))
+            picked = rng.sample(talents, min(wanted, len(talents)))
+            system["coreTalent"] = picked[0] if picked else ""
+            system["talents"] = ", ".join(picked[1:])
+            equipment = []
+            for item in rebuild._parse_csv(system.get("equipment")):
+                pool = gear if gear and rng.random() < gear_share else kit
+                equipment.append(rng.choice(pool))
+            system["equipment"] = ", ".join(dict.fromkeys(equipment))
+        out.append(record)
+    return out
+
+
+def generate_corpus(out_dir: Path, scale: int, seed: int = 0) -> dict[str, int]:
+    """Write a scaled content tree to out_dir and return record counts per source file.
+
+    out_dir must be missing, empty, or a tree this function generated earlier (it holds
+    CORPUS_MARKER); anything else raises FileExistsError instead of being deleted.
+    """
+    if out_dir.exists():
+        if not out_dir.is_dir():
+            raise FileExistsError(f"{out_dir} exists and is not a directory")
+        if (out_dir / CORPUS_MARKER).is_file():
+            shutil.rmtree(out_dir)
+        elif any(out_dir.iterdir()):
+            raise FileExistsError(f"{out_dir} is not empty and was not generated by scale_corpus.py ({CORPUS_MARKER} missing)")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / CORPUS_MARKER).write_text(f"scale={scale} seed={seed}\n", encoding="utf-8")
+    (out_dir / "packs").mkdir()
+    for filename in SUPPORT_FILES + COPIED_SOURCES:
+        shutil.copyfile(REPO_ROOT / filename, out_dir / filename)
+
+    counts: dict[str, int] = {filename: len(_read_json(REPO_ROOT / filename)) for filename in COPIED_SOURCES}
+    generated: dict[str, list[dict]] = {}
+    for filename in SCALED_SOURCES:
+        records = _read_json(REPO_ROOT / filename)
+        generated[filename] = _scaled_records(filename, records, scale, seed, generated)
+        _write_json(out_dir / filename, generated[filename])
+        counts[filename] = len(generated[filename])
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic content tree at a multiple of the shipped data.")
+    parser.add_argument("out", type=Path, help="Scratch root to create (or regenerate, if an earlier run wrote it).")
+    parser.add_argument("--scale", type=int, default=10, help=f"Multiple of the shipped record counts, e.g. {', '.join(map(str, SCALES))} (default: 10).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for names and prose (default: 0).")
+    args = parser.parse_args()
+    if args.scale < 1:
+        parser.error("--scale must be at least 1")
+    if args.out.resolve() == REPO_ROOT:
+        parser.error("refusing to overwrite the repository root")
+
+    try:
+        counts = generate_corpus(args.out, args.scale, args.seed)
+    except FileExistsError as err:
+        parser.error(str(err))
+    for filename, count in counts.items():
+        print(f"{filename}: {count}")
+    print(f"corpus written to {args.out} ({sum(counts.values())} records)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Update an installed system directory from a delta package written by build_system_zip.py --delta-from.
+
+The new tree is assembled next to the target: unchanged files are hard-linked (or copied) from the
+old tree, added and changed files are extracted from the delta, deleted files are left out. Every
+file is then checked against the delta manifest's SHA-256 before the new tree replaces the old one,
+so a failed or mismatched update leaves the installed system untouched.
+
+Foundry migrates packs/<name>.db into a LevelDB directory packs/<name>/ when it loads the system.
+Files in a packs/<name>/ directory the manifest ships nothing in are that local state: they are not
+verified, and they are carried into the new tree while packs/<name>.db is unchanged (dropped when it
+changed or was deleted, so Foundry migrates the new pack instead of loading the stale directory).
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import zipfile
+
+DELTA_MANIFEST = "delta-manifest.json"
+DELTA_FORMAT = 1
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _safe_path(root, arcname):
+    """Filesystem path of arcname under root, refusing absolute paths and parent references."""
+    parts = arcname.split("/")
+    if arcname.startswith("/") or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"unsafe path in delta: {arcname!r}")
+    return os.path.join(root, *parts)
+
+
+def read_delta_manifest(archive):
+    try:
+        manifest = json.loads(archive.read(DELTA_MANIFEST).decode("utf-8"))
+    except KeyError:
+        raise ValueError(f"not a delta package: {DELTA_MANIFEST} is missing") from None
+    if manifest.get("format") != DELTA_FORMAT:
+        raise ValueError(f"unsupported delta format {manifest.get('format')!r}")
+    return manifest
+
+
+def tree_files(root):
+    """Relative '/'-separated paths of every file under root."""
+    out = set()
+    for current, _, files in os.walk(root):
+        for name in files:
+            out.add(os.path.relpath(os.path.join(current, name), root).replace(os.sep, "/"))
+    return out
+
+
+def local_leveldb_files(root, files):
+    """Files under root in packs/<name>/ LevelDB directories the manifest's {path: sha256} ships nothing in."""
+    shipped_dirs = {name.split("/")[1] for name in files if name.startswith("packs/") and name.count("/") >= 2}
+    return {
+        name for name in tree_files(root)
+        if name.startswith("packs/") and name.count("/") >= 2 and name.split("/")[1] not in shipped_dirs
+    }
+
+
+def verify_tree(root, files):
+    """Problems found comparing the tree at root with the manifest's {path: sha256}."""
+    problems = []
+    present = tree_files(root)
+    for name in sorted(present - set(files) - local_leveldb_files(root, files)):
+        problems.append(f"{name}: not in manifest")
+    for name, expected in sorted(files.items()):
+        if name not in present:
+            problems.append(f"{name}: missing")
+        elif _sha256_file(_safe_path(root, name)) != expected:
+            problems.append(f"{name}: sha256 mismatch")
+    return problems
+
+
+def _link_or_copy(source, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def apply_delta(old_root, delta_path, out_root=None):
+    """Build the new tree from old_root and the delta at delta_path into out_root (default: replace old_root)."""
+    old_root = os.path.abspath(old_root)
+    target = os.path.abspath(out_root or old_root)
+    staging = f"{target}.delta-tmp"
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+
+    with zipfile.ZipFile(delta_path) as archive:
+        manifest = read_delta_manifest(archive)
+        files = manifest["files"]
+        shipped = set(manifest["added"]) | set(manifest["changed"])
+        missing = sorted(shipped - set(archive.namelist()))
+        if missing:
+            raise ValueError(f"delta is missing shipped files: {', '.join(missing)}")
+        os.makedirs(staging)
+        try:
+            for name in sorted(files):
+                destination = _safe_path(staging, name)
+                if name in shipped:
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    with archive.open(name) as source, open(destination, "wb") as handle:
+                        shutil.copyfileobj(source, handle)
+                    continue
+                source = _safe_path(old_root, name)
+                if not os.path.isfile(source):
+                    raise ValueError(f"{name}: expected in the old tree but missing")
+                _link_or_copy(source, destination)
+            if os.path.isdir(old_root):
+                for name in sorted(local_leveldb_files(old_root, files)):
+                    pack = f"packs/{name.split('/')[1]}.db"
+                    if pack in files and pack not in shipped:
+                        _link_or_copy(_safe_path(old_root, name), _safe_path(staging, name))
+
+            problems = verify_tree(staging, files)
+            if problems:
+                raise ValueError("delta result does not match its manifest:\n  " + "\n  ".join(problems))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    if os.path.exists(target):
+        retired = f"{target}.delta-old"
+        if os.path.exists(retired):
+            shutil.rmtree(retired)
+        os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired)
+    else:
+        os.replace(staging, target)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a system delta package to an installed system directory.")
+    parser.add_argument("old_tree", help="Installed system directory (the previous release).")
+    parser.add_argument("delta", help="Delta package written by build_system_zip.py --delta-from.")
+    parser.add_argument("--out", help="Write the updated tree here instead of replacing old_tree.")
+    parser.add_argument("--verify-only", action="store_true", help="Only check old_tree against the delta's manifest.")
+    args = parser.parse_args()
+
+    if args.verify_only:
+        with zipfile.ZipFile(args.delta) as archive:
+            manifest = read_delta_manifest(archive)
+        problems = verify_tree(args.old_tree, manifest["files"])
+        for problem in problems:
+            print(problem)
+        sys.exit(1 if problems else 0)
+
+    started = time.perf_counter()
+    try:
+        manifest = apply_delta(args.old_tree, args.delta, args.out)
+    except (OSError, ValueError, zipfile.BadZipFile) as err:
+        sys.exit(f"apply_system_delta: {err}")
+    print(
+        f"Updated {args.out or args.old_tree}: {len(manifest['added'])} added, {len(manifest['changed'])} changed, "
+        f"{len(manifest['deleted'])} deleted, {len(manifest['files'])} files verified in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import re
+import os
 import json
+import hashlib
+import argparse
 import subprocess
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 ROOT = Path('/mnt/Data/laundry/laundry-rpg')
@@ -9,9 +14,11 @@ PDF_CANDIDATES = [
     ROOT / "The Laundry Roleplaying Game - Operative's Handbook_compressed.pdf"
 ]
 TXT_PATH = ROOT / 'tmp' / 'pdfs' / 'handbook.txt'
+# Per-page pdftotext output, one directory per PDF content hash.
+PAGE_CACHE = ROOT / 'tmp' / 'pdfs' / 'pages'
+PAGES_PER_TASK = 16
 
 PACKS_DIR = ROOT / 'packs'
-PACKS_DIR.mkdir(exist_ok=True)
 
 SKIP_UPPER = {
     'SKILL LIST', 'SKILLS', 'FOCUS', 'TRAINING', 'TALENTS', 'REQUIREMENTS',
@@ -47,23 +54,124 @@ SKILLS_DEFAULTS = [
     ("Zeal", "spirit"),
 ]
 
+SPELL_GROUP_WORDS = ['PROTECTION', 'CONTROL', 'DIVINATION', 'ENFORCEMENT', 'PERCEPTION', 'DEFENCE', 'DEFENSE']
+ATTRIBUTE_HEADER = re.compile(r"Body\s+Mind\s+Spirit")
+ARMOUR_HEADER = re.compile(r"TYPE\s+REQ\.\s+PREREQ\.\s+ARMOUR")
+SKILLS_LINE = re.compile(r"Skills\s*\((\d+)\s*XP\):\s*(.*)")
+TALENTS_LINE = re.compile(r"Talents\s*\(Choose\s*(\d+)\):\s*(.*)")
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with path.open('rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def page_count(pdf_path):
+    info = subprocess.run(['pdfinfo', str(pdf_path)], check=True, capture_output=True, text=True, errors='ignore').stdout
+    match = re.search(r"^Pages:\s+(\d+)", info, re.M)
+    if not match:
+        raise ValueError(f"pdfinfo reported no page count for {pdf_path}")
+    return int(match.group(1))
+
+
+def _extract_range(pdf_path, first, last):
+    output = subprocess.run(
+        ['pdftotext', '-layout', '-f', str(first), '-l', str(last), str(pdf_path), '-'],
+        check=True,
+        capture_output=True
+    ).stdout.decode('utf-8', errors='ignore')
+    # pdftotext ends every page with a form feed.
+    pages = output.split('\f')[:last - first + 1]
+    return first, pages + [''] * (last - first + 1 - len(pages))
+
+
+def _page_ranges(pages, size):
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1 and page - ranges[-1][0] < size:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return ranges
+
+
+def extract_pages(pdf_path, cache_dir=PAGE_CACHE, jobs=None):
+    # Pages are cached by PDF content hash and page number; missing pages are extracted in
+    # contiguous ranges across a process pool. Caches for other versions of the PDF are pruned.
+    digest = _sha256_file(pdf_path)
+    pages_dir = cache_dir / digest
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.iterdir():
+        if stale.is_dir() and stale.name != digest:
+            for path in stale.iterdir():
+                path.unlink()
+            stale.rmdir()
+
+    count = page_count(pdf_path)
+
+    def page_path(page):
+        return pages_dir / f"page-{page:05d}.txt"
+
+    missing = [page for page in range(1, count + 1) if not page_path(page).is_file()]
+    if missing:
+        ranges = _page_ranges(missing, PAGES_PER_TASK)
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(ranges)))
+        if jobs == 1:
+            results = [_extract_range(pdf_path, first, last) for first, last in ranges]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_extract_range, [pdf_path] * len(ranges), *zip(*ranges)))
+        for first, texts in results:
+            for page, text in enumerate(texts, first):
+                temp_path = page_path(page).with_suffix('.tmp')
+                temp_path.write_text(text, encoding='utf-8')
+                temp_path.replace(page_path(page))
+    return [page_path(page).read_text(encoding='utf-8') for page in range(1, count + 1)], len(missing)
 
-def ensure_text():
-    if TXT_PATH.exists():
-        return
-    TXT_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+def load_pages(jobs=None):
     pdf_path = next((p for p in PDF_CANDIDATES if p.exists()), None)
     if pdf_path is None:
+        if TXT_PATH.exists():
+            # Text-only checkout: fall back to the stitched text, split back into pages.
+            pages = TXT_PATH.read_text(encoding='utf-8', errors='ignore').split('\f')
+            return pages[:-1] if len(pages) > 1 and not pages[-1] else pages
         candidates = "\n".join(str(p) for p in PDF_CANDIDATES)
         raise FileNotFoundError(f"Could not find source PDF. Looked for:\n{candidates}")
-    subprocess.run([
-        'pdftotext', '-layout', str(pdf_path), str(TXT_PATH)
-    ], check=True)
+    pages, extracted = extract_pages(pdf_path, PAGE_CACHE, jobs=jobs)
+    print(f"Handbook text: {len(pages)} pages, {extracted} extracted, {len(pages) - extracted} cached")
+    # Keep the stitched text (page breaks as form feeds, as a whole-document pdftotext run writes it).
+    text = stitch_pages(pages)
+    if not TXT_PATH.exists() or TXT_PATH.read_text(encoding='utf-8', errors='ignore') != text:
+        TXT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        TXT_PATH.write_text(text, encoding='utf-8')
+    return pages
+
+
+def ensure_text():
+    load_pages()
+
+
+def stitch_pages(pages):
+    return ''.join(page + '\f' for page in pages)
+
+
+def lines_with_pages(pages):
+    # Each page ends in a form feed, which splitlines() treats as a line break, so the lines
+    # match splitting the stitched text; page_starts[n] is the first line of page n + 1.
+    lines = []
+    page_starts = []
+    for page in pages:
+        page_starts.append(len(lines))
+        lines.extend((page + '\f').splitlines())
+    return lines, page_starts
 
 
 def load_lines():
-    ensure_text()
-    return TXT_PATH.read_text(encoding='utf-8', errors='ignore').splitlines()
+    return lines_with_pages(load_pages())[0]
 
 
 def title_case(name: str) -> str:
@@ -88,164 +196,219 @@ def unique_preserve(items):
 
 def clean_csv_list(value: str):
     parts = []
-    for raw in re.split(r",", value or ""):
+    for raw in (value or "").split(','):
         cleaned = raw.strip().rstrip('*').strip()
         if cleaned:
             parts.append(cleaned)
     return unique_preserve(parts)
 
 
-def extract_talents(lines):
-    talents = {}
+# One pass over the handbook text recording every line the extractors start from, so each
+# extractor only visits its own sections instead of rescanning the whole book.
+def index_handbook(lines, page_starts=None):
+    requirements = []
+    attribute_headers = []
+    requisitions = []
+    group_lines = []
+    group_names = []
+    spells_summary = None
+    armour_header = None
+    current_group = ''
+
+    stripped = [line.strip() for line in lines]
+    # First line index per stripped, uppercased text (the earliest line wins).
+    first_upper = dict(zip(reversed([s.upper() for s in stripped]), range(len(lines) - 1, -1, -1)))
     for i, line in enumerate(lines):
-        if 'REQUIREMENTS:' in line:
-            req = line.split('REQUIREMENTS:', 1)[1].strip()
-            if not req and i + 1 < len(lines):
-                req = lines[i + 1].strip()
-            name = None
-            for j in range(i - 1, max(i - 6, -1), -1):
-                cand = lines[j].strip()
-                if not cand:
-                    continue
-                if cand.isupper() and cand not in SKIP_UPPER:
-                    name = title_case(cand)
-                    break
-            if not name:
-                continue
-            if name in talents:
+        # 'REQUIREMENTS:', 'REQUISITION' and 'PREREQ.' all contain 'REQ'.
+        if 'REQ' in line:
+            if 'REQUIREMENTS:' in line:
+                requirements.append(i)
+            if 'REQUISITION' in line and 'DN' in line:
+                requisitions.append(i)
+            if armour_header is None and 'PREREQ.' in line and ARMOUR_HEADER.search(line):
+                armour_header = i
+        if 'Spirit' in line and ATTRIBUTE_HEADER.search(line):
+            attribute_headers.append(i)
+        if spells_summary is None and 'SPELLS SUMMARY' in line:
+            spells_summary = i
+        s = stripped[i]
+        if s.isupper() and 5 < len(s) <= 40 and 'SPELLS' not in s:
+            if any(x in s for x in SPELL_GROUP_WORDS):
+                current_group = title_case(s)
+            group_lines.append(i)
+            group_names.append(current_group)
+
+    return {
+        'requirements': requirements,
+        'attribute_headers': attribute_headers,
+        'requisitions': requisitions,
+        'first_upper': first_upper,
+        'spells_summary': spells_summary,
+        'armour_header': armour_header,
+        'group_lines': group_lines,
+        'group_names': group_names,
+        'page_starts': page_starts,
+    }
+
+
+def _with_source_page(record, index, i):
+    # Records only carry a sourcePage when the lines came from known PDF pages.
+    if index.get('page_starts'):
+        record['sourcePage'] = f"p.{bisect_right(index['page_starts'], i)}"
+    return record
+
+
+def extract_talents(lines, index=None):
+    if index is None:
+        index = index_handbook(lines)
+    talents = {}
+    for i in index['requirements']:
+        req = lines[i].split('REQUIREMENTS:', 1)[1].strip()
+        if not req and i + 1 < len(lines):
+            req = lines[i + 1].strip()
+        name = None
+        for j in range(i - 1, max(i - 6, -1), -1):
+            cand = lines[j].strip()
+            if not cand:
                 continue
+            if cand.isupper() and cand not in SKIP_UPPER:
+                name = title_case(cand)
+                break
+        if not name:
+            continue
+        if name in talents:
+            continue
 
-            desc = ''
-            for k in range(i + 1, min(i + 6, len(lines))):
-                d = lines[k].strip()
-                if not d:
-                    continue
-                if d.isupper():
-                    break
-                if 'REQUIREMENTS:' in d:
-                    break
-                desc = d
+        desc = ''
+        for k in range(i + 1, min(i + 6, len(lines))):
+            d = lines[k].strip()
+            if not d:
+                continue
+            if d.isupper():
+                break
+            if 'REQUIREMENTS:' in d:
                 break
+            desc = d
+            break
 
-            talents[name] = {
-                'requirements': req,
-                'description': desc
-            }
+        talents[name] = _with_source_page({
+            'requirements': req,
+            'description': desc
+        }, index, i)
     return talents
 
 
-def extract_assignments(lines):
+def extract_assignments(lines, index=None):
+    if index is None:
+        index = index_handbook(lines)
     assignments = []
-    for i, line in enumerate(lines):
-        if 'Body' in line and 'Mind' in line and 'Spirit' in line:
-            if not re.search(r"Body\s+Mind\s+Spirit", line):
+    for i in index['attribute_headers']:
+        if i + 1 >= len(lines):
+            continue
+        nums = re.findall(r"\d+", lines[i + 1])
+        if len(nums) != 3:
+            continue
+
+        name = None
+        for j in range(i - 1, max(i - 10, -1), -1):
+            cand = lines[j].strip()
+            if not cand:
                 continue
-            if i + 1 >= len(lines):
+            if 'DEPARTMENT' in cand.upper():
                 continue
-            nums = re.findall(r"\d+", lines[i + 1])
-            if len(nums) != 3:
+            if cand.isupper() and cand in SKIP_UPPER:
                 continue
+            if any(ch.isalpha() for ch in cand):
+                name = cand
+                break
+        if not name:
+            continue
 
-            name = None
-            for j in range(i - 1, max(i - 10, -1), -1):
-                cand = lines[j].strip()
-                if not cand:
+        core_skill = ''
+        skills_list = ''
+        skill_xp = 0
+        core_talent = ''
+        talents = ''
+        talent_choices = 0
+        equipment = ''
+
+        for k in range(i + 1, min(i + 30, len(lines))):
+            l = lines[k].strip()
+            if not l:
+                continue
+            if l.startswith('Core Skill:'):
+                core_skill = l.split('Core Skill:', 1)[1].strip()
+            else:
+                skill_match = SKILLS_LINE.match(l) if l.startswith('Skills') else None
+                talent_match = TALENTS_LINE.match(l) if l.startswith('Talents') else None
+
+                if skill_match:
+                    skill_xp = int(skill_match.group(1))
+                    skills_list = skill_match.group(2).strip()
+                    for m in range(k + 1, min(k + 5, len(lines))):
+                        ml = lines[m].strip()
+                        if not ml:
+                            continue
+                        if any(ml.startswith(x) for x in ['Core Talent:', 'Talents (Choose', 'Equipment:']):
+                            break
+                        skills_list += ' ' + ml
                     continue
-                if 'DEPARTMENT' in cand.upper():
+
+                if l.startswith('Core Talent:'):
+                    core_talent = l.split('Core Talent:', 1)[1].strip()
                     continue
-                if cand.isupper() and cand in SKIP_UPPER:
+
+                if talent_match:
+                    talent_choices = int(talent_match.group(1))
+                    talents = talent_match.group(2).strip()
+                    for m in range(k + 1, min(k + 5, len(lines))):
+                        ml = lines[m].strip()
+                        if not ml:
+                            continue
+                        if ml.startswith('Equipment:'):
+                            break
+                        talents += ' ' + ml
                     continue
-                if any(ch.isalpha() for ch in cand):
-                    name = cand
-                    break
-            if not name:
-                continue
 
-            core_skill = ''
-            skills_list = ''
-            skill_xp = 0
-            core_talent = ''
-            talents = ''
-            talent_choices = 0
-            equipment = ''
-
-            for k in range(i + 1, min(i + 30, len(lines))):
-                l = lines[k].strip()
-                if not l:
+                if l.startswith('Talents (Choose'):
+                    talents = l.split(':', 1)[1].strip()
+                    for m in range(k + 1, min(k + 5, len(lines))):
+                        ml = lines[m].strip()
+                        if not ml:
+                            continue
+                        if any(ml.startswith(x) for x in ['Core Talent:', 'Talents (Choose', 'Equipment:']):
+                            break
+                        talents += ' ' + ml
                     continue
-                if l.startswith('Core Skill:'):
-                    core_skill = l.split('Core Skill:', 1)[1].strip()
-                else:
-                    skill_match = re.match(r"Skills\s*\((\d+)\s*XP\):\s*(.*)", l)
-                    talent_match = re.match(r"Talents\s*\(Choose\s*(\d+)\):\s*(.*)", l)
-
-                    if skill_match:
-                        skill_xp = int(skill_match.group(1))
-                        skills_list = skill_match.group(2).strip()
-                        for m in range(k + 1, min(k + 5, len(lines))):
-                            ml = lines[m].strip()
-                            if not ml:
-                                continue
-                            if any(ml.startswith(x) for x in ['Core Talent:', 'Talents (Choose', 'Equipment:']):
-                                break
-                            skills_list += ' ' + ml
-                        continue
-
-                    if l.startswith('Core Talent:'):
-                        core_talent = l.split('Core Talent:', 1)[1].strip()
-                        continue
-
-                    if talent_match:
-                        talent_choices = int(talent_match.group(1))
-                        talents = talent_match.group(2).strip()
-                        for m in range(k + 1, min(k + 5, len(lines))):
-                            ml = lines[m].strip()
-                            if not ml:
-                                continue
-                            if ml.startswith('Equipment:'):
-                                break
-                            talents += ' ' + ml
-                        continue
-
-                    if l.startswith('Talents (Choose'):
-                        talents = l.split(':', 1)[1].strip()
-                        for m in range(k + 1, min(k + 5, len(lines))):
-                            ml = lines[m].strip()
-                            if not ml:
-                                continue
-                            if any(ml.startswith(x) for x in ['Core Talent:', 'Talents (Choose', 'Equipment:']):
-                                break
-                            talents += ' ' + ml
-                        continue
-
-                    if l.startswith('Equipment:'):
-                        equipment = l.split('Equipment:', 1)[1].strip()
-                        break
-
-            core_skill_list = clean_csv_list(core_skill)
-            core_skill_name = core_skill_list[0] if core_skill_list else ''
-            skill_options = clean_csv_list(skills_list)
-            if core_skill_name:
-                skill_options = [s for s in skill_options if s.casefold() != core_skill_name.casefold()]
-            combined_skills = ', '.join(unique_preserve(core_skill_list + skill_options))
-            talents_clean = clean_csv_list(talents)
-
-            assignments.append({
-                'name': name,
-                'attributes': {
-                    'body': int(nums[0]),
-                    'mind': int(nums[1]),
-                    'spirit': int(nums[2])
-                },
-                'coreSkill': core_skill_name,
-                'skillOptions': ', '.join(skill_options),
-                'skillXP': skill_xp,
-                'talentChoices': talent_choices,
-                'coreSkills': combined_skills,
-                'coreTalent': core_talent,
-                'talents': ', '.join(talents_clean),
-                'equipment': ', '.join(clean_csv_list(equipment))
-            })
+
+                if l.startswith('Equipment:'):
+                    equipment = l.split('Equipment:', 1)[1].strip()
+                    break
+
+        core_skill_list = clean_csv_list(core_skill)
+        core_skill_name = core_skill_list[0] if core_skill_list else ''
+        skill_options = clean_csv_list(skills_list)
+        if core_skill_name:
+            skill_options = [s for s in skill_options if s.casefold() != core_skill_name.casefold()]
+        combined_skills = ', '.join(unique_preserve(core_skill_list + skill_options))
+        talents_clean = clean_csv_list(talents)
+
+        assignments.append(_with_source_page({
+            'name': name,
+            'attributes': {
+                'body': int(nums[0]),
+                'mind': int(nums[1]),
+                'spirit': int(nums[2])
+            },
+            'coreSkill': core_skill_name,
+            'skillOptions': ', '.join(skill_options),
+            'skillXP': skill_xp,
+            'talentChoices': talent_choices,
+            'coreSkills': combined_skills,
+            'coreTalent': core_talent,
+            'talents': ', '.join(talents_clean),
+            'equipment': ', '.join(clean_csv_list(equipment))
+        }, index, i))
 
     uniq = {}
     for a in assignments:
@@ -254,15 +417,14 @@ def extract_assignments(lines):
     return list(uniq.values())
 
 
-def extract_spell_names(lines):
-    start = None
-    for i, line in enumerate(lines):
-        if 'SPELLS SUMMARY' in line:
-            start = i
-            break
+def extract_spell_names(lines, index=None):
+    if index is None:
+        index = index_handbook(lines)
+    start = index['spells_summary']
     if start is None:
         return []
     names = []
+    seen = set()
     for line in lines[start+1:]:
         if 'COMMON SPELLS' in line:
             break
@@ -273,32 +435,20 @@ def extract_spell_names(lines):
         if not cols:
             continue
         name = cols[0].strip()
-        if name and name not in names:
+        if name and name not in seen:
+            seen.add(name)
             names.append(name)
     return names
 
 
-def extract_spells(lines):
-    spell_names = extract_spell_names(lines)
+def extract_spells(lines, index=None):
+    if index is None:
+        index = index_handbook(lines)
+    spell_names = extract_spell_names(lines, index)
     spell_entries = []
 
-    upper_lines = [l.strip().upper() for l in lines]
-
-    current_group = ''
-    group_indices = {}
-    for i, line in enumerate(lines):
-        s = line.strip()
-        if s.isupper() and 5 < len(s) <= 40 and 'SPELLS' not in s:
-            if any(x in s for x in ['PROTECTION', 'CONTROL', 'DIVINATION', 'ENFORCEMENT', 'PERCEPTION', 'DEFENCE', 'DEFENSE']):
-                current_group = title_case(s)
-            group_indices[i] = current_group
-
     for name in spell_names:
-        up = name.upper()
-        try:
-            idx = upper_lines.index(up)
-        except ValueError:
-            idx = None
+        idx = index['first_upper'].get(name.upper())
         dn = 4
         complexity = 1
         casting = ''
@@ -307,11 +457,10 @@ def extract_spells(lines):
         duration = ''
         school = ''
         if idx is not None:
-            for gi in sorted(group_indices.keys()):
-                if gi <= idx:
-                    school = group_indices[gi]
-                else:
-                    break
+            # The school is the group heading in effect at the spell's own heading.
+            group = bisect_right(index['group_lines'], idx)
+            if group:
+                school = index['group_names'][group - 1]
 
             for j in range(idx, min(idx + 40, len(lines))):
                 l = lines[j].strip()
@@ -338,7 +487,7 @@ def extract_spells(lines):
                 elif l.startswith('Duration:'):
                     duration = l.split('Duration:', 1)[1].strip()
 
-        spell_entries.append({
+        spell = {
             'name': name,
             'system': {
                 'level': 1,
@@ -351,24 +500,23 @@ def extract_spells(lines):
                 'school': school,
                 'description': ''
             }
-        })
+        }
+        spell_entries.append(spell if idx is None else _with_source_page(spell, index, idx))
 
     return spell_entries
 
 
-def extract_weapon_table(lines):
-    start = None
-    for i, line in enumerate(lines):
-        if line.strip().upper() == 'WEAPON TABLE':
-            start = i
-            break
+def extract_weapon_table(lines, index=None):
+    if index is None:
+        index = index_handbook(lines)
+    start = index['first_upper'].get('WEAPON TABLE')
     if start is None:
         return []
 
     weapons = []
     current = None
 
-    for line in lines[start+1:]:
+    for i, line in enumerate(lines[start+1:], start + 1):
         s = line.rstrip()
         if not s.strip():
             if current:
@@ -386,12 +534,12 @@ def extract_weapon_table(lines):
             req = cols[1]
             damage = cols[2]
             traits = cols[3] if len(cols) >= 4 else ''
-            current = {
+            current = _with_source_page({
                 'name': name,
                 'req': req,
                 'damage': damage,
                 'traits': traits
-            }
+            }, index, i)
         else:
             if current is None:
                 continue
@@ -406,12 +554,10 @@ def extract_weapon_table(lines):
     return weapons
 
 
-def extract_armour_table(lines):
-    start = None
-    for i, line in enumerate(lines):
-        if re.search(r"TYPE\s+REQ\.\s+PREREQ\.\s+ARMOUR", line):
-            start = i
-            break
+def extract_armour_table(lines, index=None):
+    if index is None:
+        index = index_handbook(lines)
+    start = index['armour_header']
     if start is None:
         return []
 
@@ -429,6 +575,7 @@ def extract_armour_table(lines):
             continue
 
         if re.search(r"\d+:\d", s):
+            start_line = i
             cols = split_cols(s)
             name_part = ''
             req = ''
@@ -465,12 +612,12 @@ def extract_armour_table(lines):
                 if m:
                     armour_val = m.group(1)
 
-            armours.append({
+            armours.append(_with_source_page({
                 'name': name,
                 'req': req,
                 'prereq': prereq,
                 'armour': armour_val
-            })
+            }, index, start_line))
             pending_name = []
             i += 1
             continue
@@ -486,35 +633,36 @@ def extract_armour_table(lines):
     return armours
 
 
-def extract_gear(lines, existing_names):
+def extract_gear(lines, existing_names, index=None):
+    if index is None:
+        index = index_handbook(lines)
     gear = []
-    for i, line in enumerate(lines):
-        if 'REQUISITION' in line and 'DN' in line:
-            req = line.strip()
-            name = None
-            for j in range(i - 1, max(i - 6, -1), -1):
-                cand = lines[j].strip()
-                if not cand:
-                    continue
-                if cand in SKIP_UPPER:
-                    continue
-                if any(ch.isalpha() for ch in cand):
-                    name = title_case(cand)
-                    break
-            if not name:
+    for i in index['requisitions']:
+        req = lines[i].strip()
+        name = None
+        for j in range(i - 1, max(i - 6, -1), -1):
+            cand = lines[j].strip()
+            if not cand:
                 continue
-            if name in existing_names:
+            if cand in SKIP_UPPER:
                 continue
+            if any(ch.isalpha() for ch in cand):
+                name = title_case(cand)
+                break
+        if not name:
+            continue
+        if name in existing_names:
+            continue
 
-            requirements = ''
-            if i + 1 < len(lines) and 'REQUIREMENTS:' in lines[i + 1]:
-                requirements = lines[i + 1].split('REQUIREMENTS:', 1)[1].strip()
+        requirements = ''
+        if i + 1 < len(lines) and 'REQUIREMENTS:' in lines[i + 1]:
+            requirements = lines[i + 1].split('REQUIREMENTS:', 1)[1].strip()
 
-            gear.append({
-                'name': name,
-                'req': req.replace('REQUISITION', 'Requisition'),
-                'requirements': requirements
-            })
+        gear.append(_with_source_page({
+            'name': name,
+            'req': req.replace('REQUISITION', 'Requisition'),
+            'requirements': requirements
+        }, index, i))
     uniq = {}
     for g in gear:
         if g['name'] not in uniq:
@@ -522,6 +670,26 @@ def extract_gear(lines, existing_names):
     return list(uniq.values())
 
 
+def _source_page(record):
+    # Only records extracted from known PDF pages carry a page; otherwise the item is unchanged.
+    return {'sourcePage': record['sourcePage']} if record.get('sourcePage') else {}
+
+
+def parse_handbook(lines, page_starts=None):
+    index = index_handbook(lines, page_starts)
+    weapon_table = extract_weapon_table(lines, index)
+    armour_table = extract_armour_table(lines, index)
+    existing_names = {w['name'] for w in weapon_table} | {a['name'] for a in armour_table}
+    return {
+        'talents': extract_talents(lines, index),
+        'assignments': extract_assignments(lines, index),
+        'spells': extract_spells(lines, index),
+        'weapons': weapon_table,
+        'armour': armour_table,
+        'gear': extract_gear(lines, existing_names, index),
+    }
+
+
 def write_pack(path, items):
     lines = [json.dumps(item, ensure_ascii=True) for item in items]
     path.write_text("\n".join(lines), encoding='utf-8')
@@ -532,18 +700,16 @@ def new_id(n=16):
     return ''.join(random.choice(string.ascii_lowercase + string.digits) for _ in range(n))
 
 
-def build():
-    lines = load_lines()
-
-    talents = extract_talents(lines)
-    assignments = extract_assignments(lines)
-    spells = extract_spells(lines)
-    weapon_table = extract_weapon_table(lines)
-    armour_table = extract_armour_table(lines)
-
-    weapon_names = {w['name'] for w in weapon_table}
-    armour_names = {a['name'] for a in armour_table}
-    gear = extract_gear(lines, existing_names=weapon_names | armour_names)
+def build(jobs=None):
+    PACKS_DIR.mkdir(exist_ok=True)
+    lines, page_starts = lines_with_pages(load_pages(jobs))
+    handbook = parse_handbook(lines, page_starts)
+    talents = handbook['talents']
+    assignments = handbook['assignments']
+    spells = handbook['spells']
+    weapon_table = handbook['weapons']
+    armour_table = handbook['armour']
+    gear = handbook['gear']
 
     # Skills pack
     skill_items = []
@@ -575,7 +741,8 @@ def build():
             'img': 'systems/laundry-rpg/icons/generated/_defaults/talent.webp',
             'system': {
                 'requirements': req,
-                'description': desc
+                'description': desc,
+                **_source_page(data)
             },
             'effects': [],
             'flags': {}
@@ -595,7 +762,8 @@ def build():
                 'coreTalent': a['coreTalent'],
                 'talents': a['talents'],
                 'equipment': a['equipment'],
-                'description': ''
+                'description': '',
+                **_source_page(a)
             },
             'effects': [],
             'flags': {}
@@ -609,7 +777,7 @@ def build():
             'name': s['name'],
             'type': 'spell',
             'img': 'systems/laundry-rpg/icons/generated/_defaults/spell.webp',
-            'system': s['system'],
+            'system': {**s['system'], **_source_page(s)},
             'effects': [],
             'flags': {}
         })
@@ -631,7 +799,8 @@ def build():
                 'skill': skill,
                 'traits': traits,
                 'equipped': False,
-                'description': f"Requisition DN: {w.get('req', '').strip()}"
+                'description': f"Requisition DN: {w.get('req', '').strip()}",
+                **_source_page(w)
             },
             'effects': [],
             'flags': {}
@@ -649,7 +818,8 @@ def build():
                 'protection': int(a.get('armour', '0') or 0),
                 'traits': a.get('prereq', ''),
                 'equipped': False,
-                'description': f"Requisition DN: {a.get('req', '').strip()}"
+                'description': f"Requisition DN: {a.get('req', '').strip()}",
+                **_source_page(a)
             },
             'effects': [],
             'flags': {}
@@ -661,6 +831,7 @@ def build():
         desc = g.get('req', '')
         if g.get('requirements'):
             desc = f"{desc}. Requirements: {g['requirements']}"
+        page = _source_page(g)
         gear_items.append({
             '_id': new_id(),
             'name': g['name'],
@@ -669,7 +840,10 @@ def build():
             'system': {
                 'quantity': 1,
                 'weight': 0,
-                'description': desc
+                'description': desc,
+                # As the pack rebuild normalizes gear: the page under requisition, lifted onto system.
+                **page,
+                **({'requisition': page} if page else {})
             },
             'effects': [],
             'flags': {}
@@ -689,4 +863,9 @@ def build():
 
 
 if __name__ == '__main__':
-    build()
+    parser = argparse.ArgumentParser(description="Build the legacy compendium packs from the handbook PDF.")
+    parser.add_argument('--jobs', type=int, help="Processes for page extraction (default: CPU count).")
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be >= 1')
+    build(args.jobs)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite index of built pack collections, used for cross-collection lookups.
+
+The pack rebuild stores every collection it builds here: one row per document with its type,
+casefolded name, stable id and category indexed, plus a row per tag. Assignment validation,
+issued-gear derivation and the all-items dedup run as indexed queries against it. Collections
+written to a pack also record the pack's input signature and content hash, so an incremental
+build can tell which upstream collections are current and read them back from their packs
+instead of rebuilding them.
+
+The file lives at .cache/packs/build.sqlite and is safe to open read-only from other tools, e.g.
+    sqlite3 .cache/packs/build.sqlite "SELECT collection, name FROM documents WHERE category = 'Occult Gear'"
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable
+
+SCHEMA_VERSION = 2
+BUSY_TIMEOUT = 30.0
+SCHEMA = """
+CREATE TABLE collections (
+    name TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    signature TEXT,
+    sha256 TEXT
+);
+CREATE TABLE documents (
+    collection TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    category TEXT NOT NULL,
+    PRIMARY KEY (collection, position)
+) WITHOUT ROWID;
+CREATE INDEX documents_type ON documents (type, name_key);
+CREATE INDEX documents_name ON documents (name_key, collection);
+CREATE INDEX documents_id ON documents (id);
+CREATE INDEX documents_category ON documents (category);
+CREATE TABLE tags (
+    collection TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tag_key TEXT NOT NULL
+);
+CREATE INDEX tags_key ON tags (tag_key);
+CREATE INDEX tags_document ON tags (collection, position);
+"""
+
+# path (None for the in-memory database) -> (pid, connection); connections are not carried
+# across a fork into pool workers.
+_CONNECTIONS: dict[Path | None, tuple[int, sqlite3.Connection]] = {}
+# (connection id, collection) -> the document list last stored there. Built documents are not
+# mutated, so storing the same list again can skip re-deriving its index rows.
+_STORED: dict[tuple[int, str], list[dict]] = {}
+
+
+def connect(path: Path | None) -> sqlite3.Connection:
+    """Open (creating or migrating) the database, reusing this process's connection.
+
+    path None opens a private in-memory database for builds that keep nothing on disk.
+    """
+    cached = _CONNECTIONS.get(path)
+    if cached is not None and cached[0] == os.getpid():
+        return cached[1]
+    if path is None:
+        conn = sqlite3.connect(":memory:", isolation_level=None)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process may have migrated while this one waited for the lock.
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                conn.execute(f"DROP TABLE {table}")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    _CONNECTIONS[path] = (os.getpid(), conn)
+    return conn
+
+
+def _index_row(doc: dict) -> tuple[str, str, str, str, str, list[str]]:
+    flags = doc.get("flags") if isinstance(doc.get("flags"), dict) else {}
+    laundry = flags.get("laundry-rpg") if isinstance(flags.get("laundry-rpg"), dict) else {}
+    system = doc.get("system") if isinstance(doc.get("system"), dict) else {}
+    # name is kept as written, for exact matches; name_key is trimmed and casefolded.
+    name = str(doc.get("name") or "")
+    tags = laundry.get("tags") or system.get("tags") or []
+    return (
+        str(doc.get("_id") or ""),
+        str(doc.get("type") or "").strip().lower(),
+        name,
+        name.strip().casefold(),
+        str(laundry.get("category") or system.get("category") or ""),
+        [str(tag).casefold() for tag in tags if str(tag).strip()] if isinstance(tags, list) else [],
+    )
+
+
+def store_collection(
+    conn: sqlite3.Connection,
+    name: str,
+    docs: list[dict],
+    signature: str | None = None,
+    sha256: str | None = None
+) -> None:
+    """Make the stored index rows for a collection match docs.
+
+    Pass the pack's input signature and content hash when docs are what was just written to the
+    pack; storing docs without them marks the collection as not matching any pack. Nothing is
+    written when the stored rows already match.
+    """
+    if _STORED.get((id(conn), name)) is docs:
+        if sha256 is not None:
+            conn.execute("UPDATE collections SET signature = ?, sha256 = ? WHERE name = ?", (signature, sha256, name))
+        return
+
+    rows = [_index_row(doc) for doc in docs]
+    digest = hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+    stored = conn.execute("SELECT digest, signature, sha256 FROM collections WHERE name = ?", (name,)).fetchone()
+    if stored is not None and stored[0] == digest:
+        if sha256 is not None and (stored[1], stored[2]) != (signature, sha256):
+            conn.execute("UPDATE collections SET signature = ?, sha256 = ? WHERE name = ?", (signature, sha256, name))
+        _STORED[(id(conn), name)] = docs
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM documents WHERE collection = ?", (name,))
+        conn.execute("DELETE FROM tags WHERE collection = ?", (name,))
+        conn.executemany(
+            "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((name, position, *row[:5]) for position, row in enumerate(rows)),
+        )
+        conn.executemany(
+            "INSERT INTO tags VALUES (?, ?, ?)",
+            ((name, position, tag) for position, row in enumerate(rows) for tag in row[5]),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO collections VALUES (?, ?, ?, ?)",
+            (name, digest, signature if sha256 is not None else None, sha256),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    _STORED[(id(conn), name)] = docs
+
+
+def fresh_collections(
+    conn: sqlite3.Connection,
+    packs: dict[str, tuple[str, str | None]],
+    load: Callable[[str], list[dict]]
+) -> dict[str, list[dict]]:
+    """load(name) for every collection last written to a pack with this (input signature, content hash).
+
+    The stored index rows already describe those documents, so storing them again is free.
+    """
+    out: dict[str, list[dict]] = {}
+    for name, (signature, sha256) in packs.items():
+        stored = conn.execute(
+            "SELECT 1 FROM collections WHERE name = ? AND signature = ? AND sha256 = ?",
+            (name, signature, sha256),
+        ).fetchone()
+        if sha256 is not None and stored is not None:
+            out[name] = load(name)
+            _STORED[(id(conn), name)] = out[name]
+    return out
+
+
+def missing_names(conn: sqlite3.Connection, collection: str, names: list[str]) -> set[str]:
+    """The names (exact match, whitespace included) that no document in collection has."""
+    pairs = json.dumps([[name, name.strip().casefold()] for name in names], ensure_ascii=False)
+    return {
+        name
+        for (name,) in conn.execute(
+            """
+            SELECT json_extract(wanted.value, '$[0]') FROM json_each(?) AS wanted
+            WHERE NOT EXISTS (
+                SELECT 1 FROM documents INDEXED BY documents_name
+                WHERE name_key = json_extract(wanted.value, '$[1]') AND collection = ? AND name = json_extract(wanted.value, '$[0]')
+            )
+            """,
+            (pairs, collection),
+        )
+    }
+
+
+def existing_name_keys(conn: sqlite3.Connection, collections: list[str], name_keys: list[str]) -> set[str]:
+    """The casefolded names that some document in the given collections has."""
+    return {
+        key
+        for (key,) in conn.execute(
+            """
+            SELECT wanted.value FROM json_each(?) AS wanted
+            WHERE EXISTS (
+                SELECT 1 FROM documents, json_each(?) AS scope
+                WHERE name_key = wanted.value AND collection = scope.value
+            )
+            """,
+            (json.dumps(name_keys, ensure_ascii=False), json.dumps(collections)),
+        )
+    }
+
+
+def first_by_type_and_name(conn: sqlite3.Connection, collections: list[str]) -> list[tuple[str, int]]:
+    """(collection, position) of the first document per (type, casefolded name), in collection order.
+
+    Documents without a type or name are skipped.
+    """
+    return conn.execute(
+        """
+        SELECT collection, position FROM (
+            SELECT documents.collection, documents.position, scope.key AS rank,
+                ROW_NUMBER() OVER (
+                    PARTITION BY documents.type, documents.name_key
+                    ORDER BY scope.key, documents.position
+                ) AS occurrence
+            FROM json_each(?) AS scope
+            JOIN documents ON documents.collection = scope.value
+            WHERE documents.type != '' AND documents.name_key != ''
+        )
+        WHERE occurrence = 1
+        ORDER BY rank, position
+        """,
+        (json.dumps(collections),),
+    ).fetchall()
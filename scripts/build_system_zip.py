@@ -1,11 +1,43 @@
 #!/usr/bin/env python3
+import argparse
+import collections
+import gzip
+import hashlib
+import json
 import os
+import shutil
+import struct
+import sys
+import time
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import minify_assets
+
+try:
+    import brotli
+except ImportError:  # Brotli is only needed for the optional .br sidecars.
+    brotli = None
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 OUT_SYSTEM = os.path.join(ROOT, "system.zip")
 OUT_LOCAL = os.path.join(ROOT, "laundry-rpg.zip")
 OUT_SIBLING = os.path.abspath(os.path.join(ROOT, "..", "laundry-rpg.zip"))
+OUT_DELTA = os.path.join(ROOT, "laundry-rpg-delta.zip")
+# Source hash and stored form of every member of the last archive written per output path,
+# so --incremental can copy unchanged members' compressed bytes instead of deflating them again.
+MEMBER_MANIFEST = os.path.join(ROOT, ".cache", "archive", "members.json")
+MEMBER_MANIFEST_VERSION = 1
+SIDECAR_REPORT = os.path.join(ROOT, ".cache", "archive", "sidecars.json")
+SIDECAR_REPORT_VERSION = 1
+MINIFY_REPORT = os.path.join(ROOT, ".cache", "archive", "minify.json")
+MINIFY_REPORT_VERSION = 1
+# Files listed with their savings after a --minify build.
+MINIFY_REPORT_TOP = 10
+# Delta packages carry this member: the new tree's per-file SHA-256 plus added/changed/deleted paths.
+DELTA_MANIFEST = "delta-manifest.json"
+DELTA_FORMAT = 1
 
 # Keep archive paths root-level for direct Foundry package install.
 PREFIX = ""
@@ -23,6 +55,28 @@ INCLUDE = [
 ]
 
 EXCLUDE_EXTS = {".pdf", ".bak"}
+# Already-compressed formats: deflating them again costs time and saves almost nothing.
+STORED_EXTS = {
+    ".webp", ".png", ".jpg", ".jpeg", ".gif", ".ogg", ".mp3", ".m4a", ".webm", ".mp4", ".woff", ".woff2", ".zip",
+    ".gz", ".br"
+}
+# Text assets that get precompressed .gz/.br sidecars for nginx gzip_static/brotli_static.
+SIDECAR_EXTS = {".css", ".js", ".mjs", ".html", ".hbs", ".json", ".db", ".svg", ".txt", ".md", ".xml"}
+# A sidecar is only shipped when it is at most this fraction of the original and saves this many bytes.
+SIDECAR_MAX_RATIO = 0.9
+SIDECAR_MIN_SAVING = 512
+
+# Every member gets the same timestamp (the DOS epoch, 1980-01-01 00:00) and permissions
+# (regular file, 0644, Unix attributes) so identical inputs give byte-identical archives.
+DOS_TIME = 0
+DOS_DATE = (1 << 5) | 1
+EXTERNAL_ATTR = (0o100644 << 16)
+VERSION_MADE_BY = (3 << 8) | 20
+VERSION_NEEDED = 20
+UTF8_FLAG = 0x800
+DEFLATE_LEVEL = 6
+# Members read and compressed ahead of the writer per worker; bounds memory on large icon sets.
+PENDING_PER_JOB = 4
 
 
 def should_include(path):
@@ -30,53 +84,473 @@ def should_include(path):
     return ext.lower() not in EXCLUDE_EXTS
 
 
-def add_path(zf, path):
-    full = os.path.join(ROOT, path)
-    if not os.path.exists(full):
+def _arcname(full):
+    rel = os.path.relpath(full, ROOT).replace(os.sep, "/")
+    return f"{PREFIX}/{rel}" if PREFIX else rel
+
+
+def archive_members():
+    """(archive name, source path) for every file to package, sorted by archive name."""
+    members = {}
+    for item in INCLUDE:
+        full = os.path.join(ROOT, item)
+        if not os.path.exists(full):
+            continue
+        if os.path.isdir(full):
+            for root, _, files in os.walk(full):
+                for name in files:
+                    file_full = os.path.join(root, name)
+                    if should_include(file_full):
+                        members[_arcname(file_full)] = file_full
+        elif should_include(full):
+            members[_arcname(full)] = full
+    return sorted(members.items())
+
+
+def _sha256_bytes(payload):
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compress(data, method):
+    if method == zipfile.ZIP_STORED:
+        return data
+    compressor = zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _read_manifest():
+    try:
+        with open(MEMBER_MANIFEST, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MEMBER_MANIFEST_VERSION:
+        return {}
+    return manifest.get("archives", {})
+
+
+def _write_manifest(archives):
+    os.makedirs(os.path.dirname(MEMBER_MANIFEST), exist_ok=True)
+    temp_path = f"{MEMBER_MANIFEST}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump({"version": MEMBER_MANIFEST_VERSION, "archives": archives}, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+    os.replace(temp_path, MEMBER_MANIFEST)
+
+
+def _previous_members(path, recorded):
+    """Raw compressed member bytes of the archive at path, keyed by source hash.
+
+    Only used when the archive on disk is the one the manifest describes.
+    """
+    if not recorded or not os.path.isfile(path) or _sha256_file(path) != recorded.get("sha256"):
+        return {}
+    hashes = recorded.get("members", {})
+    out = {}
+    with open(path, "rb") as handle, zipfile.ZipFile(handle) as archive:
+        for info in archive.infolist():
+            source_hash = hashes.get(info.filename)
+            if source_hash is None:
+                continue
+            handle.seek(info.header_offset)
+            header = handle.read(30)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            handle.seek(info.header_offset + 30 + name_length + extra_length)
+            out[info.filename] = (source_hash, info.compress_type, info.CRC, info.file_size, handle.read(info.compress_size))
+    return out
+
+
+def _read_source(source):
+    """Member bytes: source is a file path or, for generated members, the bytes themselves."""
+    if isinstance(source, bytes):
+        return source
+    with open(source, "rb") as handle:
+        return handle.read()
+
+
+def _source_sha256(source):
+    return _sha256_bytes(source) if isinstance(source, bytes) else _sha256_file(source)
+
+
+def _prepare_member(source, method, previous):
+    """(source hash, crc, size, payload) for one member, reusing previous compressed bytes when unchanged."""
+    data = _read_source(source)
+    source_hash = _sha256_bytes(data)
+    if previous is not None and previous[0] == source_hash and previous[1] == method:
+        _, _, crc, size, payload = previous
+        return source_hash, crc, size, payload, True
+    # zlib releases the GIL while hashing and deflating, so worker threads compress in parallel.
+    return source_hash, zlib.crc32(data), len(data), _compress(data, method), False
+
+
+def _prepared_members(members, previous, jobs):
+    """Yield (arcname, method, prepared) in member order, compressing up to jobs members concurrently."""
+    def task(arcname, source):
+        method = zipfile.ZIP_STORED if os.path.splitext(arcname)[1].lower() in STORED_EXTS else zipfile.ZIP_DEFLATED
+        return arcname, method, _prepare_member(source, method, previous.get(arcname))
+
+    if jobs <= 1:
+        for arcname, source in members:
+            yield task(arcname, source)
         return
-    if os.path.isdir(full):
-        for root, _, files in os.walk(full):
-            for name in files:
-                file_full = os.path.join(root, name)
-                if not should_include(file_full):
-                    continue
-                rel = os.path.relpath(file_full, ROOT)
-                arc = os.path.join(PREFIX, rel) if PREFIX else rel
-                zf.write(file_full, arc)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = collections.deque()
+        for arcname, source in members:
+            pending.append(pool.submit(task, arcname, source))
+            if len(pending) >= jobs * PENDING_PER_JOB:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_zip(path, members, previous, jobs):
+    """Write members ((arcname, source) pairs) to path atomically; returns (member hashes, counts)."""
+    parent = os.path.dirname(path)
+    if parent and not os.path.exists(parent):
+        os.makedirs(parent, exist_ok=True)
+    hashes = {}
+    counts = {"stored": 0, "deflated": 0, "reused": 0}
+    central = []
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as out:
+        for arcname, method, (source_hash, crc, size, payload, reused) in _prepared_members(members, previous, jobs):
+            hashes[arcname] = source_hash
+            if reused:
+                counts["reused"] += 1
+            else:
+                counts["stored" if method == zipfile.ZIP_STORED else "deflated"] += 1
+
+            name = arcname.encode("utf-8")
+            flags = UTF8_FLAG if not arcname.isascii() else 0
+            if max(size, len(payload), out.tell()) > 0xFFFFFFFF:
+                raise OSError(f"{path}: {arcname} needs ZIP64, which this writer does not produce")
+            offset = out.tell()
+            out.write(struct.pack(
+                "<IHHHHHIIIHH",
+                0x04034B50, VERSION_NEEDED, flags, method, DOS_TIME, DOS_DATE,
+                crc, len(payload), size, len(name), 0
+            ))
+            out.write(name)
+            out.write(payload)
+            central.append(struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50, VERSION_MADE_BY, VERSION_NEEDED, flags, method, DOS_TIME, DOS_DATE,
+                crc, len(payload), size, len(name), 0, 0, 0, 0, EXTERNAL_ATTR, offset
+            ) + name)
+
+        if len(central) > 0xFFFF:
+            raise OSError(f"{path}: {len(central)} members need ZIP64, which this writer does not produce")
+        directory_offset = out.tell()
+        directory = b"".join(central)
+        out.write(directory)
+        out.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(central), len(central), len(directory), directory_offset, 0))
+    os.replace(temp_path, path)
+    return hashes, counts
+
+
+def minify_members(members, jobs=None):
+    """members with CSS, templates, lang/pack JSON and pack lines minified in memory, and a savings report.
+
+    Sources on disk are only read; see minify_assets for what each minifier removes.
+    """
+    jobs = jobs or os.cpu_count() or 1
+
+    def task(member):
+        arcname, source = member
+        data = _read_source(source)
+        return arcname, source, len(data), minify_assets.minify(arcname, data)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(task, members))
+    out = []
+    files = []
+    for arcname, source, size, minified in results:
+        if minified is None:
+            out.append((arcname, source))
+            continue
+        out.append((arcname, minified))
+        files.append({"path": arcname, "size": size, "minified": len(minified)})
+    report = {
+        "version": MINIFY_REPORT_VERSION,
+        "totals": {
+            "files": len(files),
+            "size": sum(row["size"] for row in files),
+            "minified": sum(row["minified"] for row in files),
+        },
+        "files": files,
+    }
+    return out, report
+
+
+def write_minify_report(report, path=MINIFY_REPORT):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+        handle.write("\n")
+    totals = report["totals"]
+    saved = totals["size"] - totals["minified"]
+    print(
+        f"Minified {totals['files']} files: {totals['size'] / 1024:.0f} KB -> {totals['minified'] / 1024:.0f} KB "
+        f"({saved * 100 / (totals['size'] or 1):.0f}% saved); report in {path}"
+    )
+    for row in sorted(report["files"], key=lambda row: row["minified"] - row["size"])[:MINIFY_REPORT_TOP]:
+        print(f"  {row['path']}: {row['size']:,} -> {row['minified']:,} bytes (-{row['size'] - row['minified']:,})")
+
+
+def _sidecars(arcname, source):
+    """(arcname, source size, {suffix: compressed bytes}) for one text asset, before the pay-off check."""
+    data = _read_source(source)
+    # mtime=0 keeps the gzip header, and so the archive, reproducible.
+    out = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        out[".br"] = brotli.compress(data, quality=11)
+    return arcname, len(data), out
+
+
+def _pays_off(size, compressed_size):
+    return compressed_size <= size * SIDECAR_MAX_RATIO and size - compressed_size >= SIDECAR_MIN_SAVING
+
+
+def sidecar_members(members, jobs=None):
+    """members plus .gz (and, with brotli installed, .br) sidecars for text assets, and a savings report.
+
+    Sidecars are compressed at maximum level and only added when they pay off (see SIDECAR_MAX_RATIO
+    and SIDECAR_MIN_SAVING); the report lists every text asset with the sidecar sizes kept or None.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    texts = [(arcname, source) for arcname, source in members if os.path.splitext(arcname)[1].lower() in SIDECAR_EXTS]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        compressed = list(pool.map(lambda member: _sidecars(*member), texts))
+
+    out = list(members)
+    files = []
+    totals = {"files": len(texts), "size": 0, ".gz": 0, ".br": 0, "sidecars": 0}
+    for arcname, size, sidecars in compressed:
+        row = {"path": arcname, "size": size, "gzip": None, "brotli": None}
+        totals["size"] += size
+        for suffix, payload in sidecars.items():
+            served = size
+            if _pays_off(size, len(payload)):
+                out.append((f"{arcname}{suffix}", payload))
+                row["gzip" if suffix == ".gz" else "brotli"] = len(payload)
+                totals["sidecars"] += 1
+                served = len(payload)
+            totals[suffix] += served
+        files.append(row)
+    report = {
+        "version": SIDECAR_REPORT_VERSION,
+        "brotli": brotli is not None,
+        "maxRatio": SIDECAR_MAX_RATIO,
+        "minSaving": SIDECAR_MIN_SAVING,
+        "totals": totals,
+        "files": files,
+    }
+    return sorted(out), report
+
+
+def write_sidecar_report(report, path=SIDECAR_REPORT):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+        handle.write("\n")
+    totals = report["totals"]
+    size = totals["size"] or 1
+    served = f"gzip {totals['.gz'] / 1024:.0f} KB ({100 - totals['.gz'] * 100 / size:.0f}% saved)"
+    if report["brotli"]:
+        served += f", brotli {totals['.br'] / 1024:.0f} KB ({100 - totals['.br'] * 100 / size:.0f}% saved)"
     else:
-        if not should_include(full):
-            return
-        rel = os.path.relpath(full, ROOT)
-        arc = os.path.join(PREFIX, rel) if PREFIX else rel
-        zf.write(full, arc)
+        served += ", brotli not installed"
+    print(
+        f"Sidecars: {totals['sidecars']} for {totals['files']} text assets, {totals['size'] / 1024:.0f} KB "
+        f"served as {served}; report in {path}"
+    )
+
+
+def write_archive(path, incremental=False, jobs=None, members=None):
+    started = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    key = os.path.abspath(path)
+    archives = _read_manifest()
+    previous = _previous_members(path, archives.get(key)) if incremental else {}
+    hashes, counts = _write_zip(path, archive_members() if members is None else members, previous, jobs)
+
+    # Drop entries for archives that have since been deleted (e.g. benchmark scratch zips).
+    archives = {name: recorded for name, recorded in archives.items() if os.path.isfile(name)}
+    archives[key] = {"sha256": _sha256_file(path), "members": hashes}
+    _write_manifest(archives)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Wrote {path}: {len(hashes)} members ({counts['deflated']} deflated, {counts['stored']} stored, "
+        f"{counts['reused']} reused) in {elapsed:.2f}s with {jobs} job(s)"
+    )
+    return hashes
+
+
+def previous_release_files(path):
+    """{arcname: sha256} of a previous release, from its zip or from a delta manifest JSON."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return {
+                info.filename: _sha256_bytes(archive.read(info))
+                for info in archive.infolist()
+                if not info.is_dir()
+            }
+    with open(path, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("format") != DELTA_FORMAT or not isinstance(manifest.get("files"), dict):
+        raise ValueError(f"{path} is neither a zip nor a version {DELTA_FORMAT} delta manifest")
+    return manifest["files"]
 
 
-def write_archive(path):
+def write_delta(path, previous_files, jobs=None, members=None):
+    """Write a delta package holding members added or changed since previous_files, plus DELTA_MANIFEST.
+
+    The manifest lists the full new tree ({arcname: sha256}), the added, changed and deleted
+    paths, and is itself a valid previous_files source for the next release's delta.
+    """
+    started = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    if members is None:
+        members = archive_members()
+    files = {}
+    for arcname, source in members:
+        files[arcname] = _source_sha256(source)
+    if DELTA_MANIFEST in files:
+        raise ValueError(f"{DELTA_MANIFEST} is reserved for the delta manifest")
+    manifest = {
+        "format": DELTA_FORMAT,
+        "files": files,
+        "added": sorted(name for name in files if name not in previous_files),
+        "changed": sorted(name for name in files if name in previous_files and previous_files[name] != files[name]),
+        "deleted": sorted(name for name in previous_files if name not in files),
+    }
+    shipped = set(manifest["added"]) | set(manifest["changed"])
+    payload = (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8")
+    delta_members = [(name, source) for name, source in members if name in shipped]
+    delta_members.append((DELTA_MANIFEST, payload))
+    _write_zip(path, sorted(delta_members), {}, jobs)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Wrote {path}: {len(manifest['added'])} added, {len(manifest['changed'])} changed, "
+        f"{len(manifest['deleted'])} deleted of {len(files)} files in {elapsed:.2f}s"
+    )
+    return manifest
+
+
+def copy_archive(source, path):
+    """Hard-link path to the built archive, falling back to a copy (e.g. across filesystems)."""
     parent = os.path.dirname(path)
     if parent and not os.path.exists(parent):
         os.makedirs(parent, exist_ok=True)
-    if os.path.exists(path):
-        os.remove(path)
-    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for item in INCLUDE:
-            add_path(zf, item)
-    print(f"Wrote {path}")
+    temp_path = f"{path}.tmp"
+    if os.path.lexists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(source, temp_path)
+        how = "Linked"
+    except OSError:
+        shutil.copyfile(source, temp_path)
+        how = "Copied"
+    os.replace(temp_path, path)
+    print(f"{how} {path}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Package the system as reproducible Foundry install zips.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse compressed members of the previous archive whose source files are unchanged."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Members compressed concurrently (default: CPU count; 1 compresses serially)."
+    )
+    parser.add_argument(
+        "--delta-from",
+        metavar="PREVIOUS",
+        help="Previous release zip or delta manifest; also write a delta package against it."
+    )
+    parser.add_argument(
+        "--delta-out",
+        default=OUT_DELTA,
+        help=f"Delta package path (default: {os.path.relpath(OUT_DELTA, ROOT)})."
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Minify CSS and templates and compact lang/pack JSON in the archive; sources are not modified."
+    )
+    parser.add_argument(
+        "--minify-report",
+        default=MINIFY_REPORT,
+        help=f"Minification savings report path (default: {os.path.relpath(MINIFY_REPORT, ROOT)})."
+    )
+    parser.add_argument(
+        "--sidecars",
+        action="store_true",
+        help="Add precompressed .gz (and .br with brotli installed) sidecars next to text assets."
+    )
+    parser.add_argument(
+        "--sidecar-report",
+        default=SIDECAR_REPORT,
+        help=f"Sidecar savings report path (default: {os.path.relpath(SIDECAR_REPORT, ROOT)})."
+    )
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be >= 1")
+    # Read the previous release first: it may be one of the outputs about to be overwritten.
+    previous_files = None
+    if args.delta_from:
+        try:
+            previous_files = previous_release_files(args.delta_from)
+        except (OSError, ValueError, zipfile.BadZipFile) as err:
+            parser.error(f"--delta-from: {err}")
+
+    members = archive_members()
+    if args.minify:
+        try:
+            members, report = minify_members(members, jobs=args.jobs)
+        except ValueError as err:
+            sys.exit(f"build_system_zip: minify failed: {err}")
+        write_minify_report(report, args.minify_report)
+    # Sidecars compress the minified members when both stages run.
+    if args.sidecars:
+        members, report = sidecar_members(members, jobs=args.jobs)
+        write_sidecar_report(report, args.sidecar_report)
+
     # Emit both canonical release zip and local-update-friendly zips.
     outputs = []
     for candidate in (OUT_SYSTEM, OUT_LOCAL, OUT_SIBLING):
         if candidate not in outputs:
             outputs.append(candidate)
 
+    # Compress once; the other destinations get the same bytes.
+    built = None
     for output in outputs:
         try:
-            write_archive(output)
+            if built is None:
+                write_archive(output, incremental=args.incremental, jobs=args.jobs, members=members)
+                built = output
+            else:
+                copy_archive(built, output)
         except OSError as err:
             # Do not fail the build if sibling destination is not writable.
             print(f"Skipped {output}: {err}")
 
+    if previous_files is not None:
+        write_delta(args.delta_out, previous_files, jobs=args.jobs, members=members)
+
 
 if __name__ == "__main__":
     main()
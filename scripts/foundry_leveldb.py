@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Write Foundry VTT (v11+) LevelDB compendium directories from in-memory pack documents.
+
+Foundry converts NeDB `.db` packs to LevelDB on first load; emitting the LevelDB layout at build
+time skips that migration. The writer produces a minimal, valid database: a single write-ahead log
+holding every key, a MANIFEST that points at it and a CURRENT file. LevelDB replays the log into
+its own tables the first time the database is opened.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+
+# Document type -> LevelDB sublevel name used by Foundry for the pack's primary documents.
+COLLECTION_BY_TYPE = {
+    "Actor": "actors",
+    "Adventure": "adventures",
+    "Cards": "cards",
+    "Item": "items",
+    "JournalEntry": "journal",
+    "Macro": "macros",
+    "Playlist": "playlists",
+    "RollTable": "tables",
+    "Scene": "scenes",
+}
+
+# Document type -> {embedded field: embedded document type}.
+EMBEDDED_BY_TYPE = {
+    "Actor": {"items": "Item", "effects": "ActiveEffect"},
+    "Item": {"effects": "ActiveEffect"},
+    "JournalEntry": {"pages": "JournalEntryPage"},
+    "RollTable": {"results": "TableResult"},
+}
+
+BLOCK_SIZE = 32768
+HEADER_SIZE = 7
+RECORD_FULL = 1
+RECORD_FIRST = 2
+RECORD_MIDDLE = 3
+RECORD_LAST = 4
+VALUE_TYPE = 1
+MANIFEST_NUMBER = 2
+LOG_NUMBER = 3
+COMPARATOR = b"leveldb.BytewiseComparator"
+# VersionEdit tags from leveldb/db/version_edit.cc.
+TAG_COMPARATOR = 1
+TAG_LOG_NUMBER = 2
+TAG_NEXT_FILE_NUMBER = 3
+TAG_LAST_SEQUENCE = 4
+CRC_MASK_DELTA = 0xA282EAD8
+
+
+def _crc32c_table() -> list[int]:
+    table = []
+    for index in range(256):
+        crc = index
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC32C_TABLE = _crc32c_table()
+
+
+def crc32c(payload: bytes) -> int:
+    crc = 0xFFFFFFFF
+    for byte in payload:
+        crc = CRC32C_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def _masked_crc(payload: bytes) -> int:
+    crc = crc32c(payload)
+    return ((((crc >> 15) | (crc << 17)) & 0xFFFFFFFF) + CRC_MASK_DELTA) & 0xFFFFFFFF
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _length_prefixed(payload: bytes) -> bytes:
+    return _varint(len(payload)) + payload
+
+
+def _log_records(payload: bytes, offset: int = 0) -> tuple[bytes, int]:
+    """Frame one logical record in the LevelDB log format, starting at the given file offset."""
+    out = bytearray()
+    first = True
+    while True:
+        leftover = BLOCK_SIZE - offset % BLOCK_SIZE
+        if leftover < HEADER_SIZE:
+            out += b"\x00" * leftover
+            offset += leftover
+            leftover = BLOCK_SIZE
+        available = leftover - HEADER_SIZE
+        fragment, payload = payload[:available], payload[available:]
+        last = not payload
+        if first and last:
+            record_type = RECORD_FULL
+        elif first:
+            record_type = RECORD_FIRST
+        elif last:
+            record_type = RECORD_LAST
+        else:
+            record_type = RECORD_MIDDLE
+        header = struct.pack("<IHB", _masked_crc(bytes([record_type]) + fragment), len(fragment), record_type)
+        out += header + fragment
+        offset += HEADER_SIZE + len(fragment)
+        first = False
+        if last:
+            return bytes(out), offset
+
+
+def _write_batch(entries: list[tuple[bytes, bytes]], sequence: int) -> bytes:
+    out = bytearray(struct.pack("<QI", sequence, len(entries)))
+    for key, value in entries:
+        out.append(VALUE_TYPE)
+        out += _length_prefixed(key)
+        out += _length_prefixed(value)
+    return bytes(out)
+
+
+def _version_edit(last_sequence: int) -> bytes:
+    return b"".join([
+        _varint(TAG_COMPARATOR) + _length_prefixed(COMPARATOR),
+        _varint(TAG_LOG_NUMBER) + _varint(LOG_NUMBER),
+        _varint(TAG_NEXT_FILE_NUMBER) + _varint(LOG_NUMBER + 1),
+        _varint(TAG_LAST_SEQUENCE) + _varint(last_sequence),
+    ])
+
+
+def _encode_value(doc: dict) -> bytes:
+    return json.dumps(doc, ensure_ascii=False).encode("utf-8")
+
+
+def _document_entries(doc: dict, document_type: str, sublevel: str, key_prefix: str) -> list[tuple[bytes, bytes]]:
+    """Split one document into its own key plus keys for each embedded document, recursively."""
+    stored = dict(doc)
+    entries: list[tuple[bytes, bytes]] = []
+    key = f"{key_prefix}{doc['_id']}"
+    for field, embedded_type in EMBEDDED_BY_TYPE.get(document_type, {}).items():
+        children = doc.get(field)
+        if not isinstance(children, list):
+            continue
+        stored[field] = [child["_id"] for child in children]
+        for child in children:
+            entries.extend(_document_entries(child, embedded_type, f"{sublevel}.{field}", f"{key}."))
+    entries.insert(0, (f"!{sublevel}!{key}".encode("utf-8"), _encode_value(stored)))
+    return entries
+
+
+def pack_entries(document_type: str, docs: list[dict]) -> list[tuple[bytes, bytes]]:
+    """Return (key, value) pairs for a pack the way Foundry stores them, sorted by key."""
+    collection = COLLECTION_BY_TYPE[document_type]
+    entries: list[tuple[bytes, bytes]] = []
+    for doc in docs:
+        entries.extend(_document_entries(doc, document_type, collection, ""))
+    return sorted(entries)
+
+
+def write_leveldb(directory: Path, entries: list[tuple[bytes, bytes]]) -> None:
+    """Atomically replace directory with a LevelDB database containing exactly entries."""
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=directory.parent, prefix=f".{directory.name}.", suffix=".tmp"))
+    try:
+        log_payload, _ = _log_records(_write_batch(entries, 1))
+        (staging / f"{LOG_NUMBER:06d}.log").write_bytes(log_payload)
+        manifest_payload, _ = _log_records(_version_edit(len(entries)))
+        (staging / f"MANIFEST-{MANIFEST_NUMBER:06d}").write_bytes(manifest_payload)
+        (staging / "CURRENT").write_text(f"MANIFEST-{MANIFEST_NUMBER:06d}\n", encoding="ascii")
+        os.chmod(staging, 0o755)
+        if directory.exists():
+            shutil.rmtree(directory)
+        os.replace(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
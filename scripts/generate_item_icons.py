@@ -5,20 +5,48 @@ The visual style is dark/noir with distressed highlights to match Laundry mood.
 """
 from __future__ import annotations
 
+import argparse
+import functools
 import hashlib
+import inspect
+import io
 import json
 import math
+import os
 import random
 import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
 
+import PIL
 from PIL import Image, ImageChops, ImageColor, ImageDraw, ImageEnhance, ImageFilter, ImageOps
 
-ROOT = Path(__file__).resolve().parents[1]
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the optional "numpy" rasterizer.
+    np = None
+
+ROOT = Path(os.environ.get("LAUNDRY_RPG_ROOT") or Path(__file__).resolve().parents[1]).resolve()
 ICONS_ROOT = ROOT / "icons" / "generated"
 EXTRACTION_ROOT = ROOT / "sources" / "extraction"
 EXTRACTION_STAGES = ("reviewed", "normalized", "raw")
 ICON_SIZE = 512
+ICON_MANIFEST = ICONS_ROOT / "manifest.json"
+RENDER_CACHE = ROOT / ".cache" / "icons" / "render-cache.json"
+RENDER_CACHE_VERSION = 1
+GENERATED_SUFFIXES = {".webp", ".png", ".svg"}
+RASTERIZERS = ("pil", "numpy")
+ENCODE_QUALITY = 88
+ENCODE_METHOD = 4
+TUNED_QUALITIES = (1, *range(5, 100, 5))
+TUNED_SLOW_METHOD = 5
+SSIM_WINDOW = 7
+
+# (per-icon byte budget, SSIM floor); (None, None) keeps the fixed encoder settings.
+EncodeTarget = tuple[int | None, float | None]
+# (name, item type, motif, rasterizer, variant sizes, encode target)
+IconTask = tuple[str, str, str, str, tuple[int, ...], EncodeTarget]
 
 SOURCES = [
     ("skills.json", "skill"),
@@ -272,14 +300,89 @@ def write_json(path: Path, payload: list[dict]) -> None:
     path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
 
 
-def _clear_generated_dirs() -> None:
+def _clear_generated_dirs(keep: set[Path] | None = None) -> int:
+    keep = keep or set()
+    removed = 0
     dirs = set(TYPE_DIR.values()) | {"_defaults"}
     for sub in dirs:
         path = ICONS_ROOT / sub
         path.mkdir(parents=True, exist_ok=True)
-        for file_path in path.glob("*"):
-            if file_path.is_file() and file_path.suffix.lower() in {".webp", ".png", ".svg"}:
+        for file_path in path.rglob("*"):
+            if file_path in keep:
+                continue
+            if file_path.is_file() and file_path.suffix.lower() in GENERATED_SUFFIXES:
                 file_path.unlink()
+                removed += 1
+        for size_dir in path.iterdir():
+            if size_dir.is_dir() and not any(size_dir.iterdir()):
+                size_dir.rmdir()
+    return removed
+
+
+def _variant_path(master: Path, size: int) -> Path:
+    return master.parent / str(size) / master.name
+
+
+def _system_path(path: Path) -> str:
+    return f"systems/laundry-rpg/{path.relative_to(ROOT).as_posix()}"
+
+
+def write_icon_manifest(cache: dict[str, dict]) -> None:
+    """Map every master icon's system path to its downscaled variants, keyed by pixel size."""
+    manifest: dict[str, dict[str, str]] = {}
+    all_sizes = {ICON_SIZE}
+    for rel, entry in sorted(cache.items()):
+        master = ROOT / rel
+        sizes = sorted(int(size) for size in (entry.get("variants") or {}))
+        variants = {str(size): _system_path(_variant_path(master, size)) for size in sizes}
+        variants[str(ICON_SIZE)] = _system_path(master)
+        manifest[_system_path(master)] = variants
+        all_sizes.update(sizes)
+    payload = {"version": 1, "sizes": sorted(all_sizes), "icons": manifest}
+    ICON_MANIFEST.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def _format_bytes(count: int) -> str:
+    return f"{count / 1024:.1f} KiB"
+
+
+def _size_report() -> list[str]:
+    """Summarise generated icon payload per type directory, split into masters and each variant size."""
+    lines: list[str] = []
+    grand_total = 0
+    for sub in sorted(set(TYPE_DIR.values()) | {"_defaults"}):
+        path = ICONS_ROOT / sub
+        if not path.is_dir():
+            continue
+        masters = [file for file in path.iterdir() if file.is_file() and file.suffix.lower() in GENERATED_SUFFIXES]
+        master_bytes = sum(file.stat().st_size for file in masters)
+        parts = [f"{len(masters)} icons {_format_bytes(master_bytes)}"]
+        total = master_bytes
+        for size_dir in sorted((d for d in path.iterdir() if d.is_dir() and d.name.isdigit()), key=lambda d: int(d.name)):
+            size_bytes = sum(file.stat().st_size for file in size_dir.iterdir() if file.is_file())
+            parts.append(f"{size_dir.name}px {_format_bytes(size_bytes)}")
+            total += size_bytes
+        grand_total += total
+        lines.append(f"size {sub}: {', '.join(parts)}; total {_format_bytes(total)}")
+    lines.append(f"size total: {_format_bytes(grand_total)}")
+    return lines
+
+
+def _read_render_cache() -> dict[str, dict]:
+    try:
+        payload = json.loads(RENDER_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != RENDER_CACHE_VERSION:
+        return {}
+    entries = payload.get("icons")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_render_cache(entries: dict[str, dict]) -> None:
+    RENDER_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": RENDER_CACHE_VERSION, "icons": dict(sorted(entries.items()))}
+    RENDER_CACHE.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
 
 
 def _compose_rotated_sprite(
@@ -302,22 +405,54 @@ def _compose_rotated_sprite(
     layer.alpha_composite(working, (x, y))
 
 
-def _paint_background(canvas: Image.Image, palette: dict[str, str], rng: random.Random) -> None:
-    size = canvas.width
+def _palette_key(palette: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted(palette.items()))
 
-    angle = rng.randint(-25, 25)
-    linear_mask = Image.linear_gradient("L").resize((size, size), Image.Resampling.BICUBIC)
-    linear_mask = linear_mask.rotate(angle, expand=False)
 
+# Invariant layers are memoized per palette/size and shared across icons; callers must treat
+# the returned images as read-only.
+@functools.lru_cache(maxsize=None)
+def _background_base_layer(palette_key: tuple[tuple[str, str], ...], size: int) -> Image.Image:
+    """The unrotated bg1 -> bg2 gradient; _paint_background rotates a copy per icon."""
+    palette = dict(palette_key)
+    gradient = Image.linear_gradient("L").resize((size, size), Image.Resampling.BICUBIC)
     bg_a = Image.new("RGBA", (size, size), _rgba(palette["bg1"]))
     bg_b = Image.new("RGBA", (size, size), _rgba(palette["bg2"]))
-    base = Image.composite(bg_b, bg_a, linear_mask)
-    canvas.alpha_composite(base)
+    return Image.composite(bg_b, bg_a, gradient)
 
+
+@functools.lru_cache(maxsize=None)
+def _glow_layers(palette_key: tuple[tuple[str, str], ...], size: int) -> tuple[Image.Image, Image.Image]:
+    palette = dict(palette_key)
     radial = Image.radial_gradient("L").resize((size, size), Image.Resampling.BICUBIC)
     radial = ImageOps.invert(radial)
     glow_mask = radial.point(lambda p: int(p * 0.72))
     glow = Image.new("RGBA", (size, size), _rgba(palette["bg3"], 145))
+    return glow, glow_mask
+
+
+@functools.lru_cache(maxsize=None)
+def _vignette_layers(size: int) -> tuple[Image.Image, Image.Image]:
+    vignette_mask = Image.new("L", (size, size), 255)
+    vd = ImageDraw.Draw(vignette_mask)
+    margin = int(size * 0.075)
+    vd.ellipse((margin, margin, size - margin, size - margin), fill=130)
+    vignette_mask = vignette_mask.filter(ImageFilter.GaussianBlur(radius=size * 0.09))
+
+    vignette = Image.new("RGBA", (size, size), (0, 0, 0, 185))
+    return vignette, vignette_mask
+
+
+def _paint_background(canvas: Image.Image, palette: dict[str, str], rng: random.Random) -> None:
+    size = canvas.width
+    palette_key = _palette_key(palette)
+
+    angle = rng.randint(-25, 25)
+    # Nearest-neighbour rotation commutes with the per-pixel composite, and the uncovered corners
+    # take bg1 as a rotated gradient mask's zeros would, so this matches compositing per angle.
+    canvas.alpha_composite(_background_base_layer(palette_key, size).rotate(angle, fillcolor=_rgba(palette["bg1"])))
+
+    glow, glow_mask = _glow_layers(palette_key, size)
     canvas.paste(glow, (0, 0), glow_mask)
 
     smoke_layer = Image.new("RGBA", (size, size), (0, 0, 0, 0))
@@ -334,19 +469,98 @@ def _paint_background(canvas: Image.Image, palette: dict[str, str], rng: random.
     smoke_layer = smoke_layer.filter(ImageFilter.GaussianBlur(radius=size * 0.04))
     canvas.alpha_composite(smoke_layer)
 
-    vignette_mask = Image.new("L", (size, size), 255)
-    vd = ImageDraw.Draw(vignette_mask)
-    margin = int(size * 0.075)
-    vd.ellipse((margin, margin, size - margin, size - margin), fill=130)
-    vignette_mask = vignette_mask.filter(ImageFilter.GaussianBlur(radius=size * 0.09))
-
-    vignette = Image.new("RGBA", (size, size), (0, 0, 0, 185))
+    vignette, vignette_mask = _vignette_layers(size)
     canvas.paste(vignette, (0, 0), vignette_mask)
 
 
-def _add_global_grit(canvas: Image.Image, palette: dict[str, str], rng: random.Random) -> None:
+def _numpy_rng(rng: random.Random):
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def _numpy_ellipse_field(
+    gen,
+    count: int,
+    cx_range: tuple[int, int],
+    cy_range: tuple[int, int],
+    rx_range: tuple[int, int],
+    ry_range: tuple[int, int] | None,
+    alpha_range: tuple[int, int],
+    color: str,
+):
+    """Draw a whole field of splats at once; ranges are inclusive like random.randint."""
+    cx = gen.integers(cx_range[0], cx_range[1], size=count, endpoint=True)
+    cy = gen.integers(cy_range[0], cy_range[1], size=count, endpoint=True)
+    rx = gen.integers(rx_range[0], rx_range[1], size=count, endpoint=True)
+    ry = rx if ry_range is None else gen.integers(ry_range[0], ry_range[1], size=count, endpoint=True)
+    alpha = gen.integers(alpha_range[0], alpha_range[1], size=count, endpoint=True)
+    boxes = np.stack([cx - rx, cy - ry, cx + rx, cy + ry], axis=1)
+    colors = np.empty((count, 4), dtype=np.uint8)
+    colors[:, :3] = _rgba(color)[:3]
+    colors[:, 3] = alpha
+    return boxes, colors
+
+
+@functools.lru_cache(maxsize=None)
+def _ellipse_stamp(span_x: int, span_y: int):
+    """Pixel offsets covered by an ellipse whose inclusive bbox spans span_x by span_y."""
+    axis_x = span_x / 2 + 0.5
+    axis_y = span_y / 2 + 0.5
+    dy, dx = np.mgrid[0:span_y + 1, 0:span_x + 1]
+    inside = ((dx - span_x / 2) / axis_x) ** 2 + ((dy - span_y / 2) / axis_y) ** 2 <= 1.0
+    return dx[inside].astype(np.int32), dy[inside].astype(np.int32)
+
+
+def _numpy_splat_layer(size: tuple[int, int], fields) -> Image.Image:
+    """Rasterize (boxes, colors) fields onto a transparent layer in one pass, later splats on top."""
+    width, height = size
+    boxes = np.concatenate([field[0] for field in fields]).astype(np.int32)
+    colors = np.ascontiguousarray(np.concatenate([field[1] for field in fields])).view(np.uint32).ravel()
+    spans = boxes[:, 2:] - boxes[:, :2]
+
+    # winner holds 1 + index of the last splat covering each pixel (0 = uncovered).
+    winner = np.zeros(width * height, dtype=np.int32)
+    for span in np.unique(spans, axis=0):
+        members = np.flatnonzero((spans == span).all(axis=1)).astype(np.int32)
+        dx, dy = _ellipse_stamp(int(span[0]), int(span[1]))
+        xs = boxes[members, 0, None] + dx
+        ys = boxes[members, 1, None] + dy
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        owners = np.broadcast_to(members[:, None] + 1, xs.shape)
+        np.maximum.at(winner, (ys * width + xs)[inside], owners[inside])
+
+    pixels = np.zeros(width * height, dtype=np.uint32)
+    covered = np.flatnonzero(winner)
+    pixels[covered] = colors[winner[covered] - 1]
+    return Image.fromarray(pixels.view(np.uint8).reshape(height, width, 4))
+
+
+def _add_global_grit(
+    canvas: Image.Image,
+    palette: dict[str, str],
+    rng: random.Random,
+    rasterizer: str = "pil",
+) -> None:
     size = canvas.width
 
+    if rasterizer == "numpy":
+        gen = _numpy_rng(rng)
+        grime = _numpy_splat_layer((size, size), [
+            _numpy_ellipse_field(gen, 950, (0, size - 1), (0, size - 1), (1, 3), None, (8, 28), palette["outline"]),
+            _numpy_ellipse_field(
+                gen,
+                24,
+                (0, size),
+                (0, size),
+                (size // 30, size // 14),
+                (size // 30, size // 12),
+                (25, 55),
+                palette["metal_shadow"],
+            ),
+        ])
+        grime = grime.filter(ImageFilter.GaussianBlur(radius=1.1))
+        canvas.alpha_composite(grime)
+        return
+
     grime = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     gd = ImageDraw.Draw(grime)
     for _ in range(950):
@@ -1382,6 +1596,7 @@ def _add_subject_effects(
     palette: dict[str, str],
     rng: random.Random,
     motif: str,
+    rasterizer: str = "pil",
 ) -> None:
     alpha = subject.split()[-1]
 
@@ -1409,11 +1624,17 @@ def _add_subject_effects(
         width = x1 - x0
         height = y1 - y0
 
-        for _ in range(72):
-            x = rng.randint(x0, x1)
-            y = rng.randint(y0, y1)
-            r = rng.randint(1, 3)
-            dd.ellipse((x - r, y - r, x + r, y + r), fill=_rgba(palette["metal_shadow"], rng.randint(45, 95)))
+        if rasterizer == "numpy":
+            distress = _numpy_splat_layer(canvas.size, [
+                _numpy_ellipse_field(_numpy_rng(rng), 72, (x0, x1), (y0, y1), (1, 3), None, (45, 95), palette["metal_shadow"])
+            ])
+            dd = ImageDraw.Draw(distress)
+        else:
+            for _ in range(72):
+                x = rng.randint(x0, x1)
+                y = rng.randint(y0, y1)
+                r = rng.randint(1, 3)
+                dd.ellipse((x - r, y - r, x + r, y + r), fill=_rgba(palette["metal_shadow"], rng.randint(45, 95)))
 
         scratches = 10 if motif in {"pistol", "rifle", "knife", "baton", "taser"} else 6
         for _ in range(scratches):
@@ -1443,13 +1664,27 @@ def _add_subject_effects(
             canvas.alpha_composite(smoke)
 
         if motif in {"rune_circle", "orb", "flame", "tentacle", "skull"}:
-            aura = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-            ad = ImageDraw.Draw(aura)
-            for _ in range(22):
-                cx = rng.randint(x0 - 20, x1 + 20)
-                cy = rng.randint(y0 - 20, y1 + 20)
-                r = rng.randint(4, 10)
-                ad.ellipse((cx - r, cy - r, cx + r, cy + r), fill=_rgba(palette["accent"], rng.randint(70, 140)))
+            if rasterizer == "numpy":
+                aura = _numpy_splat_layer(canvas.size, [
+                    _numpy_ellipse_field(
+                        _numpy_rng(rng),
+                        22,
+                        (x0 - 20, x1 + 20),
+                        (y0 - 20, y1 + 20),
+                        (4, 10),
+                        None,
+                        (70, 140),
+                        palette["accent"],
+                    )
+                ])
+            else:
+                aura = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
+                ad = ImageDraw.Draw(aura)
+                for _ in range(22):
+                    cx = rng.randint(x0 - 20, x1 + 20)
+                    cy = rng.randint(y0 - 20, y1 + 20)
+                    r = rng.randint(4, 10)
+                    ad.ellipse((cx - r, cy - r, cx + r, cy + r), fill=_rgba(palette["accent"], rng.randint(70, 140)))
             aura = aura.filter(ImageFilter.GaussianBlur(radius=2.4))
             canvas.alpha_composite(aura)
 
@@ -1525,7 +1760,7 @@ def _paint_subject_texture(subject: Image.Image, palette: dict[str, str], rng: r
     subject.paste(lift, (0, 0), lift_mask)
 
 
-def build_icon(name: str, item_type: str, motif: str) -> Image.Image:
+def build_icon(name: str, item_type: str, motif: str, rasterizer: str = "pil") -> Image.Image:
     rng = _rng_for(item_type, name)
     palette = _palette_for(item_type)
 
@@ -1533,26 +1768,254 @@ def build_icon(name: str, item_type: str, motif: str) -> Image.Image:
     _paint_background(canvas, palette, rng)
 
     subject = _render_motif(motif, palette, rng)
-    _add_subject_effects(canvas, subject, palette, rng, motif)
-    _add_global_grit(canvas, palette, rng)
+    _add_subject_effects(canvas, subject, palette, rng, motif, rasterizer)
+    _add_global_grit(canvas, palette, rng, rasterizer)
 
     return canvas
 
 
-def _save_icon(image: Image.Image, path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    image.save(path, format="WEBP", quality=88, method=4)
+def _encode_webp(image: Image.Image, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", **options)
+    return buffer.getvalue()
+
+
+def _luma_array(image: Image.Image):
+    return np.asarray(image.convert("RGB").convert("L"), dtype=np.float64)
+
+
+def _box_mean(values, window: int):
+    summed = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    total = summed[window:, window:] - summed[:-window, window:] - summed[window:, :-window] + summed[:-window, :-window]
+    return total / (window * window)
+
+
+def _ssim(reference, payload: bytes) -> float:
+    """Mean structural similarity between a reference luma array and an encoded image."""
+    other = _luma_array(Image.open(io.BytesIO(payload)))
+    window = min(SSIM_WINDOW, *reference.shape)
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    mean_a = _box_mean(reference, window)
+    mean_b = _box_mean(other, window)
+    var_a = _box_mean(reference * reference, window) - mean_a * mean_a
+    var_b = _box_mean(other * other, window) - mean_b * mean_b
+    covar = _box_mean(reference * other, window) - mean_a * mean_b
+    numerator = (2 * mean_a * mean_b + c1) * (2 * covar + c2)
+    denominator = (mean_a * mean_a + mean_b * mean_b + c1) * (var_a + var_b + c2)
+    return float((numerator / denominator).mean())
+
+
+def _bisect_first(count: int, predicate) -> int:
+    """Index of the first position where a monotonic false→true predicate holds (count if never)."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _encode_tuned(image: Image.Image, byte_budget: int | None, ssim_floor: float | None) -> bytes:
+    """Pick the smallest lossy encoding meeting the SSIM floor, capped by the byte budget.
+
+    Quality is bisected with the fast encoder method, then the picked quality is re-encoded with the
+    slower, tighter method; lossless is kept whenever it beats the lossy pick.
+    """
+    encoded: dict[tuple[int, int], bytes] = {}
+    scores: dict[tuple[int, int], float] = {}
+    reference = _luma_array(image) if ssim_floor is not None else None
+
+    def lossy(index: int, method: int = ENCODE_METHOD) -> bytes:
+        if (index, method) not in encoded:
+            encoded[index, method] = _encode_webp(image, quality=TUNED_QUALITIES[index], method=method)
+        return encoded[index, method]
+
+    def meets_floor(index: int, method: int = ENCODE_METHOD) -> bool:
+        if ssim_floor is None:
+            return True
+        if (index, method) not in scores:
+            scores[index, method] = _ssim(reference, lossy(index, method))
+        return scores[index, method] >= ssim_floor
+
+    last = len(TUNED_QUALITIES) - 1
+    index = last if ssim_floor is None else min(_bisect_first(len(TUNED_QUALITIES), meets_floor), last)
+    if byte_budget is not None and len(lossy(index)) > byte_budget:
+        # The budget wins over the floor: fall back to the best quality that still fits.
+        index = max(_bisect_first(len(TUNED_QUALITIES), lambda i: len(lossy(i)) > byte_budget) - 1, 0)
+    choice = lossy(index)
+    tighter = lossy(index, TUNED_SLOW_METHOD)
+    if len(tighter) < len(choice) and (meets_floor(index, TUNED_SLOW_METHOD) or not meets_floor(index)):
+        choice = tighter
+
+    lossless = _encode_webp(image, lossless=True, quality=50, method=ENCODE_METHOD)
+    if len(lossless) < len(choice):
+        return lossless
+    return choice
+
+
+def _encode_icon(image: Image.Image, target: EncodeTarget = (None, None)) -> bytes:
+    byte_budget, ssim_floor = target
+    if byte_budget is None and ssim_floor is None:
+        return _encode_webp(image, quality=ENCODE_QUALITY, method=ENCODE_METHOD)
+    return _encode_tuned(image, byte_budget, ssim_floor)
+
+
+def _downscale_icon(master: Image.Image, size: int) -> Image.Image:
+    return master.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def _render_icon_payload(task: IconTask) -> list[bytes]:
+    """Render one master icon and encode it followed by each downscaled variant."""
+    name, item_type, motif, rasterizer, variant_sizes, target = task
+    master = build_icon(name, item_type, motif, rasterizer)
+    # The byte budget is sized for the master; thumbnails only honour the SSIM floor.
+    variant_target = (None, target[1])
+    return [
+        _encode_icon(master, target),
+        *(_encode_icon(_downscale_icon(master, size), variant_target) for size in variant_sizes),
+    ]
+
+
+def _render_payloads(tasks: list[IconTask], executor: Executor | None) -> list[list[bytes]]:
+    if executor is None:
+        return [_render_icon_payload(task) for task in tasks]
+    return list(executor.map(_render_icon_payload, tasks, chunksize=4))
+
 
+def _referenced_functions(code, namespace: dict) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _referenced_functions(const, namespace)
+    # Memoized helpers are lru_cache wrappers; fingerprint the function they wrap.
+    return {name for name in names if inspect.isfunction(inspect.unwrap(namespace.get(name)))}
 
-def generate_for_file(source_path: Path, item_type: str) -> tuple[int, int]:
+
+@functools.lru_cache(maxsize=None)
+def _code_fingerprint(func) -> str:
+    """Hash the source of `func` and every module-level function it transitively calls."""
+    namespace = func.__globals__
+    pending = [func.__name__]
+    seen: set[str] = set()
+    digest = hashlib.sha256()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        target = inspect.unwrap(namespace[name])
+        if target.__module__ != func.__module__:
+            continue
+        digest.update(inspect.getsource(target).encode("utf-8"))
+        pending.extend(sorted(_referenced_functions(target.__code__, namespace)))
+    return digest.hexdigest()
+
+
+def _icon_cache_key(task: IconTask) -> str:
+    name, item_type, motif, rasterizer, _, target = task
+    payload = {
+        "name": name,
+        "type": item_type,
+        "motif": motif,
+        "rasterizer": rasterizer,
+        "size": ICON_SIZE,
+        "palette": _palette_for(item_type),
+        "renderer": _code_fingerprint(MOTIF_RENDERERS.get(motif, _motif_gadget)),
+        "pipeline": _code_fingerprint(_render_icon_payload),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__ if rasterizer == "numpy" or target[1] is not None else None,
+        "encoding": list(target),
+    }
+    return _stable_hash(json.dumps(payload, sort_keys=True))
+
+
+def _cached_files_match(entry: dict, file_out: Path, variant_sizes: tuple[int, ...]) -> bool:
+    recorded = entry.get("variants") if isinstance(entry.get("variants"), dict) else {}
+    if set(recorded) != {str(size) for size in variant_sizes}:
+        return False
+    expected = [(file_out, entry.get("sha256"))]
+    expected.extend((_variant_path(file_out, size), recorded[str(size)]) for size in variant_sizes)
+    for path, digest in expected:
+        if not path.is_file() or hashlib.sha256(path.read_bytes()).hexdigest() != digest:
+            return False
+    return True
+
+
+def _materialize_icons(
+    jobs: list[tuple[Path, IconTask]],
+    executor: Executor | None,
+    timings: dict[str, float] | None,
+    cache: dict[str, dict],
+    claimed: set[Path],
+) -> int:
+    """Write every (path, task) job, reusing cached files whose render inputs are unchanged."""
+    started = time.perf_counter()
+    pending: dict[Path, tuple[str, IconTask]] = {}
+    for file_out, task in jobs:
+        key = _icon_cache_key(task)
+        variant_sizes = task[4]
+        rel = file_out.relative_to(ROOT).as_posix()
+        entry = cache.get(rel) if isinstance(cache.get(rel), dict) else {}
+        claimed.add(file_out)
+        claimed.update(_variant_path(file_out, size) for size in variant_sizes)
+        if entry.get("key") == key and _cached_files_match(entry, file_out, variant_sizes):
+            pending.pop(file_out, None)
+            continue
+        pending[file_out] = (key, task)
+    _record_timing(timings, "cache", started)
+
+    started = time.perf_counter()
+    payloads = _render_payloads([task for _, task in pending.values()], executor)
+    _record_timing(timings, "render", started)
+
+    started = time.perf_counter()
+    for (file_out, (key, task)), (master, *variants) in zip(pending.items(), payloads):
+        file_out.parent.mkdir(parents=True, exist_ok=True)
+        file_out.write_bytes(master)
+        variant_digests: dict[str, str] = {}
+        for size, payload in zip(task[4], variants):
+            variant_out = _variant_path(file_out, size)
+            variant_out.parent.mkdir(parents=True, exist_ok=True)
+            variant_out.write_bytes(payload)
+            variant_digests[str(size)] = hashlib.sha256(payload).hexdigest()
+        cache[file_out.relative_to(ROOT).as_posix()] = {
+            "key": key,
+            "sha256": hashlib.sha256(master).hexdigest(),
+            "variants": variant_digests,
+        }
+    _record_timing(timings, "write", started)
+    return len(pending)
+
+
+def _record_timing(timings: dict[str, float] | None, stage: str, started: float) -> None:
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - started)
+
+
+def generate_for_file(
+    source_path: Path,
+    item_type: str,
+    executor: Executor | None = None,
+    timings: dict[str, float] | None = None,
+    cache: dict[str, dict] | None = None,
+    claimed: set[Path] | None = None,
+    rasterizer: str = "pil",
+    variant_sizes: tuple[int, ...] = (),
+    target: EncodeTarget = (None, None),
+) -> tuple[int, int, int]:
+    started = time.perf_counter()
     data = json.loads(source_path.read_text(encoding="utf-8"))
     if not isinstance(data, list):
-        return 0, 0
+        return 0, 0, 0
 
     out_dir = ICONS_ROOT / TYPE_DIR.get(item_type, f"{item_type}s")
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    written = 0
+    planned: list[tuple[dict, Path]] = []
+    tasks: list[IconTask] = []
     for item in data:
         if not isinstance(item, dict):
             continue
@@ -1574,22 +2037,39 @@ def generate_for_file(source_path: Path, item_type: str) -> tuple[int, int]:
             }
 
         motif = _choose_motif(item_type, name, system)
-        image = build_icon(name, item_type, motif)
-
         slug = slugify(name)
         unique = hash_suffix(f"{item_type}:{name}")
-        file_out = out_dir / f"{slug}-{unique}.webp"
-        _save_icon(image, file_out)
+        planned.append((item, out_dir / f"{slug}-{unique}.webp"))
+        tasks.append((name, item_type, motif, rasterizer, variant_sizes, target))
+    _record_timing(timings, "plan", started)
+
+    rendered = _materialize_icons(
+        [(file_out, task) for (_, file_out), task in zip(planned, tasks)],
+        executor,
+        timings,
+        cache if cache is not None else {},
+        claimed if claimed is not None else set(),
+    )
 
+    started = time.perf_counter()
+    for item, file_out in planned:
         rel = file_out.relative_to(ROOT).as_posix()
         item["img"] = f"systems/laundry-rpg/{rel}"
-        written += 1
 
     write_json(source_path, data)
-    return len(data), written
-
-
-def generate_type_defaults() -> None:
+    _record_timing(timings, "write", started)
+    return len(data), len(planned), rendered
+
+
+def generate_type_defaults(
+    executor: Executor | None = None,
+    timings: dict[str, float] | None = None,
+    cache: dict[str, dict] | None = None,
+    claimed: set[Path] | None = None,
+    rasterizer: str = "pil",
+    variant_sizes: tuple[int, ...] = (),
+    target: EncodeTarget = (None, None),
+) -> int:
     defaults_dir = ICONS_ROOT / "_defaults"
     defaults_dir.mkdir(parents=True, exist_ok=True)
 
@@ -1603,31 +2083,132 @@ def generate_type_defaults() -> None:
         ("spell", "Spell", "rune_circle"),
     ]
 
-    for item_type, name, motif in defaults:
-        file_out = defaults_dir / f"{item_type}.webp"
-        image = build_icon(name, item_type, motif)
-        _save_icon(image, file_out)
+    return _materialize_icons(
+        [
+            (defaults_dir / f"{item_type}.webp", (name, item_type, motif, rasterizer, variant_sizes, target))
+            for item_type, name, motif in defaults
+        ],
+        executor,
+        timings,
+        cache if cache is not None else {},
+        claimed if claimed is not None else set(),
+    )
 
 
 def main() -> None:
-    _clear_generated_dirs()
-    generate_type_defaults()
-    print("wrote defaults in icons/generated/_defaults")
-
-    total_written = 0
-    for file_name, item_type in SOURCES:
-        source_paths = _iter_source_paths(file_name)
-        if not source_paths:
-            print(f"{file_name}: source not found")
-            continue
-
-        for source_path in source_paths:
-            total, written = generate_for_file(source_path, item_type)
-            rel = source_path.relative_to(ROOT).as_posix()
-            print(f"{rel}: updated {written}/{total} images")
-            total_written += written
-
-    print(f"done: generated/updated {total_written} item icons")
+    parser = argparse.ArgumentParser(description="Generate item icons and write image paths back to source JSON.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to render and encode icons (default: 1, serial)."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the render cache and re-render every icon."
+    )
+    parser.add_argument(
+        "--rasterizer",
+        choices=RASTERIZERS,
+        default="pil",
+        help="Backend for grit, distress and aura splat fields; 'numpy' draws and rasterizes them in bulk (default: pil)."
+    )
+    parser.add_argument(
+        "--variant-sizes",
+        default="",
+        help="Comma-separated thumbnail sizes (e.g. 64,128) downscaled from each master icon and listed in icons/generated/manifest.json (default: none, masters only)."
+    )
+    parser.add_argument(
+        "--byte-budget",
+        type=int,
+        help="Tune WEBP quality per icon so each master fits in this many bytes (default: fixed quality 88)."
+    )
+    parser.add_argument(
+        "--ssim-floor",
+        type=float,
+        help="Tune WEBP quality per icon to the smallest encoding whose SSIM stays at or above this value."
+    )
+    args = parser.parse_args()
+    if args.rasterizer == "numpy" and np is None:
+        parser.error("--rasterizer numpy requires NumPy to be installed")
+    try:
+        variant_sizes = tuple(sorted({int(part) for part in args.variant_sizes.split(",") if part.strip()}))
+    except ValueError:
+        parser.error("--variant-sizes must be a comma-separated list of integers")
+    if any(size <= 0 or size >= ICON_SIZE for size in variant_sizes):
+        parser.error(f"--variant-sizes must be between 1 and {ICON_SIZE - 1}")
+    if args.byte_budget is not None and args.byte_budget <= 0:
+        parser.error("--byte-budget must be positive")
+    if args.ssim_floor is not None:
+        if not 0 < args.ssim_floor <= 1:
+            parser.error("--ssim-floor must be in (0, 1]")
+        if np is None:
+            parser.error("--ssim-floor requires NumPy to be installed")
+    target = (args.byte_budget, args.ssim_floor)
+
+    timings: dict[str, float] = {}
+    run_started = time.perf_counter()
+    cache = {} if args.force else _read_render_cache()
+    claimed: set[Path] = set()
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        rendered = generate_type_defaults(
+            executor,
+            timings,
+            cache,
+            claimed,
+            args.rasterizer,
+            variant_sizes,
+            target,
+        )
+        print(f"wrote defaults in icons/generated/_defaults (rendered {rendered})")
+
+        total_written = 0
+        total_rendered = 0
+        for file_name, item_type in SOURCES:
+            source_paths = _iter_source_paths(file_name)
+            if not source_paths:
+                print(f"{file_name}: source not found")
+                continue
+
+            for source_path in source_paths:
+                total, written, rendered = generate_for_file(
+                    source_path,
+                    item_type,
+                    executor,
+                    timings,
+                    cache,
+                    claimed,
+                    args.rasterizer,
+                    variant_sizes,
+                    target,
+                )
+                rel = source_path.relative_to(ROOT).as_posix()
+                print(f"{rel}: updated {written}/{total} images (rendered {rendered})")
+                total_written += written
+                total_rendered += rendered
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    started = time.perf_counter()
+    removed = _clear_generated_dirs(keep=claimed)
+    claimed_rel = {path.relative_to(ROOT).as_posix() for path in claimed}
+    cache = {rel: entry for rel, entry in cache.items() if rel in claimed_rel}
+    _write_render_cache(cache)
+    if variant_sizes:
+        write_icon_manifest(cache)
+    else:
+        ICON_MANIFEST.unlink(missing_ok=True)
+    _record_timing(timings, "gc", started)
+
+    print(f"done: generated/updated {total_written} item icons, rendered {total_rendered}, removed {removed} orphans")
+    for line in _size_report():
+        print(line)
+    for stage, seconds in timings.items():
+        print(f"timing {stage}: {seconds:.2f}s")
+    print(f"timing total: {time.perf_counter() - run_started:.2f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Declarative field schemas for item `system` data, compiled into one normalizer function per type.
+
+Each schema is an ordered tuple of field specs. `compile_normalizer()` turns a schema into Python
+source with every coercion inlined (no per-field dispatch at run time) and execs it once, so the
+pack rebuild and the extraction staging script share the same rules without sharing a slow path.
+Field order matters: it is the order keys are written, which decides key order for fields that
+are missing from the source document.
+"""
+from __future__ import annotations
+
+import re
+
+SOURCE_PAGE_PATTERN = re.compile(r"\bp\.?\s*(\d+(?:\s*-\s*\d+)?)\b", re.IGNORECASE)
+
+# template.json value type -> spec kinds that can normalize it.
+TEMPLATE_KINDS = {
+    str: {"text", "choice", "source_page"},
+    int: {"integer"},
+    bool: {"flag"},
+    dict: {"record"},
+}
+
+
+def extract_source_page(text: str, fallback: str = "") -> str:
+    match = SOURCE_PAGE_PATTERN.search(str(text or ""))
+    if match:
+        return f"p.{match.group(1).replace(' ', '')}"
+    return str(fallback or "").strip()
+
+
+def text(name: str, default: str = "", *, keep_default: bool = False) -> dict:
+    """Stripped string; keep_default also replaces values that are blank after stripping."""
+    return {"kind": "text", "name": name, "default": default, "keep_default": keep_default}
+
+
+def integer(
+    name: str,
+    default: int = 0,
+    *,
+    minimum: int | None = None,
+    maximum: int | None = None,
+    blank_only: bool = False,
+    default_from: str | None = None
+) -> dict:
+    """Clamped int; falsy values take the default unless blank_only, which only replaces None/""."""
+    return {
+        "kind": "integer",
+        "name": name,
+        "default": default,
+        "minimum": minimum,
+        "maximum": maximum,
+        "blank_only": blank_only,
+        "default_from": default_from,
+    }
+
+
+def flag(name: str, default: bool = False) -> dict:
+    return {"kind": "flag", "name": name, "default": default}
+
+
+def choice(name: str, default: str, options: tuple[str, ...]) -> dict:
+    """Lower-cased string restricted to options."""
+    return {"kind": "choice", "name": name, "default": default, "options": tuple(options)}
+
+
+def record(name: str, fields: tuple[dict, ...], *, exact: bool = False) -> dict:
+    """Nested dict; exact drops keys not in fields, otherwise unknown keys are kept."""
+    return {"kind": "record", "name": name, "fields": tuple(fields), "exact": exact}
+
+
+def source_page(name: str, source: str, *, fallback: str = "", fallback_field: str | None = None) -> dict:
+    """Explicit page, else the page cited in the source field, else a fallback (literal or parent field)."""
+    return {"kind": "source_page", "name": name, "source": source, "fallback": fallback, "fallback_field": fallback_field}
+
+
+def lift(name: str, record_name: str) -> dict:
+    """Copy a non-empty field up from an already normalized nested record."""
+    return {"kind": "lift", "name": name, "record": record_name}
+
+
+def prefixed(name: str, source: str, prefix: str) -> dict:
+    """Fill a missing field from prefix + another (normalized) string field when that one is set."""
+    return {"kind": "prefixed", "name": name, "source": source, "prefix": prefix}
+
+
+def replace(fields: tuple[dict, ...], *specs: dict) -> tuple[dict, ...]:
+    """Swap fields by name, keeping their position."""
+    by_name = {spec["name"]: spec for spec in specs}
+    return tuple(by_name.get(spec["name"], spec) for spec in fields)
+
+
+def select(fields: tuple[dict, ...], *names: str) -> tuple[dict, ...]:
+    """Pick fields by name, in the order given."""
+    by_name = {spec["name"]: spec for spec in fields}
+    return tuple(by_name[name] for name in names)
+
+
+REQUISITION_FIELDS = (
+    text("id"),
+    integer("dn", 4, minimum=2, maximum=6),
+    integer("complexity", 1, minimum=1),
+    text("requirements"),
+    text("source"),
+    source_page("sourcePage", "source", fallback_field="sourcePage"),
+)
+
+ITEM_SCHEMAS = {
+    "skill": (
+        choice("attribute", "mind", ("body", "mind", "spirit")),
+        integer("training", 0, minimum=0),
+        integer("focus", 0, minimum=0),
+        text("description"),
+    ),
+    "talent": (
+        text("requirements", "None", keep_default=True),
+        text("description"),
+    ),
+    "assignment": (
+        record("attributes", (integer("body", 1), integer("mind", 1), integer("spirit", 1)), exact=True),
+        integer("skillXP", 12, minimum=0, blank_only=True),
+        integer("talentChoices", 2, minimum=0, blank_only=True),
+        text("description"),
+        text("coreSkills"),
+        text("coreSkill"),
+        text("skillOptions"),
+        text("coreTalent"),
+        text("talents"),
+        text("equipment"),
+    ),
+    "weapon": (
+        text("description"),
+        text("damage", "1d6"),
+        text("range", "Close"),
+        text("skill", "Close Combat"),
+        text("traits"),
+        integer("ammo", 0, minimum=0),
+        integer("ammoMax", 0, minimum=0),
+        integer("areaDistance", 2, minimum=1),
+        flag("equipped"),
+    ),
+    "armour": (
+        text("description"),
+        integer("protection", 0, minimum=0),
+        text("traits"),
+        flag("equipped"),
+    ),
+    "gear": (
+        text("description"),
+        integer("quantity", 1, minimum=0),
+        integer("weight", 0, minimum=0),
+        record("requisition", REQUISITION_FIELDS),
+        lift("sourcePage", "requisition"),
+    ),
+    "spell": (
+        text("description"),
+        integer("level", 1, minimum=1),
+        text("castingTime"),
+        integer("dn", 4, minimum=2, maximum=6),
+        integer("complexity", 1, minimum=1, default_from="level"),
+        text("target"),
+        text("range"),
+        text("duration"),
+        text("school"),
+        prefixed("category", "school", "Spells // "),
+    ),
+}
+
+
+def _emit(spec: dict, read: str, write: str, parent: str, depth: int, lines: list[str]) -> None:
+    key = repr(spec["name"])
+    kind = spec["kind"]
+    if kind == "text":
+        value = f"str({read}_get({key}) or {spec['default']!r}).strip()"
+        if spec["keep_default"]:
+            value += f" or {spec['default']!r}"
+        lines.append(f"{write}[{key}] = {value}")
+    elif kind == "integer":
+        default = f"{write}[{spec['default_from']!r}]" if spec["default_from"] else repr(spec["default"])
+        if spec["blank_only"]:
+            value = f"int({default} if {read}_get({key}) in (None, '') else {read}[{key}])"
+        else:
+            value = f"int({read}_get({key}) or {default})"
+        if spec["maximum"] is not None:
+            value = f"min({spec['maximum']}, {value})"
+        if spec["minimum"] is not None:
+            value = f"max({spec['minimum']}, {value})"
+        lines.append(f"{write}[{key}] = {value}")
+    elif kind == "flag":
+        lines.append(f"{write}[{key}] = bool({read}_get({key}, {spec['default']!r}))")
+    elif kind == "choice":
+        lines.append(f"value = str({read}_get({key}) or {spec['default']!r}).lower()")
+        lines.append(f"{write}[{key}] = value if value in {spec['options']!r} else {spec['default']!r}")
+    elif kind == "source_page":
+        if spec["fallback_field"]:
+            fallback = f"str({parent}_get({spec['fallback_field']!r}) or '')"
+        else:
+            fallback = repr(spec["fallback"])
+        lines.append(
+            f"{write}[{key}] = str({read}_get({key}) or '').strip() "
+            f"or extract_source_page({write}[{spec['source']!r}], fallback={fallback})"
+        )
+    elif kind == "lift":
+        nested = f"{write}[{spec['record']!r}][{key}]"
+        lines.append(f"if {nested}:")
+        lines.append(f"    {write}[{key}] = {nested}")
+    elif kind == "prefixed":
+        lines.append(f"if not {write}_get({key}) and {write}[{spec['source']!r}]:")
+        lines.append(f"    {write}[{key}] = {spec['prefix']!r} + {write}[{spec['source']!r}]")
+    elif kind == "record":
+        nested_read = f"src_{depth}"
+        nested_write = f"rec_{depth}"
+        if spec["exact"]:
+            lines.append(f"{nested_read} = {read}[{key}] if isinstance({read}_get({key}), dict) else {{}}")
+            lines.append(f"{nested_write} = {{}}")
+            lines.append(f"{nested_write}_get = {nested_write}.get")
+        else:
+            lines.append(f"{nested_write} = dict({read}[{key}]) if isinstance({read}_get({key}), dict) else {{}}")
+            nested_read = nested_write
+        lines.append(f"{nested_read}_get = {nested_read}.get")
+        for field in spec["fields"]:
+            _emit(field, nested_read, nested_write, write, depth + 1, lines)
+        lines.append(f"{write}[{key}] = {nested_write}")
+    else:
+        raise ValueError(f"unknown field kind: {kind}")
+
+
+def normalizer_source(fields: tuple[dict, ...], name: str = "normalize") -> str:
+    """Python source of the specialised normalizer for a schema (see compile_normalizer)."""
+    body: list[str] = ["out = dict(src)", "out_get = out.get"]
+    for spec in fields:
+        _emit(spec, "out", "out", "out", 0, body)
+    body.append("return out")
+    return f"def {name}(src):\n" + "".join(f"    {line}\n" for line in body)
+
+
+def compile_normalizer(fields: tuple[dict, ...], name: str = "normalize"):
+    """Compile a schema into a function returning a shallow-copied, normalized dict.
+
+    Fields outside the schema are carried over as-is (shared, not copied).
+    """
+    namespace: dict = {"extract_source_page": extract_source_page}
+    exec(compile(normalizer_source(fields, name), f"<item_schema:{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+ITEM_NORMALIZERS = {
+    item_type: compile_normalizer(fields, f"normalize_{item_type}")
+    for item_type, fields in ITEM_SCHEMAS.items()
+}
+
+
+def template_fields(template: dict, document_type: str = "Item") -> dict[str, dict]:
+    """Per-type system fields declared in template.json, with shared templates merged in."""
+    section = template.get(document_type, {})
+    shared = section.get("templates", {})
+    out: dict[str, dict] = {}
+    for item_type in section.get("types", []):
+        declared = dict(section.get(item_type, {}))
+        merged: dict = {}
+        for template_name in declared.pop("templates", []):
+            merged.update(shared.get(template_name, {}))
+        merged.update(declared)
+        out[item_type] = merged
+    return out
+
+
+def schema_mismatches(template: dict) -> list[str]:
+    """Template fields that an item schema leaves out or normalizes as the wrong type."""
+    problems: list[str] = []
+    for item_type, fields in template_fields(template).items():
+        specs = {spec["name"]: spec for spec in ITEM_SCHEMAS.get(item_type, ())}
+        for name, value in fields.items():
+            spec = specs.get(name)
+            if spec is None:
+                problems.append(f"{item_type}.{name}: missing from schema")
+            elif spec["kind"] not in TEMPLATE_KINDS.get(type(value), set()):
+                problems.append(f"{item_type}.{name}: {spec['kind']} does not fit {type(value).__name__}")
+    return problems
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Minifiers for the release archive: CSS, Handlebars HTML templates, JSON data and NeDB pack lines.
+
+Everything works on bytes and returns new bytes; build_system_zip.py --minify puts the results in
+the archive, so the source tree is never touched. The minifiers only drop what the browser or
+JSON parser ignores:
+- CSS loses comments, whitespace runs become one space, and spaces around { } ; , > and the last
+  ; of a block go; strings are kept verbatim. A comment with no whitespace on either side leaves
+  nothing behind (div/**/.x is div.x), unless it sat between two word characters.
+- HTML loses <!-- --> and {{!-- --}} comments and whitespace runs collapse to one space (a newline
+  if the run had one); {{mustaches}}, quoted attribute values and <pre>, <textarea>, <script> and
+  <style> blocks are kept verbatim.
+- JSON files and every pack line are re-serialised with compact separators; a pack line that is
+  not a single JSON object is an error.
+"""
+import json
+import os
+import re
+
+CSS_TOKEN = re.compile(
+    r"/\*.*?(?:\*/|\Z)"
+    r"|\"(?:\\.|[^\"\\])*\""
+    r"|'(?:\\.|[^'\\])*'"
+    r"|\s+"
+    r"|[{};,>]"
+    r"|[^\"'/\s{};,>]+"
+    r"|/",
+    re.S
+)
+# Whitespace next to these never matters in CSS (unlike + - ( : which calc() and media queries need).
+CSS_TIGHT = set("{};,>")
+# A comment between two of these still separates tokens (1px/**/solid), so it leaves a space.
+CSS_WORD = re.compile(r"[\w-]")
+
+HTML_TOKEN = re.compile(
+    r"(?P<comment><!--.*?-->|\{\{!--.*?--\}\}|\{\{![^}]*\}\})"
+    r"|(?P<keep>\{\{.*?\}\}|<(pre|textarea|script|style)\b.*?</\3\s*>"
+    r"|=\s*\"(?:\{\{.*?\}\}|[^\"{]|\{)*\"|=\s*'(?:\{\{.*?\}\}|[^'{]|\{)*')"
+    r"|(?P<space>\s+)",
+    re.S | re.I
+)
+
+# Archive paths whose JSON is compacted; packs/*.db are compacted line by line.
+JSON_DIRS = ("lang/", "packs/")
+
+
+def minify_css(text):
+    out = []
+    space = False
+    comment = False
+    for match in CSS_TOKEN.finditer(text):
+        token = match.group(0)
+        if token.startswith("/*"):
+            comment = True
+            continue
+        if token.isspace():
+            space = True
+            continue
+        if comment and not space and out and CSS_WORD.match(out[-1][-1]) and CSS_WORD.match(token[0]):
+            space = True
+        if space and out and out[-1][-1] not in CSS_TIGHT and token[0] not in CSS_TIGHT:
+            out.append(" ")
+        space = comment = False
+        if token == "}" and out and out[-1] == ";":
+            out.pop()
+        out.append(token)
+    return "".join(out)
+
+
+def minify_html(text):
+    out = []
+    pending = ""
+    position = 0
+    for match in HTML_TOKEN.finditer(text):
+        gap = text[position:match.start()]
+        position = match.end()
+        if gap:
+            out.append(pending)
+            out.append(gap)
+            pending = ""
+        if match.group("comment"):
+            continue
+        if match.group("space"):
+            if "\n" in match.group("space") or not pending:
+                pending = "\n" if "\n" in match.group("space") else " "
+            continue
+        out.append(pending)
+        out.append(match.group("keep"))
+        pending = ""
+    out.append(pending)
+    out.append(text[position:])
+    return "".join(out).strip() + "\n"
+
+
+def compact_json(text):
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def compact_pack_lines(text, name="pack"):
+    """Every non-empty NeDB line re-serialised compactly; raises ValueError naming bad lines."""
+    out = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            doc = json.loads(line)
+        except ValueError as err:
+            raise ValueError(f"{name}:{number}: not valid JSON ({err})") from None
+        if not isinstance(doc, dict):
+            raise ValueError(f"{name}:{number}: not a JSON object")
+        out.append(json.dumps(doc, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(out) + "\n" if out else ""
+
+
+def minify(arcname, data):
+    """Minified bytes for an archive member, or None when its type is not minified."""
+    ext = os.path.splitext(arcname)[1].lower()
+    if ext == ".css":
+        text = minify_css(data.decode("utf-8"))
+    elif ext in (".html", ".hbs"):
+        text = minify_html(data.decode("utf-8"))
+    elif ext == ".json" and arcname.startswith(JSON_DIRS):
+        text = compact_json(data.decode("utf-8"))
+    elif ext == ".db" and arcname.startswith("packs/") and arcname.count("/") == 1:
+        text = compact_pack_lines(data.decode("utf-8"), arcname)
+    else:
+        return None
+    return text.encode("utf-8")
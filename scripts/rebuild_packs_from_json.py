@@ -1,15 +1,51 @@
 #!/usr/bin/env python3
+import argparse
+import contextlib
+import cProfile
 import json
 import hashlib
-import copy
+import os
 import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
+import build_db
+from foundry_leveldb import pack_entries, write_leveldb
+from item_schema import ITEM_NORMALIZERS, extract_source_page
+
+# LAUNDRY_RPG_ROOT points the pipeline at another content tree, e.g. a generated scale corpus.
+ROOT = Path(os.environ.get("LAUNDRY_RPG_ROOT") or Path(__file__).resolve().parents[1]).resolve()
 PACKS = ROOT / "packs"
 EXTRACTION_ROOT = ROOT / "sources" / "extraction"
 EXTRACTION_STAGES = ("reviewed", "normalized", "raw")
-SOURCE_PAGE_PATTERN = re.compile(r"\bp\.?\s*(\d+(?:\s*-\s*\d+)?)\b", re.IGNORECASE)
+ASSIGNMENT_SOURCES = ("assignments.json", "assigments.json")
+BUILD_CACHE = ROOT / ".cache" / "packs"
+BUILD_MANIFEST = BUILD_CACHE / "manifest.json"
+BUILD_MANIFEST_VERSION = 1
+BUILD_DB = BUILD_CACHE / "build.sqlite"
+# Where the build database lives for this run: main() points it at BUILD_DB for --incremental,
+# which needs the recorded collections next time; other builds index in memory and leave no file.
+_build_db_path: Path | None = None
+BUILDER_CODE = tuple(
+    Path(__file__).resolve().with_name(name)
+    for name in ("rebuild_packs_from_json.py", "foundry_leveldb.py", "item_schema.py", "build_db.py")
+)
+SYSTEM_MANIFEST = ROOT / "system.json"
+WATCH_INTERVAL = 0.05
+WATCH_DEBOUNCE = 0.05
+SEARCH_INDEX = PACKS / "search-index.json"
+SEARCH_INDEX_VERSION = 1
+SEARCH_PREFIX_LENGTH = 3
+SEARCH_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+# all-items.db repeats the per-type packs' documents, which would show up twice in every lookup.
+SEARCH_INDEX_SKIPPED = {"all-items.db"}
+ICON_MANIFEST = ROOT / "icons" / "generated" / "manifest.json"
+ICON_MANIFEST_VERSION = 1
 ROMAN_PATTERN = re.compile(r"^[IVXLCDM]+$", re.IGNORECASE)
 
 SKILLS = [
@@ -61,6 +97,9 @@ DEFAULT_CATEGORY_BY_TYPE = {
 
 SKILL_ATTRIBUTE_BY_NAME = {name.casefold(): attr for name, attr in SKILLS}
 
+# source path -> ((mtime_ns, size), parsed JSON)
+_SOURCE_CACHE: dict[Path, tuple[tuple[int, int], object]] = {}
+
 
 def _stable_id(item_type: str, name: str, size: int = 16) -> str:
     seed = f"{item_type}:{name}".encode("utf-8")
@@ -78,13 +117,6 @@ def _resolve_source_path(name: str) -> Path:
     raise FileNotFoundError(f"Source not found: {name}")
 
 
-def _extract_source_page(text: str, fallback: str = "") -> str:
-    match = SOURCE_PAGE_PATTERN.search(str(text or ""))
-    if match:
-        return f"p.{match.group(1).replace(' ', '')}"
-    return str(fallback or "").strip()
-
-
 def _normalize_tags(values, fallback=None) -> list[str]:
     source_values = values if isinstance(values, list) else []
     fallback_values = fallback if isinstance(fallback, list) else []
@@ -205,7 +237,7 @@ def _normalize_item(item: dict) -> dict:
         image = _gear_icon_for_category(normalized_system.get("category"), image)
     search_terms = _build_item_search_terms(item_type, item_name, normalized_system)
     source_flags = item.get("flags") if isinstance(item.get("flags"), dict) else {}
-    flags = copy.deepcopy(source_flags)
+    flags = dict(source_flags)
     laundry_flags = flags.get("laundry-rpg") if isinstance(flags.get("laundry-rpg"), dict) else {}
     flags["laundry-rpg"] = {
         **laundry_flags,
@@ -225,89 +257,65 @@ def _normalize_item(item: dict) -> dict:
     return out
 
 
-def _write_jsonl(path: Path, docs: list[dict]) -> None:
-    PACKS.mkdir(parents=True, exist_ok=True)
-    payload = "\n".join(json.dumps(doc, ensure_ascii=False) for doc in docs) + "\n"
-    path.write_text(payload, encoding="utf-8")
+def _write_atomic(path: Path, chunks) -> tuple[str, bool]:
+    """Stream byte chunks into a temp file beside path and swap it in unless the content is unchanged.
+
+    Returns the file's sha256 and whether the file on disk was replaced.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    handle = tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    temp_path = Path(handle.name)
+    try:
+        with handle:
+            for chunk in chunks:
+                digest.update(chunk)
+                handle.write(chunk)
+        sha256 = digest.hexdigest()
+        if _sha256_file(path) == sha256:
+            temp_path.unlink()
+            return sha256, False
+        # NamedTemporaryFile creates 0600 files; keep the existing permissions instead.
+        os.chmod(temp_path, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return sha256, True
+
+
+def _write_jsonl(path: Path, docs: list[dict]) -> tuple[str, bool]:
+    return _write_atomic(path, (json.dumps(doc, ensure_ascii=False).encode("utf-8") + b"\n" for doc in docs))
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
 
 
 def _read_source(name: str) -> list[dict]:
+    """Parse a source file, reusing the last parse while its mtime and size are unchanged.
+
+    Builders treat source data as read-only, so one parse can feed several builders and,
+    in --watch mode, every rebuild until the file is edited.
+    """
     source_path = _resolve_source_path(name)
+    stat = source_path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _SOURCE_CACHE.get(source_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
     with source_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+        data = json.load(f)
+    _SOURCE_CACHE[source_path] = (signature, data)
+    return data
 
 
 def _normalize_system(item_type: str, system: dict) -> dict:
     src = system if isinstance(system, dict) else {}
-    out = json.loads(json.dumps(src))
-
-    if item_type == "skill":
-        out["attribute"] = str(out.get("attribute") or "mind").lower()
-        if out["attribute"] not in {"body", "mind", "spirit"}:
-            out["attribute"] = "mind"
-        out["training"] = max(0, int(out.get("training", 0) or 0))
-        out["focus"] = max(0, int(out.get("focus", 0) or 0))
-        out["description"] = str(out.get("description") or "").strip()
-    elif item_type == "talent":
-        out["requirements"] = str(out.get("requirements") or "None").strip() or "None"
-        out["description"] = str(out.get("description") or "").strip()
-    elif item_type == "assignment":
-        attrs = out.get("attributes", {}) if isinstance(out.get("attributes"), dict) else {}
-        raw_skill_xp = out.get("skillXP", 12)
-        raw_talent_choices = out.get("talentChoices", 2)
-        out["attributes"] = {
-            "body": int(attrs.get("body", 1) or 1),
-            "mind": int(attrs.get("mind", 1) or 1),
-            "spirit": int(attrs.get("spirit", 1) or 1)
-        }
-        out["skillXP"] = max(0, int(12 if raw_skill_xp in (None, "") else raw_skill_xp))
-        out["talentChoices"] = max(0, int(2 if raw_talent_choices in (None, "") else raw_talent_choices))
-        for key in ("description", "coreSkills", "coreSkill", "skillOptions", "coreTalent", "talents", "equipment"):
-            out[key] = str(out.get(key) or "").strip()
-    elif item_type == "weapon":
-        out["description"] = str(out.get("description") or "").strip()
-        out["damage"] = str(out.get("damage") or "1d6").strip()
-        out["range"] = str(out.get("range") or "Close").strip()
-        out["skill"] = str(out.get("skill") or "Close Combat").strip()
-        out["traits"] = str(out.get("traits") or "").strip()
-        out["ammo"] = max(0, int(out.get("ammo", 0) or 0))
-        out["ammoMax"] = max(0, int(out.get("ammoMax", 0) or 0))
-        out["areaDistance"] = max(1, int(out.get("areaDistance", 2) or 2))
-        out["equipped"] = bool(out.get("equipped", False))
-    elif item_type == "armour":
-        out["description"] = str(out.get("description") or "").strip()
-        out["protection"] = max(0, int(out.get("protection", 0) or 0))
-        out["traits"] = str(out.get("traits") or "").strip()
-        out["equipped"] = bool(out.get("equipped", False))
-    elif item_type == "gear":
-        out["description"] = str(out.get("description") or "").strip()
-        out["quantity"] = max(0, int(out.get("quantity", 1) or 1))
-        out["weight"] = max(0, int(out.get("weight", 0) or 0))
-        requisition = out.get("requisition") if isinstance(out.get("requisition"), dict) else {}
-        requisition["id"] = str(requisition.get("id") or "").strip()
-        requisition["dn"] = max(2, min(6, int(requisition.get("dn", 4) or 4)))
-        requisition["complexity"] = max(1, int(requisition.get("complexity", 1) or 1))
-        requisition["requirements"] = str(requisition.get("requirements") or "").strip()
-        requisition["source"] = str(requisition.get("source") or "").strip()
-        requisition["sourcePage"] = str(requisition.get("sourcePage") or "").strip() or _extract_source_page(
-            requisition["source"],
-            fallback=str(out.get("sourcePage") or "")
-        )
-        out["requisition"] = requisition
-        if requisition["sourcePage"]:
-            out["sourcePage"] = requisition["sourcePage"]
-    elif item_type == "spell":
-        out["description"] = str(out.get("description") or "").strip()
-        out["level"] = max(1, int(out.get("level", 1) or 1))
-        out["castingTime"] = str(out.get("castingTime") or "").strip()
-        out["dn"] = max(2, min(6, int(out.get("dn", 4) or 4)))
-        out["complexity"] = max(1, int(out.get("complexity", out["level"]) or out["level"]))
-        out["target"] = str(out.get("target") or "").strip()
-        out["range"] = str(out.get("range") or "").strip()
-        out["duration"] = str(out.get("duration") or "").strip()
-        out["school"] = str(out.get("school") or "").strip()
-        if not out.get("category") and out["school"]:
-            out["category"] = f"Spells // {out['school']}"
+    normalizer = ITEM_NORMALIZERS.get(item_type)
+    # Compiled normalizers return a shallow copy; untouched nested values are shared with the source.
+    out = normalizer(src) if normalizer is not None else dict(src)
 
     default_category = DEFAULT_CATEGORY_BY_TYPE.get(item_type, item_type.title())
     out["category"] = str(out.get("category") or default_category).strip() or default_category
@@ -359,9 +367,24 @@ def _dupe_values(values: list[str]) -> list[str]:
     return sorted(dupes)
 
 
+def _indexed(collections: dict[str, list[dict]]):
+    """The build database with the given collections' current documents indexed."""
+    conn = build_db.connect(_build_db_path)
+    for name, docs in collections.items():
+        build_db.store_collection(conn, name, docs)
+    return conn
+
+
 def _validate_assignments(assignments: list[dict], talents: list[dict]) -> None:
     skill_names = {name for name, _ in SKILLS}
-    talent_names = {item.get("name", "") for item in talents}
+    listed_talent_names = sorted({
+        talent
+        for assignment in assignments
+        for field in ("coreTalent", "talents")
+        for talent in _parse_csv(assignment.get("system", {}).get(field))
+    })
+    # Checked against the talent source names, indexed apart from the built "talents" collection.
+    missing_talents = build_db.missing_names(_indexed({"source-talents": talents}), "source-talents", listed_talent_names)
     errors: list[str] = []
 
     for assignment in assignments:
@@ -396,7 +419,7 @@ def _validate_assignments(assignments: list[dict], talents: list[dict]) -> None:
         if talent_dupes:
             errors.append(f"{assignment_name}: duplicate talents: {', '.join(talent_dupes)}")
 
-        unknown_talents = sorted({talent for talent in listed_talents if talent not in talent_names})
+        unknown_talents = sorted({talent for talent in listed_talents if talent in missing_talents})
         if unknown_talents:
             errors.append(f"{assignment_name}: unknown talents: {', '.join(unknown_talents)}")
 
@@ -407,8 +430,7 @@ def _validate_assignments(assignments: list[dict], talents: list[dict]) -> None:
 
 def build_assignments(data: list[dict] | None = None) -> list[dict]:
     if data is None:
-        source = "assignments.json" if (ROOT / "assignments.json").exists() else "assigments.json"
-        data = _read_source(source)
+        data = _read_source(_assignment_source_name())
     return [_normalize_item(item) for item in data]
 
 
@@ -477,15 +499,7 @@ def build_assignment_issued_gear(
     assignments: list[dict],
     existing_collections: list[list[dict]] | None = None
 ) -> list[dict]:
-    existing_collections = existing_collections or []
-    existing_names: set[str] = set()
-    for collection in existing_collections:
-        for item in collection:
-            name = str(item.get("name") or "").strip()
-            if not name:
-                continue
-            existing_names.add(name.casefold())
-
+    """Gear for equipment assignments list that no document in existing_collections already names."""
     issued_index: dict[str, dict[str, object]] = {}
     for assignment in assignments:
         assignment_name = str(assignment.get("name") or "").strip()
@@ -506,6 +520,15 @@ def build_assignment_issued_gear(
             if assignment_name:
                 entry["assignments"].add(assignment_name)
 
+    existing_names: set[str] = set()
+    if existing_collections:
+        # Looked up in the in-memory database, so these positional collections never reach build.sqlite.
+        conn = build_db.connect(None)
+        scopes = [f"issued-gear-existing-{position}" for position in range(len(existing_collections))]
+        for scope, docs in zip(scopes, existing_collections):
+            build_db.store_collection(conn, scope, docs)
+        existing_names = build_db.existing_name_keys(conn, scopes, list(issued_index))
+
     docs: list[dict] = []
     for key in sorted(issued_index.keys()):
         if key in existing_names:
@@ -662,7 +685,7 @@ def build_enemies() -> list[dict]:
                 "isMagic": False
             }, enemy_name=name)]
         source = str(entry.get("source") or "").strip()
-        source_page = str(entry.get("sourcePage") or "").strip() or _extract_source_page(source, fallback="system-preset")
+        source_page = str(entry.get("sourcePage") or "").strip() or extract_source_page(source, fallback="system-preset")
         category = str(entry.get("category") or "Bestiary").strip()
         tags = _normalize_tags(entry.get("tags"), fallback=[
             "enemy",
@@ -795,7 +818,7 @@ def build_servant_npcs() -> list[dict]:
             }, enemy_name=name)]
 
         source = str(entry.get("source") or "A Man of the People (2E)").strip()
-        source_page = str(entry.get("sourcePage") or "").strip() or _extract_source_page(source, fallback="p.4-26")
+        source_page = str(entry.get("sourcePage") or "").strip() or extract_source_page(source, fallback="p.4-26")
         category = str(entry.get("category") or "Servant Cases").strip() or "Servant Cases"
         role = str(entry.get("role") or "npc").strip()
         tags = _normalize_tags(entry.get("tags"), fallback=[
@@ -921,7 +944,7 @@ def build_servant_tables() -> list[dict]:
             continue
         table_id = str(entry.get("id") or "").strip() or _slugify(name)
         source = str(entry.get("source") or "A Man of the People (2E)").strip()
-        source_page = str(entry.get("sourcePage") or "").strip() or _extract_source_page(source, fallback="p.4-26")
+        source_page = str(entry.get("sourcePage") or "").strip() or extract_source_page(source, fallback="p.4-26")
         tags = _normalize_tags(entry.get("tags"), fallback=["servant-case", "table"])
 
         raw_results = entry.get("results") if isinstance(entry.get("results"), list) else []
@@ -1000,7 +1023,8 @@ def build_all_items(item_collections: list[list[dict]]) -> list[dict]:
             if key in seen:
                 continue
             seen.add(key)
-            docs.append(copy.deepcopy(item))
+            # Pack documents are treated as immutable once built, so all-items shares them.
+            docs.append(item)
     return docs
 
 
@@ -1093,54 +1117,779 @@ def build_macros() -> list[dict]:
     return docs
 
 
-def main() -> None:
-    assignment_source = "assignments.json" if (ROOT / "assignments.json").exists() else "assigments.json"
-    assignments_data = _read_source(assignment_source)
+PACK_COLLECTIONS = {
+    "assignments.db": "assignments",
+    "talents.db": "talents",
+    "weapons.db": "weapons",
+    "armour.db": "armour",
+    "skills.db": "skills",
+    "spells.db": "spells",
+    "gear.db": "gear",
+    "all-items.db": "all-items",
+    "enemies.db": "enemies",
+    "rules.db": "rules",
+    "servant.db": "servant",
+    "vashnotik.db": "vashnotik",
+    "servant-npcs.db": "servant-npcs",
+    "servant-tables.db": "servant-tables",
+    "macros.db": "macros",
+}
+
+# collection -> (source files read directly, upstream collections)
+COLLECTION_DEPENDENCIES = {
+    "talents": (("talents.json",), ()),
+    "assignments": ((*ASSIGNMENT_SOURCES, "talents.json"), ()),
+    "weapons": (("weapons.json",), ()),
+    "armour": (("armour.json",), ()),
+    "skills": (("skills.json",), ()),
+    "spells": (("spells.json",), ()),
+    "gear": (("gear.json",), ("assignments", "weapons", "armour")),
+    "all-items": ((), ("skills", "talents", "assignments", "weapons", "armour", "spells", "gear")),
+    "enemies": (("enemies.json",), ()),
+    "rules": (("gm.json",), ()),
+    "servant": (("servant.json",), ()),
+    "vashnotik": (("vashnotik.json",), ()),
+    "servant-npcs": (("servant-npcs.json",), ()),
+    "servant-tables": (("servant-tables.json",), ()),
+    "macros": (("macros.json",), ()),
+}
+
+
+def _assignment_source_name() -> str:
+    return ASSIGNMENT_SOURCES[0] if (ROOT / ASSIGNMENT_SOURCES[0]).exists() else ASSIGNMENT_SOURCES[1]
+
+
+def _collect_assignments(upstream: dict[str, list[dict]]) -> list[dict]:
+    assignments_data = _read_source(_assignment_source_name())
     talents_data = _read_source("talents.json")
     _validate_assignments(assignments_data, talents_data)
+    return build_assignments(assignments_data)
 
-    assignments = build_assignments(assignments_data)
-    talents = build_talents(talents_data)
-    weapons = build_weapons()
-    armour = build_armour()
-    skills = build_skills()
-    spells = build_spells()
+
+def _collect_gear(upstream: dict[str, list[dict]]) -> list[dict]:
     gear = build_gear()
-    issued_gear = build_assignment_issued_gear(assignments, [weapons, armour, gear])
+    issued_gear = build_assignment_issued_gear(upstream["assignments"], [upstream["weapons"], upstream["armour"], gear])
     if issued_gear:
         gear = build_all_items([gear, issued_gear])
-    enemies = build_enemies()
-    all_items = build_all_items([
-        skills,
-        talents,
-        assignments,
-        weapons,
-        armour,
-        spells,
-        gear
-    ])
+    return gear
+
+
+def _collect_all_items(upstream: dict[str, list[dict]]) -> list[dict]:
+    # First document per (type, casefolded name), in this pack order; same rule as build_all_items.
+    names = ["skills", "talents", "assignments", "weapons", "armour", "spells", "gear"]
+    conn = _indexed({name: upstream[name] for name in names})
+    return [upstream[name][position] for name, position in build_db.first_by_type_and_name(conn, names)]
+
+
+COLLECTION_BUILDERS = {
+    "talents": lambda upstream: build_talents(),
+    "assignments": _collect_assignments,
+    "weapons": lambda upstream: build_weapons(),
+    "armour": lambda upstream: build_armour(),
+    "skills": lambda upstream: build_skills(),
+    "spells": lambda upstream: build_spells(),
+    "gear": _collect_gear,
+    "all-items": _collect_all_items,
+    "enemies": lambda upstream: build_enemies(),
+    "rules": lambda upstream: build_rules_journal(),
+    "servant": lambda upstream: build_servant_journal(),
+    "vashnotik": lambda upstream: build_vashnotik_journal(),
+    "servant-npcs": lambda upstream: build_servant_npcs(),
+    "servant-tables": lambda upstream: build_servant_tables(),
+    "macros": lambda upstream: build_macros(),
+}
+
+
+COLLECTION_PACKS = {collection: filename for filename, collection in PACK_COLLECTIONS.items()}
+# Not kept in the build database: all-items holds the item collections' own documents, which are already there.
+UNINDEXED_COLLECTIONS = {"all-items"}
+
+
+def _collection_order(names) -> list[str]:
+    """The requested collections plus their upstream collections, dependencies first."""
+    order: list[str] = []
+
+    def visit(name: str) -> None:
+        if name in order:
+            return
+        for upstream_name in COLLECTION_DEPENDENCIES[name][1]:
+            visit(upstream_name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def _collection_sources(name: str) -> list[str]:
+    sources, upstream_names = COLLECTION_DEPENDENCIES[name]
+    out = list(sources)
+    for upstream_name in upstream_names:
+        out.extend(_collection_sources(upstream_name))
+    return sorted(set(out))
+
+
+def _sha256_bytes(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _sha256_file(path: Path) -> str | None:
+    if not path.is_file():
+        return None
+    return _sha256_bytes(path.read_bytes())
+
+
+def _source_fingerprint(name: str) -> dict | None:
+    try:
+        source_path = _resolve_source_path(name)
+    except FileNotFoundError:
+        return None
+    return {
+        "path": source_path.relative_to(ROOT).as_posix(),
+        "sha256": _sha256_file(source_path)
+    }
+
+
+def _builder_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for path in BUILDER_CODE:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _pack_signature(
+    filename: str,
+    builder: str,
+    fingerprints: dict[str, dict | None],
+    options: dict | None = None
+) -> str:
+    payload = {
+        "builder": builder,
+        "sources": {name: fingerprints[name] for name in _collection_sources(PACK_COLLECTIONS[filename])}
+    }
+    if options:
+        payload["options"] = options
+    return _sha256_bytes(json.dumps(payload, sort_keys=True).encode("utf-8"))
+
+
+def _read_build_manifest() -> dict:
+    try:
+        manifest = json.loads(BUILD_MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != BUILD_MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def _write_build_manifest(packs: dict[str, dict]) -> None:
+    BUILD_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": BUILD_MANIFEST_VERSION, "packs": packs}
+    BUILD_MANIFEST.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _stale_packs(manifest: dict, signatures: dict[str, str]) -> list[str]:
+    recorded = manifest.get("packs") if isinstance(manifest.get("packs"), dict) else {}
+    stale: list[str] = []
+    for filename, signature in signatures.items():
+        entry = recorded.get(filename) if isinstance(recorded.get(filename), dict) else {}
+        if entry.get("inputs") != signature:
+            stale.append(filename)
+            continue
+        if entry.get("sha256") != _sha256_file(PACKS / filename):
+            stale.append(filename)
+    return stale
+
+
+def _read_icon_manifest() -> dict[str, dict[str, str]]:
+    manifest = json.loads(ICON_MANIFEST.read_text(encoding="utf-8"))
+    if not isinstance(manifest, dict) or manifest.get("version") != ICON_MANIFEST_VERSION:
+        raise ValueError(f"{ICON_MANIFEST.relative_to(ROOT)}: unsupported icon manifest version")
+    icons = manifest.get("icons")
+    return icons if isinstance(icons, dict) else {}
 
-    outputs = {
-        "assignments.db": assignments,
-        "talents.db": talents,
-        "weapons.db": weapons,
-        "armour.db": armour,
-        "skills.db": skills,
-        "spells.db": spells,
-        "gear.db": gear,
-        "all-items.db": all_items,
-        "enemies.db": enemies,
-        "rules.db": build_rules_journal(),
-        "servant.db": build_servant_journal(),
-        "vashnotik.db": build_vashnotik_journal(),
-        "servant-npcs.db": build_servant_npcs(),
-        "servant-tables.db": build_servant_tables(),
-        "macros.db": build_macros(),
+
+def _apply_icon_variants(docs: list[dict], icons: dict[str, dict[str, str]], list_size: int | None) -> None:
+    """Record each item's thumbnail variants and optionally point img at the list-sized one."""
+    for doc in docs:
+        _apply_icon_variants(doc.get("items") or [], icons, list_size)
+        if doc.get("type") not in DEFAULT_ICON_BY_TYPE:
+            continue
+        laundry_flags = doc.get("flags", {}).get("laundry-rpg")
+        if not isinstance(laundry_flags, dict):
+            continue
+        # Documents can be shared between collections, so key off the recorded master when present.
+        recorded = laundry_flags.get("icons") if isinstance(laundry_flags.get("icons"), dict) else {}
+        master = recorded.get("master") or doc.get("img")
+        variants = icons.get(master)
+        if not variants:
+            continue
+        laundry_flags["icons"] = {"master": master, **variants}
+        if list_size is not None and str(list_size) in variants:
+            doc["img"] = variants[str(list_size)]
+
+
+def _search_tokens(terms: list[str]) -> set[str]:
+    tokens: set[str] = set()
+    for term in terms:
+        for token in SEARCH_TOKEN_PATTERN.findall(str(term).casefold()):
+            if len(token) > 1 or token.isdigit():
+                tokens.add(token)
+    return tokens
+
+
+def build_search_index(packs: dict[str, list[dict]]) -> dict:
+    """Invert every document's searchTerms into term -> sorted document postings (all-items excluded).
+
+    Documents are listed once, sorted by pack then _id, and postings are indexes into that list.
+    Terms are sorted, so each prefix bucket is a contiguous [start, end) range of term indexes
+    that a type-ahead lookup can bisect within.
+    """
+    documents: list[tuple[str, str, str, set[str]]] = []
+    for filename, docs in packs.items():
+        if filename in SEARCH_INDEX_SKIPPED:
+            continue
+        pack = Path(filename).stem
+        for doc in docs:
+            laundry_flags = doc.get("flags", {}).get("laundry-rpg")
+            terms = laundry_flags.get("searchTerms") if isinstance(laundry_flags, dict) else None
+            if terms:
+                documents.append((pack, doc["_id"], doc.get("name", ""), _search_tokens([doc.get("name", ""), *terms])))
+    documents.sort(key=lambda entry: (entry[0], entry[1]))
+
+    postings: dict[str, list[int]] = {}
+    for index, (_, _, _, tokens) in enumerate(documents):
+        for token in tokens:
+            postings.setdefault(token, []).append(index)
+    terms = sorted(postings)
+
+    prefixes: dict[str, list[int]] = {}
+    for index, term in enumerate(terms):
+        for length in range(1, min(len(term), SEARCH_PREFIX_LENGTH) + 1):
+            bucket = prefixes.setdefault(term[:length], [index, index])
+            bucket[1] = index + 1
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "prefixLength": SEARCH_PREFIX_LENGTH,
+        "documents": [[pack, doc_id, name] for pack, doc_id, name, _ in documents],
+        "terms": terms,
+        "postings": [postings[term] for term in terms],
+        "prefixes": prefixes,
     }
 
-    for filename, docs in outputs.items():
-        _write_jsonl(PACKS / filename, docs)
-        print(f"wrote {filename}: {len(docs)}")
+
+def _write_search_index(index: dict) -> bool:
+    payload = json.dumps(index, ensure_ascii=False, sort_keys=True, separators=(",", ":")) + "\n"
+    _, replaced = _write_atomic(SEARCH_INDEX, [payload.encode("utf-8")])
+    return replaced
+
+
+def _pack_document_types() -> dict[str, str]:
+    system = json.loads(SYSTEM_MANIFEST.read_text(encoding="utf-8"))
+    return {Path(pack["path"]).name: pack["type"] for pack in system.get("packs", [])}
+
+
+def _leveldb_dir(filename: str) -> Path:
+    # Foundry resolves a legacy "packs/<name>.db" path to the "packs/<name>" LevelDB directory.
+    return PACKS / Path(filename).stem
+
+
+def _leveldb_digest(filename: str) -> str | None:
+    """Content hash of the pack's LevelDB directory (file names and bytes), or None when it is absent."""
+    directory = _leveldb_dir(filename)
+    if not (directory / "CURRENT").is_file():
+        return None
+    digest = hashlib.sha256()
+    for path in sorted(directory.rglob("*")):
+        if path.is_file():
+            digest.update(path.relative_to(directory).as_posix().encode("utf-8") + b"\0")
+            digest.update(_sha256_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def _stale_leveldb(manifest: dict) -> list[str]:
+    """Packs whose LevelDB directory is missing, edited, or was written from other JSONL than the .db on disk."""
+    recorded = manifest.get("packs") if isinstance(manifest.get("packs"), dict) else {}
+    stale: list[str] = []
+    for filename in PACK_COLLECTIONS:
+        entry = recorded.get(filename) if isinstance(recorded.get(filename), dict) else {}
+        leveldb = entry.get("leveldb") if isinstance(entry.get("leveldb"), dict) else {}
+        if leveldb.get("from") != _sha256_file(PACKS / filename) or leveldb.get("sha256") != _leveldb_digest(filename):
+            stale.append(filename)
+    return stale
+
+
+def _remove_leveldb_dirs(manifest: dict) -> None:
+    """Delete LevelDB directories an earlier --leveldb build wrote; Foundry would load them instead of the .db.
+
+    Only a directory whose content hash the build manifest recorded is removed. Any other one was
+    written by Foundry or edited since, may hold local compendium edits, and is left with a warning.
+    """
+    recorded = manifest.get("packs") if isinstance(manifest.get("packs"), dict) else {}
+    for filename in PACK_COLLECTIONS:
+        directory = _leveldb_dir(filename)
+        if not directory.is_dir():
+            continue
+        name = directory.relative_to(ROOT).as_posix()
+        entry = recorded.get(filename) if isinstance(recorded.get(filename), dict) else {}
+        leveldb = entry.get("leveldb") if isinstance(entry.get("leveldb"), dict) else {}
+        digest = _leveldb_digest(filename)
+        if digest is not None and leveldb.get("sha256") == digest:
+            shutil.rmtree(directory)
+            print(f"removed {name}/: build ran without --leveldb")
+        else:
+            print(
+                f"warning: left {name}/ in place: not written by a --leveldb build (or edited since); "
+                f"Foundry loads it instead of {filename}",
+                file=sys.stderr
+            )
+
+
+def _write_pack(
+    filename: str,
+    docs: list[dict],
+    icons: dict[str, dict[str, str]] | None,
+    list_icon_size: int | None,
+    document_type: str | None
+) -> dict:
+    if icons is not None:
+        _apply_icon_variants(docs, icons, list_icon_size)
+    sha256, replaced = _write_jsonl(PACKS / filename, docs)
+    result = {"sha256": sha256, "replaced": replaced, "count": len(docs), "keys": None}
+    if document_type is not None:
+        entries = pack_entries(document_type, docs)
+        write_leveldb(_leveldb_dir(filename), entries)
+        result["keys"] = len(entries)
+    return result
+
+
+@contextlib.contextmanager
+def _span(spans: list[dict] | None, name: str, category: str):
+    """Record wall/CPU time and tracemalloc peak for the block into spans (no-op when spans is None).
+
+    The yielded dict takes extra fields such as docs and bytes.
+    """
+    if spans is None:
+        yield {}
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    span = {"name": name, "cat": category, "pid": os.getpid(), "docs": None, "bytes": None}
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        yield span
+    finally:
+        span["start"] = started
+        span["wall"] = time.perf_counter() - started
+        span["cpu"] = time.process_time() - cpu_started
+        span["peak"] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        spans.append(span)
+
+
+def _pack_bytes(filename: str, leveldb: bool) -> int:
+    total = (PACKS / filename).stat().st_size
+    if leveldb:
+        total += sum(path.stat().st_size for path in _leveldb_dir(filename).iterdir())
+    return total
+
+
+def _build_pack_task(
+    name: str,
+    upstream: dict[str, list[dict]],
+    write: tuple | None,
+    timed: bool = False
+) -> tuple[list[dict], dict | None, list[dict]]:
+    """Build one collection and, when its pack was selected, write it; runs inline or in a worker.
+
+    With timed, also returns a span per step for --timings (measured in whichever process ran it).
+    """
+    spans: list[dict] | None = [] if timed else None
+    with _span(spans, f"build {name}", "builder") as span:
+        docs = COLLECTION_BUILDERS[name](upstream)
+        span["docs"] = len(docs)
+    result = None
+    if write is not None:
+        filename = COLLECTION_PACKS[name]
+        with _span(spans, f"write {filename}", "pack") as span:
+            result = _write_pack(filename, docs, *write)
+            span["docs"] = len(docs)
+            if timed:
+                span["bytes"] = _pack_bytes(filename, result["keys"] is not None)
+    return docs, result, spans or []
+
+
+def build_and_write_packs(
+    selected: list[str],
+    executor: Executor | None,
+    icons: dict[str, dict[str, str]] | None = None,
+    list_icon_size: int | None = None,
+    document_types: dict[str, str] | None = None,
+    reuse: dict[str, list[dict]] | None = None,
+    spans: list[dict] | None = None,
+    signatures: dict[str, str] | None = None
+) -> tuple[dict[str, list[dict]], dict[str, dict]]:
+    """Build the selected packs' collections and write the packs, running independent builders concurrently.
+
+    A collection is submitted as soon as all of its upstream collections have finished, so the
+    result depends only on the dependency graph, never on completion order. Upstream collections
+    found in reuse are taken as-is instead of being rebuilt. Builder and pack spans are appended
+    to spans when it is given. Written collections are stored in the build database together with
+    their pack signature (when signatures is given) so later incremental builds can reuse them.
+    """
+    targets = {PACK_COLLECTIONS[filename] for filename in selected}
+    built: dict[str, list[dict]] = {name: docs for name, docs in (reuse or {}).items() if name not in targets}
+    order = [name for name in _collection_order(targets) if name not in built]
+    results: dict[str, dict] = {}
+
+    def task_args(name: str) -> tuple:
+        upstream = {upstream_name: built[upstream_name] for upstream_name in COLLECTION_DEPENDENCIES[name][1]}
+        filename = COLLECTION_PACKS[name]
+        write = (icons, list_icon_size, (document_types or {}).get(filename)) if name in targets else None
+        return name, upstream, write, spans is not None
+
+    def record(name: str, docs: list[dict], result: dict | None, task_spans: list[dict]) -> None:
+        built[name] = docs
+        if result is not None:
+            filename = COLLECTION_PACKS[name]
+            results[filename] = result
+            if signatures is not None and _build_db_path is not None and name not in UNINDEXED_COLLECTIONS:
+                build_db.store_collection(build_db.connect(_build_db_path), name, docs, signatures[filename], result["sha256"])
+        if spans is not None:
+            spans.extend(task_spans)
+
+    if executor is None:
+        for name in order:
+            record(name, *_build_pack_task(*task_args(name)))
+        return built, results
+
+    running: dict[Future, str] = {}
+    waiting = list(order)
+    while waiting or running:
+        for name in [name for name in waiting if all(dep in built for dep in COLLECTION_DEPENDENCIES[name][1])]:
+            waiting.remove(name)
+            running[executor.submit(_build_pack_task, *task_args(name))] = name
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            record(running.pop(future), *future.result())
+    return built, results
+
+
+def _pack_signatures(builder: str, options: dict | None) -> dict[str, str]:
+    source_names = sorted({name for sources, _ in COLLECTION_DEPENDENCIES.values() for name in sources})
+    fingerprints = {name: _source_fingerprint(name) for name in source_names}
+    return {
+        filename: _pack_signature(filename, builder, fingerprints, options)
+        for filename in PACK_COLLECTIONS
+    }
+
+
+def _finish_build(
+    selected: list[str],
+    results: dict[str, dict],
+    collections: dict[str, list[dict]],
+    signatures: dict[str, str],
+    report_skipped: bool = True,
+    spans: list[dict] | None = None,
+    leveldb: bool = False
+) -> None:
+    """Report written packs, then refresh the search index and the incremental build manifest.
+
+    With leveldb, every pack's LevelDB directory is current with its .db, so the manifest records
+    which JSONL it was written from and its content hash.
+    """
+    digests: dict[str, str | None] = {}
+    for filename in PACK_COLLECTIONS:
+        if filename not in selected:
+            digests[filename] = _sha256_file(PACKS / filename)
+            if report_skipped:
+                print(f"skipped {filename}: up to date")
+            continue
+        result = results[filename]
+        digests[filename] = result["sha256"]
+        print(f"{'wrote' if result['replaced'] else 'unchanged'} {filename}: {result['count']}")
+        if result["keys"] is not None:
+            print(f"wrote {_leveldb_dir(filename).relative_to(ROOT).as_posix()}/: {result['keys']} keys")
+
+    # Packs whose documents are not in memory are up to date on disk, so the index reads them back.
+    with _span(spans, f"write {SEARCH_INDEX.name}", "index") as span:
+        index = build_search_index({
+            filename: collections[collection] if collection in collections else _read_jsonl(PACKS / filename)
+            for filename, collection in PACK_COLLECTIONS.items()
+            if filename not in SEARCH_INDEX_SKIPPED
+        })
+        replaced = _write_search_index(index)
+        span["docs"] = len(index["documents"])
+        if spans is not None:
+            span["bytes"] = SEARCH_INDEX.stat().st_size
+    print(f"{'wrote' if replaced else 'unchanged'} {SEARCH_INDEX.name}: {len(index['terms'])} terms")
+
+    with _span(spans, "write build manifest", "manifest"):
+        packs: dict[str, dict] = {}
+        for filename in PACK_COLLECTIONS:
+            packs[filename] = {"inputs": signatures[filename], "sha256": digests[filename]}
+            if leveldb:
+                packs[filename]["leveldb"] = {"from": digests[filename], "sha256": _leveldb_digest(filename)}
+        _write_build_manifest(packs)
+
+
+def _watched_sources() -> dict[Path, str]:
+    """Every path a source could resolve from (all extraction stages and the root), mapped to its name."""
+    paths: dict[Path, str] = {}
+    for sources, _ in COLLECTION_DEPENDENCIES.values():
+        for name in sources:
+            for stage in EXTRACTION_STAGES:
+                paths[EXTRACTION_ROOT / stage / name] = name
+            paths[ROOT / name] = name
+    return paths
+
+
+def _snapshot(paths) -> dict[Path, tuple[int, int] | None]:
+    out: dict[Path, tuple[int, int] | None] = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            out[path] = None
+            continue
+        out[path] = (stat.st_mtime_ns, stat.st_size)
+    return out
+
+
+def _dependent_collections(source_names: set[str]) -> set[str]:
+    """Collections reading any of the given sources, plus every collection downstream of them."""
+    affected = {name for name, (sources, _) in COLLECTION_DEPENDENCIES.items() if source_names & set(sources)}
+    changed = True
+    while changed:
+        changed = False
+        for name, (_, upstream_names) in COLLECTION_DEPENDENCIES.items():
+            if name not in affected and affected & set(upstream_names):
+                affected.add(name)
+                changed = True
+    return affected
+
+
+def watch_sources(
+    collections: dict[str, list[dict]],
+    builder: str,
+    options: dict | None,
+    icons: dict[str, dict[str, str]] | None = None,
+    list_icon_size: int | None = None,
+    document_types: dict[str, str] | None = None,
+    interval: float = WATCH_INTERVAL,
+    debounce: float = WATCH_DEBOUNCE
+) -> None:
+    """Poll source files and rebuild only the packs downstream of each edit, reusing everything else.
+
+    Builder code is fingerprinted once at start-up; restart the watcher after editing the scripts.
+    """
+    watched = _watched_sources()
+    snapshot = _snapshot(watched)
+    print(f"watching {sum(1 for state in snapshot.values() if state is not None)} source files (Ctrl+C to stop)", flush=True)
+    while True:
+        time.sleep(interval)
+        current = _snapshot(watched)
+        if current == snapshot:
+            continue
+        # Editors often write in several steps; wait until the files stop changing.
+        while True:
+            time.sleep(debounce)
+            settled = _snapshot(watched)
+            if settled == current:
+                break
+            current = settled
+
+        started = time.perf_counter()
+        changed = {watched[path] for path in watched if current[path] != snapshot[path]}
+        snapshot = current
+        affected = _dependent_collections(changed)
+        selected = [filename for filename in PACK_COLLECTIONS if PACK_COLLECTIONS[filename] in affected]
+        signatures = _pack_signatures(builder, options)
+        try:
+            rebuilt, results = build_and_write_packs(
+                selected,
+                None,
+                icons,
+                list_icon_size,
+                document_types,
+                reuse=collections,
+                signatures=signatures
+            )
+        except Exception as err:
+            # Half-saved or invalid JSON, or valid JSON of the wrong shape that trips a normalizer:
+            # report it and keep serving the last good packs.
+            print(f"rebuild failed for {', '.join(sorted(changed))}: {type(err).__name__}: {err}", flush=True)
+            continue
+        collections.update(rebuilt)
+        _finish_build(selected, results, collections, signatures, report_skipped=False, leveldb=document_types is not None)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"rebuilt {', '.join(selected)} after editing {', '.join(sorted(changed))} in {elapsed:.0f} ms", flush=True)
+
+
+def _print_timings(spans: list[dict]) -> None:
+    print("timings (slowest first; memory is the tracemalloc peak above the span's starting usage):")
+    print(f"  {'span':<34} {'wall ms':>9} {'cpu ms':>9} {'docs':>7} {'bytes':>10} {'peak KiB':>9}")
+    for span in sorted(spans, key=lambda span: span["wall"], reverse=True):
+        docs = "-" if span["docs"] is None else str(span["docs"])
+        size = "-" if span["bytes"] is None else str(span["bytes"])
+        print(
+            f"  {span['name']:<34} {span['wall'] * 1000:>9.1f} {span['cpu'] * 1000:>9.1f} "
+            f"{docs:>7} {size:>10} {span['peak'] / 1024:>9.0f}"
+        )
+
+
+def _write_trace(path: Path, spans: list[dict], origin: float) -> None:
+    """Chrome trace-event JSON (chrome://tracing, Perfetto): one complete event per span."""
+    events = [
+        {
+            "name": span["name"],
+            "cat": span["cat"],
+            "ph": "X",
+            "ts": round((span["start"] - origin) * 1e6, 1),
+            "dur": round(span["wall"] * 1e6, 1),
+            "pid": span["pid"],
+            "tid": span["pid"],
+            "args": {
+                "cpuMs": round(span["cpu"] * 1000, 3),
+                "docs": span["docs"],
+                "bytes": span["bytes"],
+                "peakBytes": span["peak"]
+            }
+        }
+        for span in sorted(spans, key=lambda span: span["start"])
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, indent=1) + "\n", encoding="utf-8")
+
+
+def main() -> None:
+    global _build_db_path
+    parser = argparse.ArgumentParser(description="Rebuild compendium packs from source JSON.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rebuild packs whose source files or builder code changed since the last recorded build."
+    )
+    parser.add_argument(
+        "--icon-variants",
+        action="store_true",
+        help="Record thumbnail variants from icons/generated/manifest.json in each item's flags."
+    )
+    parser.add_argument(
+        "--list-icon-size",
+        type=int,
+        help="Point item img at this thumbnail variant instead of the master icon (implies --icon-variants)."
+    )
+    parser.add_argument(
+        "--leveldb",
+        action="store_true",
+        help="Also write each pack as a Foundry LevelDB directory (packs/<name>/) from the same documents."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes building and writing independent packs (default: 1, serial)."
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the build, poll root and extraction-stage sources and rewrite only the packs an edit affects."
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print wall/CPU time, documents, bytes written and peak traced memory per builder and pack."
+    )
+    parser.add_argument("--trace", type=Path, help="Write the --timings spans as a Chrome trace-event JSON file (implies --timings).")
+    parser.add_argument("--profile", type=Path, help="Write cProfile stats for the build to this pstats file (implies --timings).")
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    timed = args.timings or args.trace is not None or args.profile is not None
+    if timed and args.watch:
+        parser.error("--timings, --trace and --profile instrument a single build; drop --watch")
+    if args.profile is not None and args.jobs > 1:
+        parser.error("--profile only sees the main process; use --jobs 1 (or --trace for per-worker spans)")
+
+    icons: dict[str, dict[str, str]] | None = None
+    options: dict | None = None
+    if args.icon_variants or args.list_icon_size is not None:
+        if not ICON_MANIFEST.is_file():
+            parser.error(f"{ICON_MANIFEST.relative_to(ROOT)} not found; run scripts/generate_item_icons.py --variant-sizes first")
+        icons = _read_icon_manifest()
+        options = {"iconManifest": _sha256_file(ICON_MANIFEST), "listIconSize": args.list_icon_size}
+
+    spans: list[dict] | None = [] if timed else None
+    origin = time.perf_counter()
+    profiler = cProfile.Profile() if args.profile is not None else None
+    if profiler is not None:
+        profiler.enable()
+
+    builder = _builder_fingerprint()
+    with _span(spans, "fingerprint sources", "setup"):
+        signatures = _pack_signatures(builder, options)
+
+    selected = list(PACK_COLLECTIONS)
+    reuse: dict[str, list[dict]] = {}
+    if args.incremental and not args.watch:
+        _build_db_path = BUILD_DB
+        manifest = _read_build_manifest()
+        stale = set(_stale_packs(manifest, signatures))
+        if args.leveldb:
+            stale.update(_stale_leveldb(manifest))
+        selected = [filename for filename in PACK_COLLECTIONS if filename in stale]
+        # Upstream collections the build database records as current are read back from their packs.
+        upstream = set(_collection_order(PACK_COLLECTIONS[filename] for filename in selected))
+        with _span(spans, "load fresh collections", "setup"):
+            reuse = build_db.fresh_collections(
+                build_db.connect(_build_db_path),
+                {
+                    collection: (signatures[filename], _sha256_file(PACKS / filename))
+                    for filename, collection in PACK_COLLECTIONS.items()
+                    if filename not in stale and collection in upstream
+                },
+                lambda collection: _read_jsonl(PACKS / COLLECTION_PACKS[collection])
+            )
+
+    document_types = _pack_document_types() if args.leveldb else None
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        collections, results = build_and_write_packs(
+            selected,
+            executor,
+            icons,
+            args.list_icon_size,
+            document_types,
+            reuse=reuse,
+            spans=spans,
+            signatures=signatures
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if not args.leveldb:
+        _remove_leveldb_dirs(_read_build_manifest())
+    _finish_build(selected, results, collections, signatures, spans=spans, leveldb=args.leveldb)
+
+    if profiler is not None:
+        profiler.disable()
+        args.profile.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(args.profile)
+        print(f"wrote profile {args.profile}")
+    if spans is not None:
+        _print_timings(spans)
+        if args.trace is not None:
+            _write_trace(args.trace, spans, origin)
+            print(f"wrote trace {args.trace}")
+
+    if args.watch:
+        try:
+            watch_sources(collections, builder, options, icons, args.list_icon_size, document_types)
+        except KeyboardInterrupt:
+            print("stopped watching")
 
 
 if __name__ == "__main__":
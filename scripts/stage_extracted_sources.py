@@ -2,10 +2,14 @@
 import argparse
 import copy
 import json
+import os
 import re
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
+import item_schema
+from item_schema import extract_source_page
+
+ROOT = Path(os.environ.get("LAUNDRY_RPG_ROOT") or Path(__file__).resolve().parents[1]).resolve()
 PIPELINE_ROOT = ROOT / "sources" / "extraction"
 RAW_DIR = PIPELINE_ROOT / "raw"
 NORMALIZED_DIR = PIPELINE_ROOT / "normalized"
@@ -17,7 +21,16 @@ TARGET_FILES = (
     "servant-npcs.json",
     "servant-tables.json",
 )
-SOURCE_PAGE_PATTERN = re.compile(r"\bp\.?\s*(\d+(?:\s*-\s*\d+)?)\b", re.IGNORECASE)
+
+# Staged gear keeps requisition DNs above 6 and marks uncited pages, unlike the pack build.
+_normalize_gear_system = item_schema.compile_normalizer((
+    item_schema.record("requisition", item_schema.replace(
+        item_schema.REQUISITION_FIELDS,
+        item_schema.integer("dn", 4, minimum=2),
+        item_schema.source_page("sourcePage", "source", fallback="p.unknown"),
+    )),
+    *item_schema.select(item_schema.ITEM_SCHEMAS["gear"], "quantity", "weight", "description"),
+), "normalize_staged_gear")
 
 
 def _read_json(path: Path):
@@ -32,13 +45,6 @@ def _write_json(path: Path, payload) -> None:
         handle.write("\n")
 
 
-def _extract_source_page(source: str, fallback: str = "") -> str:
-    match = SOURCE_PAGE_PATTERN.search(str(source or ""))
-    if match:
-        return f"p.{match.group(1).replace(' ', '')}"
-    return str(fallback or "").strip()
-
-
 def _clean_tags(values, defaults=None):
     source = values if isinstance(values, list) else []
     default_values = defaults if isinstance(defaults, list) else []
@@ -144,18 +150,9 @@ def _normalize_gear(entries):
         category = str(system.get("category") or "Field Gear").strip()
         system["category"] = category
 
-        req = system.get("requisition") if isinstance(system.get("requisition"), dict) else {}
-        system["requisition"] = req
-        req["id"] = str(req.get("id") or "").strip()
-        req["dn"] = max(2, int(req.get("dn", 4) or 4))
-        req["complexity"] = max(1, int(req.get("complexity", 1) or 1))
-        req["requirements"] = str(req.get("requirements") or "").strip()
-        req["source"] = str(req.get("source") or "").strip()
-        req["sourcePage"] = str(req.get("sourcePage") or "").strip() or _extract_source_page(req["source"], fallback="p.unknown")
-
-        system["quantity"] = max(0, int(system.get("quantity", 1) or 1))
-        system["weight"] = max(0, int(system.get("weight", 0) or 0))
-        system["description"] = str(system.get("description") or "").strip()
+        system = _normalize_gear_system(system)
+        row["system"] = system
+        req = system["requisition"]
         system["tags"] = _clean_tags(system.get("tags"), defaults=[
             "gear",
             "requisition",
@@ -188,7 +185,7 @@ def _normalize_enemies(entries):
         row["id"] = str(row.get("id") or "").strip().lower() or name.lower().replace(" ", "-")
         row["category"] = str(row.get("category") or "Bestiary").strip()
         row["source"] = str(row.get("source") or "").strip()
-        row["sourcePage"] = str(row.get("sourcePage") or "").strip() or _extract_source_page(
+        row["sourcePage"] = str(row.get("sourcePage") or "").strip() or extract_source_page(
             row["source"],
             fallback="system-preset"
         )
@@ -257,7 +254,7 @@ def _normalize_servant_npcs(entries):
         row["role"] = str(row.get("role") or "npc").strip().lower()
         row["category"] = str(row.get("category") or "Servant Cases").strip()
         row["source"] = str(row.get("source") or "A Man of the People (2E)").strip()
-        row["sourcePage"] = str(row.get("sourcePage") or "").strip() or _extract_source_page(
+        row["sourcePage"] = str(row.get("sourcePage") or "").strip() or extract_source_page(
             row["source"],
             fallback="p.4-26"
         )
@@ -309,7 +306,7 @@ def _normalize_servant_tables(entries):
         row["id"] = str(row.get("id") or "").strip() or _slugify(name)
         row["description"] = str(row.get("description") or "").strip()
         row["source"] = str(row.get("source") or "A Man of the People (2E)").strip()
-        row["sourcePage"] = str(row.get("sourcePage") or "").strip() or _extract_source_page(
+        row["sourcePage"] = str(row.get("sourcePage") or "").strip() or extract_source_page(
             row["source"],
             fallback="p.4-26"
         )
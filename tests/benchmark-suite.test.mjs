@@ -0,0 +1,53 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+// The rebuild-only run needs python3 with the pack builders importable (no Pillow/NumPy).
+function hasBenchmarkStack() {
+    const probe = spawnSync("python3", [
+        "-c",
+        "import sys; sys.path[:0] = ['scripts', 'benchmarks']; import scale_corpus, rebuild_packs_from_json"
+    ], { cwd: ROOT });
+    return probe.status === 0;
+}
+
+function runSuite(args) {
+    return spawnSync("python3", [
+        "benchmarks/run_suite.py",
+        "--scales", "1",
+        "--warmup", "0",
+        "--repeat", "2",
+        "--only", "rebuild.build_talents",
+        ...args
+    ], { cwd: ROOT, encoding: "utf8" });
+}
+
+test("benchmark suite writes results and fails on a baseline regression", { skip: !hasBenchmarkStack() && "python3 pack builders not importable" }, () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-bench-test-"));
+    const results = path.join(scratch, "results.json");
+    const baseline = path.join(scratch, "baseline.json");
+    try {
+        const saved = runSuite(["--output", results, "--baseline", baseline, "--save-baseline"]);
+        assert.equal(saved.status, 0, saved.stdout + saved.stderr);
+        const payload = JSON.parse(fs.readFileSync(results, "utf8"));
+        assert.deepEqual(Object.keys(payload.results), ["rebuild.build_talents@1x"]);
+        const stats = payload.results["rebuild.build_talents@1x"];
+        assert.equal(stats.runs, 2);
+        assert.ok(stats.min <= stats.median && stats.median <= stats.max);
+
+        const recorded = JSON.parse(fs.readFileSync(baseline, "utf8"));
+        recorded.results["rebuild.build_talents@1x"].median = stats.median / 100;
+        fs.writeFileSync(baseline, JSON.stringify(recorded));
+        const compared = runSuite(["--output", results, "--baseline", baseline, "--noise-floor", "0"]);
+        assert.equal(compared.status, 1, compared.stdout + compared.stderr);
+        assert.match(compared.stdout, /rebuild\.build_talents@1x: .*REGRESSION/);
+        assert.match(compared.stderr, /1 case\(s\) regressed/);
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
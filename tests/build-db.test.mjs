@@ -0,0 +1,118 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+const SKIP_ENTRIES = new Set([".git", ".cache", "icons", "node_modules"]);
+
+// These builds edit sources and the build database, so they run on a scratch copy of the tree.
+function copyTree() {
+    const root = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-build-db-"));
+    for (const entry of fs.readdirSync(ROOT)) {
+        if (!SKIP_ENTRIES.has(entry)) fs.cpSync(path.join(ROOT, entry), path.join(root, entry), { recursive: true });
+    }
+    return root;
+}
+
+function rebuild(root, args = []) {
+    return spawnSync("python3", ["scripts/rebuild_packs_from_json.py", ...args], { cwd: root, encoding: "utf8" });
+}
+
+function query(root, sql) {
+    const run = spawnSync("python3", [
+        "-c",
+        "import json, sqlite3, sys; print(json.dumps(sqlite3.connect(sys.argv[1]).execute(sys.argv[2]).fetchall()))",
+        path.join(root, ".cache", "packs", "build.sqlite"),
+        sql
+    ], { encoding: "utf8" });
+    assert.equal(run.status, 0, run.stderr);
+    return JSON.parse(run.stdout);
+}
+
+function packLines(root, filename) {
+    return fs.readFileSync(path.join(root, "packs", filename), "utf8").split("\n").filter(Boolean);
+}
+
+test("build database indexes every built collection and feeds incremental rebuilds", () => {
+    const root = copyTree();
+    try {
+        // The copy has no build manifest, so the first incremental build builds every pack.
+        const full = rebuild(root, ["--incremental"]);
+        assert.equal(full.status, 0, full.stdout + full.stderr);
+
+        const counts = Object.fromEntries(query(root, "SELECT collection, COUNT(*) FROM documents GROUP BY collection"));
+        assert.equal(counts.weapons, packLines(root, "weapons.db").length);
+        assert.equal(counts.talents, packLines(root, "talents.db").length);
+        assert.equal(counts["all-items"], undefined);
+        const [firstWeapon] = packLines(root, "weapons.db").map((line) => JSON.parse(line));
+        assert.deepEqual(
+            query(root, `SELECT collection, type FROM documents WHERE id = '${firstWeapon._id}'`),
+            [["weapons", "weapon"]]
+        );
+        const indexes = query(root, "SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_%'").flat();
+        for (const name of ["documents_type", "documents_name", "documents_id", "documents_category", "tags_key"]) {
+            assert.ok(indexes.includes(name), `missing index ${name}`);
+        }
+
+        const source = path.join(root, "weapons.json");
+        const weapons = JSON.parse(fs.readFileSync(source, "utf8"));
+        weapons[0].name = `${weapons[0].name} (Indexed)`;
+        fs.writeFileSync(source, `${JSON.stringify(weapons, null, 2)}\n`);
+        const incremental = rebuild(root, ["--incremental", "--timings"]);
+        assert.equal(incremental.status, 0, incremental.stdout + incremental.stderr);
+        // Gear depends on assignments, which are current, so they are read back, not rebuilt.
+        assert.match(incremental.stdout, /^ {2}build weapons /m);
+        assert.match(incremental.stdout, /^ {2}build gear /m);
+        assert.doesNotMatch(incremental.stdout, /^ {2}build (assignments|talents|armour) /m);
+        assert.deepEqual(
+            query(root, "SELECT name FROM documents WHERE collection = 'weapons' ORDER BY position"),
+            packLines(root, "weapons.db").map((line) => [JSON.parse(line).name])
+        );
+
+        const incrementalPacks = Object.fromEntries(["gear.db", "all-items.db"].map((name) => [name, packLines(root, name)]));
+        assert.equal(rebuild(root).status, 0);
+        for (const [name, lines] of Object.entries(incrementalPacks)) {
+            assert.deepEqual(packLines(root, name), lines, `${name} differs from a full rebuild`);
+        }
+    } finally {
+        fs.rmSync(root, { recursive: true, force: true });
+    }
+});
+
+test("assignment validation reports talents missing from the talent sources", () => {
+    const root = copyTree();
+    try {
+        const source = path.join(root, "assignments.json");
+        const assignments = JSON.parse(fs.readFileSync(source, "utf8"));
+        assignments[0].system.talents = [assignments[0].system.talents, "Nonexistent Talent"].filter(Boolean).join(", ");
+        fs.writeFileSync(source, `${JSON.stringify(assignments, null, 2)}\n`);
+        const run = rebuild(root);
+        assert.notEqual(run.status, 0);
+        assert.match(run.stderr, /unknown talents: Nonexistent Talent/);
+        // Without --incremental the validation queries an in-memory database.
+        assert.ok(!fs.existsSync(path.join(root, ".cache", "packs", "build.sqlite")), "a plain build wrote the build database");
+    } finally {
+        fs.rmSync(root, { recursive: true, force: true });
+    }
+});
+
+test("talent names match exactly and issued gear takes the existing collections as a list", () => {
+    const run = spawnSync("python3", ["-c", [
+        "import json, sys",
+        "sys.path[:0] = ['scripts']",
+        "import build_db",
+        "import rebuild_packs_from_json as rebuild",
+        "conn = build_db.connect(None)",
+        "build_db.store_collection(conn, 'talents', [{'name': 'Acute Sense '}, {'name': 'Bookworm'}])",
+        "assignment = {'name': 'Agent', 'system': {'equipment': 'Pistol, Warrant Card'}}",
+        "print(json.dumps({",
+        "    'missing': sorted(build_db.missing_names(conn, 'talents', ['Acute Sense', 'Bookworm', 'bookworm'])),",
+        "    'issued': [doc['name'] for doc in rebuild.build_assignment_issued_gear([assignment], [[{'name': ' pistol'}], []])],",
+        "}))"
+    ].join("\n")], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stderr);
+    assert.deepEqual(JSON.parse(run.stdout), { missing: ["Acute Sense", "bookworm"], issued: ["Warrant Card"] });
+});
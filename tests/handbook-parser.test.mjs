@@ -0,0 +1,30 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+test("single-pass handbook parser matches the per-extractor scans on concatenated books", () => {
+    const run = spawnSync("python3", ["benchmarks/bench_handbook.py", "--books", "1,3", "--rounds", "1"], {
+        cwd: ROOT,
+        encoding: "utf8"
+    });
+    assert.equal(run.status, 0, run.stdout + run.stderr);
+    assert.match(run.stdout, /^1 book\(s\), [\d,]+ lines: talents=\d+ assignments=27 spells=21 weapons=10 armour=5 gear=25$/m);
+    assert.match(run.stdout, /^3 book\(s\), [\d,]+ lines: .*assignments=81 .*gear=75$/m);
+});
+
+test("spells take the school of the group heading above them", () => {
+    const script = [
+        "import json, sys",
+        "sys.path[:0] = ['benchmarks', 'scripts']",
+        "import bench_handbook, build_compendiums",
+        "spells = build_compendiums.parse_handbook(bench_handbook.handbook_lines(2))['spells']",
+        "print(json.dumps([spell['system']['school'] for spell in spells]))"
+    ].join("\n");
+    const run = spawnSync("python3", ["-c", script], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stderr);
+    const schools = JSON.parse(run.stdout);
+    assert.equal(schools.length, 21);
+    assert.deepEqual(schools.slice(0, 5), ["Protection", "Protection", "Protection", "Protection", "Control"]);
+});
@@ -0,0 +1,99 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+// Mean absolute per-channel difference allowed between the PIL and NumPy splat rasterizers.
+const MAX_MEAN_ABS_DIFF = 6;
+// Allowed drift of each channel's mean value over the whole icon.
+const MAX_CHANNEL_MEAN_DRIFT = 2;
+
+const COMPARE_SCRIPT = `
+import json, sys
+sys.path.insert(0, "scripts")
+import numpy as np
+import generate_item_icons as icons
+
+samples = [("Glock 17", "weapon", "pistol"), ("Feeder", "enemy", "tentacle"), ("Kevlar Vest", "armour", "vest")]
+out = []
+for name, item_type, motif in samples:
+    pil = np.asarray(icons.build_icon(name, item_type, motif, "pil"), dtype=np.int16)
+    vec = np.asarray(icons.build_icon(name, item_type, motif, "numpy"), dtype=np.int16)
+    out.append({
+        "name": name,
+        "meanAbsDiff": float(np.abs(pil - vec).mean()),
+        "channelDrift": float(np.abs(pil.mean(axis=(0, 1)) - vec.mean(axis=(0, 1))).max()),
+    })
+print(json.dumps(out))
+`;
+
+function hasImagingStack() {
+    const probe = spawnSync("python3", ["-c", "import PIL, numpy"], { cwd: ROOT });
+    return probe.status === 0;
+}
+
+test("numpy rasterizer stays within visual tolerance of the PIL path", { skip: !hasImagingStack() && "Pillow/NumPy not installed" }, () => {
+    const run = spawnSync("python3", ["-c", COMPARE_SCRIPT], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stdout + run.stderr);
+    for (const sample of JSON.parse(run.stdout)) {
+        assert.ok(sample.meanAbsDiff < MAX_MEAN_ABS_DIFF, `${sample.name}: mean abs diff ${sample.meanAbsDiff}`);
+        assert.ok(sample.channelDrift < MAX_CHANNEL_MEAN_DRIFT, `${sample.name}: channel drift ${sample.channelDrift}`);
+    }
+});
+
+const ENCODE_SCRIPT = `
+import json, sys
+sys.path.insert(0, "scripts")
+import generate_item_icons as icons
+
+image = icons.build_icon("Glock 17", "weapon", "pistol")
+reference = icons._luma_array(image)
+fixed = icons._encode_icon(image)
+floored = icons._encode_icon(image, (None, 0.97))
+budget = len(fixed) * 3 // 4
+capped = icons._encode_icon(image, (budget, None))
+print(json.dumps({
+    "fixed": len(fixed),
+    "floored": len(floored),
+    "flooredSsim": icons._ssim(reference, floored),
+    "budget": budget,
+    "capped": len(capped),
+}))
+`;
+
+test("tuned icon encoding honours the SSIM floor and byte budget", { skip: !hasImagingStack() && "Pillow/NumPy not installed" }, () => {
+    const run = spawnSync("python3", ["-c", ENCODE_SCRIPT], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stdout + run.stderr);
+    const result = JSON.parse(run.stdout);
+    assert.ok(result.flooredSsim >= 0.97, `SSIM ${result.flooredSsim}`);
+    assert.ok(result.floored <= result.fixed, `${result.floored} > ${result.fixed}`);
+    assert.ok(result.capped <= result.budget, `${result.capped} > ${result.budget}`);
+});
+
+const FINGERPRINT_SCRIPT = `
+import importlib.util, json, os, sys, tempfile
+sys.path.insert(0, "scripts")
+
+def load(name, source):
+    path = os.path.join(tempfile.mkdtemp(), f"{name}.py")
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(source)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+with open("scripts/generate_item_icons.py", encoding="utf-8") as handle:
+    source = handle.read()
+base = load("icons_base", source)
+edited = load("icons_edited", source.replace("vd.ellipse((margin, margin, size - margin, size - margin), fill=130)",
+                                             "vd.ellipse((margin, margin, size - margin, size - margin), fill=131)"))
+print(json.dumps(base._code_fingerprint(base._render_icon_payload) != edited._code_fingerprint(edited._render_icon_payload)))
+`;
+
+test("render cache fingerprint covers memoized layer helpers", { skip: !hasImagingStack() && "Pillow/NumPy not installed" }, () => {
+    const run = spawnSync("python3", ["-c", FINGERPRINT_SCRIPT], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stdout + run.stderr);
+    assert.equal(JSON.parse(run.stdout), true);
+});
@@ -0,0 +1,27 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+const CHECK_SCRIPT = `
+import json, sys
+sys.path.insert(0, "scripts")
+import item_schema
+
+with open("template.json", encoding="utf-8") as handle:
+    template = json.load(handle)
+print(json.dumps({
+    "mismatches": item_schema.schema_mismatches(template),
+    "types": sorted(item_schema.template_fields(template)),
+    "schemas": sorted(item_schema.ITEM_SCHEMAS),
+}))
+`;
+
+test("item schemas cover every template.json item field with a matching kind", () => {
+    const run = spawnSync("python3", ["-c", CHECK_SCRIPT], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stdout + run.stderr);
+    const result = JSON.parse(run.stdout);
+    assert.deepEqual(result.schemas, result.types);
+    assert.deepEqual(result.mismatches, []);
+});
@@ -0,0 +1,190 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+const PACKS_DIR = path.join(ROOT, "packs");
+const BLOCK_SIZE = 32768;
+const HEADER_SIZE = 7;
+
+const COLLECTION_BY_TYPE = {
+    Actor: "actors",
+    Item: "items",
+    JournalEntry: "journal",
+    Macro: "macros",
+    RollTable: "tables"
+};
+const EMBEDDED_BY_TYPE = {
+    Actor: { items: "Item", effects: "ActiveEffect" },
+    Item: { effects: "ActiveEffect" },
+    JournalEntry: { pages: "JournalEntryPage" },
+    RollTable: { results: "TableResult" }
+};
+
+const CRC32C_TABLE = Array.from({ length: 256 }, (_, index) => {
+    let crc = index;
+    for (let bit = 0; bit < 8; bit += 1) {
+        crc = crc & 1 ? (crc >>> 1) ^ 0x82f63b78 : crc >>> 1;
+    }
+    return crc >>> 0;
+});
+
+function maskedCrc32c(payload) {
+    let crc = 0xffffffff;
+    for (const byte of payload) {
+        crc = (CRC32C_TABLE[(crc ^ byte) & 0xff] ^ (crc >>> 8)) >>> 0;
+    }
+    crc = (crc ^ 0xffffffff) >>> 0;
+    return ((((crc >>> 15) | (crc << 17)) >>> 0) + 0xa282ead8) >>> 0;
+}
+
+function readLogRecords(buffer) {
+    const records = [];
+    let pending = [];
+    let offset = 0;
+    while (offset < buffer.length) {
+        const leftover = BLOCK_SIZE - (offset % BLOCK_SIZE);
+        if (leftover < HEADER_SIZE) {
+            offset += leftover;
+            continue;
+        }
+        const checksum = buffer.readUInt32LE(offset);
+        const length = buffer.readUInt16LE(offset + 4);
+        const type = buffer[offset + 6];
+        const fragment = buffer.subarray(offset + HEADER_SIZE, offset + HEADER_SIZE + length);
+        assert.equal(maskedCrc32c(Buffer.concat([Buffer.from([type]), fragment])), checksum, `bad crc at ${offset}`);
+        pending.push(fragment);
+        if (type === 1 || type === 4) {
+            records.push(Buffer.concat(pending));
+            pending = [];
+        }
+        offset += HEADER_SIZE + length;
+    }
+    assert.equal(pending.length, 0, "log ends mid-record");
+    return records;
+}
+
+function readVarint(buffer, offset) {
+    let value = 0;
+    let shift = 0;
+    for (;;) {
+        const byte = buffer[offset];
+        offset += 1;
+        value += (byte & 0x7f) * 2 ** shift;
+        if (!(byte & 0x80)) return [value, offset];
+        shift += 7;
+    }
+}
+
+function readLevelDb(directory) {
+    const current = fs.readFileSync(path.join(directory, "CURRENT"), "ascii").trim();
+    assert.ok(fs.existsSync(path.join(directory, current)), `${current} missing`);
+    const store = new Map();
+    const logs = fs.readdirSync(directory).filter((name) => name.endsWith(".log")).sort();
+    for (const log of logs) {
+        for (const batch of readLogRecords(fs.readFileSync(path.join(directory, log)))) {
+            const count = batch.readUInt32LE(8);
+            let offset = 12;
+            for (let index = 0; index < count; index += 1) {
+                assert.equal(batch[offset], 1, "only value records are expected");
+                let keyLength;
+                let valueLength;
+                [keyLength, offset] = readVarint(batch, offset + 1);
+                const key = batch.subarray(offset, offset + keyLength).toString("utf8");
+                [valueLength, offset] = readVarint(batch, offset + keyLength);
+                store.set(key, JSON.parse(batch.subarray(offset, offset + valueLength).toString("utf8")));
+                offset += valueLength;
+            }
+        }
+    }
+    return store;
+}
+
+function inflate(store, documentType, sublevel, key) {
+    const doc = { ...store.get(`!${sublevel}!${key}`) };
+    store.delete(`!${sublevel}!${key}`);
+    for (const [field, embeddedType] of Object.entries(EMBEDDED_BY_TYPE[documentType] ?? {})) {
+        if (!Array.isArray(doc[field])) continue;
+        doc[field] = doc[field].map((id) => inflate(store, embeddedType, `${sublevel}.${field}`, `${key}.${id}`));
+    }
+    return doc;
+}
+
+test("LevelDB pack output round-trips to the JSONL pack documents", () => {
+    const run = spawnSync("python3", ["scripts/rebuild_packs_from_json.py", "--leveldb"], {
+        cwd: ROOT,
+        encoding: "utf8"
+    });
+    const system = JSON.parse(fs.readFileSync(path.join(ROOT, "system.json"), "utf8"));
+    try {
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        for (const pack of system.packs) {
+            const name = path.basename(pack.path, ".db");
+            const docs = fs.readFileSync(path.join(PACKS_DIR, `${name}.db`), "utf8")
+                .split("\n")
+                .filter(Boolean)
+                .map((line) => JSON.parse(line));
+            const store = readLevelDb(path.join(PACKS_DIR, name));
+            const sublevel = COLLECTION_BY_TYPE[pack.type];
+            const restored = docs.map((doc) => inflate(store, pack.type, sublevel, doc._id));
+            assert.deepEqual(restored, docs, name);
+            assert.deepEqual([...store.keys()], [], `${name}: unexpected extra keys`);
+        }
+    } finally {
+        for (const pack of system.packs) {
+            fs.rmSync(path.join(PACKS_DIR, path.basename(pack.path, ".db")), { recursive: true, force: true });
+        }
+    }
+});
+
+test("LevelDB directories stay in step with the JSONL packs across incremental and plain builds", () => {
+    const root = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-leveldb-"));
+    const rebuild = (args) => spawnSync("python3", ["scripts/rebuild_packs_from_json.py", ...args], { cwd: root, encoding: "utf8" });
+    try {
+        for (const entry of fs.readdirSync(ROOT)) {
+            if (![".git", ".cache", "icons", "node_modules"].includes(entry)) {
+                fs.cpSync(path.join(ROOT, entry), path.join(root, entry), { recursive: true });
+            }
+        }
+        const weaponsDir = path.join(root, "packs", "weapons");
+
+        let run = rebuild(["--leveldb"]);
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.ok(fs.existsSync(path.join(weaponsDir, "CURRENT")));
+
+        run = rebuild(["--incremental", "--leveldb"]);
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.match(run.stdout, /skipped weapons\.db: up to date/);
+
+        // A hand-edited (or Foundry-compacted) directory no longer matches the recorded hash.
+        fs.appendFileSync(path.join(weaponsDir, "CURRENT"), "\n");
+        run = rebuild(["--incremental", "--leveldb"]);
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.match(run.stdout, /wrote packs\/weapons\/: \d+ keys/);
+        assert.match(run.stdout, /skipped armour\.db: up to date/);
+
+        // A build without --leveldb drops the directories it wrote so Foundry falls back to the fresh .db files.
+        run = rebuild(["--incremental"]);
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.match(run.stdout, /removed packs\/weapons\/: build ran without --leveldb/);
+        assert.equal(fs.existsSync(weaponsDir), false);
+
+        run = rebuild(["--incremental", "--leveldb"]);
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.match(run.stdout, /wrote packs\/weapons\/: \d+ keys/);
+        assert.ok(fs.existsSync(path.join(weaponsDir, "CURRENT")));
+
+        // A directory changed since the build recorded it may hold local edits, so it is only reported.
+        fs.appendFileSync(path.join(weaponsDir, "CURRENT"), "\n");
+        run = rebuild([]);
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.match(run.stderr, /warning: left packs\/weapons\/ in place/);
+        assert.ok(fs.existsSync(path.join(weaponsDir, "CURRENT")));
+        assert.match(run.stdout, /removed packs\/armour\/: build ran without --leveldb/);
+    } finally {
+        fs.rmSync(root, { recursive: true, force: true });
+    }
+});
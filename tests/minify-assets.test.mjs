@@ -0,0 +1,96 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+function python(script, args = []) {
+    const run = spawnSync("python3", ["-c", script, ...args], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stdout + run.stderr);
+    return JSON.parse(run.stdout.trim().split("\n").at(-1));
+}
+
+test("minifiers drop comments and whitespace but keep strings, mustaches, attribute values and textareas", () => {
+    const result = python([
+        "import json, sys",
+        "sys.path.insert(0, 'scripts')",
+        "import minify_assets as minify",
+        "css = '/* header */\\n.a  >  .b ,\\n.c :hover {\\n  content: \"a  /* b */\";\\n  width: calc(1px + 2px);\\n}\\n@media screen and (max-width: 600px) { .d { color: red; } }\\n'",
+        "html = '<div class=\"sheet\">\\n  <!-- note -->\\n  {{!-- hidden {{x}} --}}\\n  <span>{{localize \"A  B\"}}</span>   <b>x</b>\\n  <textarea>\\n  keep  me\\n</textarea>\\n</div>\\n'",
+        "pack = '{\"_id\": \"a\", \"name\": \"Caf\\u00e9\"}\\n\\n{\"_id\": \"b\"}\\n'",
+        "bad = []",
+        "for text in ('{\"_id\": 1}\\n[1]\\n', '{\"_id\": 1}\\n{oops\\n'):",
+        "    try:",
+        "        minify.compact_pack_lines(text, 'packs/x.db')",
+        "    except ValueError as err:",
+        "        bad.append(str(err))",
+        "print(json.dumps({",
+        "    'css': minify.minify_css(css),",
+        "    'html': minify.minify_html(html),",
+        "    'comments': [minify.minify_css(text) for text in ('div/**/.x', 'div /**/.x', 'a{border:1px/**/solid red}')],",
+        "    'attributes': minify.minify_html('<a title=\"A   b\"  data-x=\\'c  d\\' class=\"{{x \\\"p  q\\\"}}  y\">t   u</a>'),",
+        "    'json': minify.minify('lang/en.json', b'{\\n  \"A\": \"x y\"\\n}\\n').decode(),",
+        "    'pack': minify.minify('packs/x.db', pack.encode()).decode(),",
+        "    'skipped': [minify.minify(name, b'{ }') for name in ('system.json', 'module/a.js', 'packs/x/000003.log')],",
+        "    'bad': bad,",
+        "}))"
+    ].join("\n"));
+
+    assert.equal(
+        result.css,
+        ".a>.b,.c :hover{content: \"a  /* b */\";width: calc(1px + 2px)}@media screen and (max-width: 600px){.d{color: red}}"
+    );
+    assert.equal(
+        result.html,
+        "<div class=\"sheet\">\n<span>{{localize \"A  B\"}}</span> <b>x</b>\n<textarea>\n  keep  me\n</textarea>\n</div>\n"
+    );
+    assert.deepEqual(result.comments, ["div.x", "div .x", "a{border:1px solid red}"]);
+    assert.equal(result.attributes, "<a title=\"A   b\" data-x='c  d' class=\"{{x \"p  q\"}}  y\">t u</a>\n");
+    assert.equal(result.json, "{\"A\":\"x y\"}\n");
+    assert.equal(result.pack, "{\"_id\":\"a\",\"name\":\"Café\"}\n{\"_id\":\"b\"}\n");
+    assert.deepEqual(result.skipped, [null, null, null]);
+    assert.deepEqual(result.bad, ["packs/x.db:2: not a JSON object", "packs/x.db:2: not valid JSON (Expecting property name enclosed in double quotes: line 1 column 2 (char 1))"]);
+});
+
+test("minified archive members report their savings and leave the sources untouched", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-minify-"));
+    try {
+        const sources = ["styles/laundry-rpg.css", "templates/actor/actor-sheet.html", "lang/en.json", "packs/talents.db"];
+        const before = Object.fromEntries(sources.map((name) => [name, fs.readFileSync(path.join(ROOT, name))]));
+        const result = python([
+            "import json, os, sys, zipfile",
+            "sys.path.insert(0, 'scripts')",
+            "import build_system_zip as archive",
+            "archive.MEMBER_MANIFEST = os.path.join(sys.argv[1], 'members.json')",
+            "archive.INCLUDE = ['styles', 'templates', 'lang', 'packs', 'module']",
+            "members, report = archive.minify_members(archive.archive_members(), jobs=2)",
+            "archive.write_minify_report(report, os.path.join(sys.argv[1], 'minify.json'))",
+            "out = os.path.join(sys.argv[1], 'system.zip')",
+            "archive.write_archive(out, members=members)",
+            "with zipfile.ZipFile(out) as zf:",
+            "    packs = [line for name in zf.namelist() if name.endswith('.db') for line in zf.read(name).decode().splitlines()]",
+            "    compact = all(json.dumps(json.loads(line), ensure_ascii=False, separators=(',', ':')) == line for line in packs)",
+            "    sizes = {name: zf.getinfo(name).file_size for name in zf.namelist()}",
+            "print(json.dumps({'compact': compact, 'lines': len(packs), 'sizes': sizes}))"
+        ].join("\n"), [scratch]);
+        const report = JSON.parse(fs.readFileSync(path.join(scratch, "minify.json"), "utf8"));
+        const rows = Object.fromEntries(report.files.map((row) => [row.path, row]));
+
+        for (const [name, bytes] of Object.entries(before)) {
+            assert.ok(fs.readFileSync(path.join(ROOT, name)).equals(bytes), `${name} was modified`);
+            assert.equal(rows[name].size, bytes.length);
+            assert.ok(rows[name].minified < rows[name].size, `${name} did not shrink`);
+            assert.equal(result.sizes[name], rows[name].minified);
+        }
+        assert.ok(result.compact);
+        assert.ok(result.lines > 0);
+        assert.equal(rows["packs/search-index.json"].minified, rows["packs/search-index.json"].size);
+        assert.ok(!Object.keys(rows).some((name) => name.startsWith("module/")));
+        assert.equal(report.totals.size - report.totals.minified, report.files.reduce((sum, row) => sum + row.size - row.minified, 0));
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
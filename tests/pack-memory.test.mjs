@@ -0,0 +1,46 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+// all-items only adds list slots on top of the per-type packs it shares documents with;
+// the old deep-copying build needed ~1.45x the per-type peak.
+const MAX_ALL_ITEMS_PEAK_RATIO = 1.15;
+
+const MEASURE_SCRIPT = `
+import gc, json, sys, tracemalloc
+sys.path.insert(0, "scripts")
+import rebuild_packs_from_json as rebuild
+
+ITEM_COLLECTIONS = ["skills", "talents", "assignments", "weapons", "armour", "spells", "gear"]
+
+def build(names):
+    gc.collect()
+    tracemalloc.start()
+    built = {}
+    for name in rebuild._collection_order(names):
+        upstream = {dep: built[dep] for dep in rebuild.COLLECTION_DEPENDENCIES[name][1]}
+        built[name] = rebuild.COLLECTION_BUILDERS[name](upstream)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, peak
+
+_, item_peak = build(ITEM_COLLECTIONS)
+built, all_items_peak = build(["all-items"])
+typed_ids = {id(doc) for name in ITEM_COLLECTIONS for doc in built[name]}
+print(json.dumps({
+    "itemPeak": item_peak,
+    "allItemsPeak": all_items_peak,
+    "shared": all(id(doc) in typed_ids for doc in built["all-items"]),
+}))
+`;
+
+test("all-items shares per-type documents instead of copying them", () => {
+    const run = spawnSync("python3", ["-c", MEASURE_SCRIPT], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stdout + run.stderr);
+    const result = JSON.parse(run.stdout);
+    assert.ok(result.shared, "all-items documents are copies");
+    const ratio = result.allItemsPeak / result.itemPeak;
+    assert.ok(ratio <= MAX_ALL_ITEMS_PEAK_RATIO, `all-items peak ratio ${ratio.toFixed(2)}`);
+});
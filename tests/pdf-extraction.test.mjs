@@ -0,0 +1,150 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+const FIXTURE = path.join(ROOT, "tests", "fixtures", "handbook-sample.pdf");
+const HAS_POPPLER = ["pdftotext", "pdfinfo"].every((tool) => !spawnSync(tool, ["-v"]).error);
+
+const SCRIPT = `
+import json, shutil, sys
+from pathlib import Path
+sys.path.insert(0, 'scripts')
+import build_compendiums as handbook
+
+pdf, cache = Path(sys.argv[1]), Path(sys.argv[2])
+handbook.PAGES_PER_TASK = 1
+first, extracted = handbook.extract_pages(pdf, cache, jobs=2)
+again, cached_extracted = handbook.extract_pages(pdf, cache, jobs=2)
+lines, page_starts = handbook.lines_with_pages(first)
+parsed = handbook.parse_handbook(lines, page_starts)
+
+edited = cache.parent / 'edited.pdf'
+edited.write_bytes(pdf.read_bytes() + b'% edited\\n')
+_, edited_extracted = handbook.extract_pages(edited, cache, jobs=2)
+print(json.dumps({
+    'pages': first,
+    'stitched': handbook.stitch_pages(first),
+    'same': first == again,
+    'extracted': [extracted, cached_extracted, edited_extracted],
+    'cacheDirs': len([p for p in cache.iterdir() if p.is_dir()]),
+    'talents': {name: data['sourcePage'] for name, data in parsed['talents'].items()},
+    'gear': {item['name']: item['sourcePage'] for item in parsed['gear']},
+}))
+`;
+
+test("page-parallel extraction matches pdftotext, caches by content hash and reports source pages", { skip: !HAS_POPPLER && "pdftotext/pdfinfo not installed" }, () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-pdf-"));
+    try {
+        const run = spawnSync("python3", ["-c", SCRIPT, FIXTURE, path.join(scratch, "pages")], { cwd: ROOT, encoding: "utf8" });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        const result = JSON.parse(run.stdout);
+
+        assert.equal(result.pages.length, 3);
+        const whole = spawnSync("pdftotext", ["-layout", FIXTURE, "-"], { encoding: "utf8" });
+        assert.equal(result.stitched, whole.stdout);
+        assert.ok(result.same);
+        assert.deepEqual(result.extracted, [3, 0, 3]);
+        assert.equal(result.cacheDirs, 1);
+
+        assert.equal(result.talents["Acute Sense"], "p.2");
+        assert.equal(result.gear["Banishment Round"], "p.3");
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
+
+test("stitched page lines match the whole-text split and carry page numbers", () => {
+    const script = [
+        "import json, sys",
+        "sys.path.insert(0, 'scripts')",
+        "import build_compendiums as handbook",
+        "pages = ['TALENTS\\n\\nACUTE SENSE\\nREQUIREMENTS: Training (1)\\nSharp.\\n', '\\nBANISHMENT ROUND\\nREQUISITION DN 3:2\\n']",
+        "lines, page_starts = handbook.lines_with_pages(pages)",
+        "parsed = handbook.parse_handbook(lines, page_starts)",
+        "print(json.dumps({'split': lines == handbook.stitch_pages(pages).splitlines(), 'starts': page_starts,",
+        "    'talent': parsed['talents']['Acute Sense']['sourcePage'], 'gear': parsed['gear'][0]['sourcePage'],",
+        "    'plain': 'sourcePage' in handbook.parse_handbook(lines)['gear'][0]}))"
+    ].join("\n");
+    const run = spawnSync("python3", ["-c", script], { cwd: ROOT, encoding: "utf8" });
+    assert.equal(run.status, 0, run.stderr);
+    assert.deepEqual(JSON.parse(run.stdout), { split: true, starts: [0, 6], talent: "p.1", gear: "p.2", plain: false });
+});
+
+// Stand-ins for poppler: the "PDF" is plain text with form-feed page breaks.
+const FAKE_PDFINFO = `import sys
+print(f"Pages: {len(open(sys.argv[1]).read().split(chr(12))[:-1])}")
+`;
+const FAKE_PDFTOTEXT = `import sys
+args = sys.argv[1:]
+first, last = int(args[args.index('-f') + 1]), int(args[args.index('-l') + 1])
+pages = open(args[-2]).read().split(chr(12))[:-1]
+sys.stdout.write(''.join(page + chr(12) for page in pages[first - 1:last]))
+`;
+
+const BUILD_SCRIPT = `
+import json, sys
+from pathlib import Path
+sys.path.insert(0, 'scripts')
+import build_compendiums as handbook
+
+scratch = Path(sys.argv[1])
+pdf = scratch / 'handbook.pdf'
+handbook.PDF_CANDIDATES = [pdf]
+handbook.TXT_PATH = scratch / 'handbook.txt'
+handbook.PAGE_CACHE = scratch / 'pages'
+handbook.PACKS_DIR = scratch / 'packs'
+handbook.PAGES_PER_TASK = 1
+pdf.write_text(''.join(page + chr(12) for page in [
+    'TALENTS\\n\\nACUTE SENSE\\nREQUIREMENTS: Training (1) in Awareness\\nSharp senses.\\n',
+    'WEAPON TABLE\\nPistol    3    1d6    Range (20m)\\n\\n',
+    'SPELLS SUMMARY\\nBANISH    DN 3\\nCOMMON SPELLS\\n\\nBANISH\\nDN: 3:2\\nCasting Time: 1 Action\\n',
+    'OCCULT GEAR\\n\\nBANISHMENT ROUND\\nREQUISITION DN 3:2\\n',
+]))
+handbook.build(jobs=1)
+handbook.build(jobs=1)
+pdf.write_text(pdf.read_text() + 'edited\\n' + chr(12))
+handbook.build(jobs=1)
+
+def pack(name):
+    return [json.loads(line) for line in (handbook.PACKS_DIR / name).read_text().splitlines()]
+
+print(json.dumps({
+    'items': {doc['name']: doc['system'] for name in ('talents.db', 'weapons.db', 'spells.db', 'gear.db') for doc in pack(name)},
+    'cacheDirs': len(list(handbook.PAGE_CACHE.iterdir())),
+    'stitched': handbook.TXT_PATH.read_text().count(chr(12)),
+}))
+`;
+
+test("build carries each item's source page through extraction with stand-in poppler tools", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-pdf-build-"));
+    try {
+        const bin = path.join(scratch, "bin");
+        fs.mkdirSync(bin);
+        for (const [tool, source] of [["pdfinfo", FAKE_PDFINFO], ["pdftotext", FAKE_PDFTOTEXT]]) {
+            fs.writeFileSync(path.join(bin, tool), `#!/usr/bin/env python3\n${source}`, { mode: 0o755 });
+        }
+        const env = { ...process.env, PATH: `${bin}${path.delimiter}${process.env.PATH}` };
+        const run = spawnSync("python3", ["-c", BUILD_SCRIPT, scratch], { cwd: ROOT, encoding: "utf8", env });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.deepEqual(
+            run.stdout.split("\n").filter((line) => line.startsWith("Handbook text:")),
+            ["Handbook text: 4 pages, 4 extracted, 0 cached", "Handbook text: 4 pages, 0 extracted, 4 cached", "Handbook text: 5 pages, 5 extracted, 0 cached"]
+        );
+        const result = JSON.parse(run.stdout.trim().split("\n").at(-1));
+        assert.equal(result.cacheDirs, 1);
+        assert.equal(result.stitched, 5);
+
+        assert.equal(result.items["Acute Sense"].sourcePage, "p.1");
+        assert.equal(result.items.Pistol.sourcePage, "p.2");
+        assert.equal(result.items.BANISH.sourcePage, "p.3");
+        assert.equal(result.items.BANISH.dn, 3);
+        assert.equal(result.items["Banishment Round"].sourcePage, "p.4");
+        assert.deepEqual(result.items["Banishment Round"].requisition, { sourcePage: "p.4" });
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
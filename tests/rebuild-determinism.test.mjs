@@ -34,8 +34,8 @@ function snapshotHashes() {
     return out;
 }
 
-function runRebuild() {
-    const run = spawnSync("python3", ["scripts/rebuild_packs_from_json.py"], {
+function runRebuild(args = []) {
+    const run = spawnSync("python3", ["scripts/rebuild_packs_from_json.py", ...args], {
         cwd: ROOT,
         encoding: "utf8"
     });
@@ -49,3 +49,64 @@ test("rebuild script is deterministic across consecutive runs", () => {
     const second = snapshotHashes();
     assert.deepEqual(second, first);
 });
+
+test("incremental rebuild reproduces full rebuild output", () => {
+    runRebuild();
+    const full = snapshotHashes();
+    fs.rmSync(path.join(PACKS_DIR, "gear.db"));
+    fs.rmSync(path.join(PACKS_DIR, "all-items.db"));
+    runRebuild(["--incremental"]);
+    assert.deepEqual(snapshotHashes(), full);
+    runRebuild(["--incremental"]);
+    assert.deepEqual(snapshotHashes(), full);
+});
+
+test("list icon size points items at manifest thumbnails without touching default output", () => {
+    runRebuild();
+    const full = snapshotHashes();
+    const manifestPath = path.join(ROOT, "icons", "generated", "manifest.json");
+    const previous = fs.existsSync(manifestPath) ? fs.readFileSync(manifestPath) : null;
+    const talent = JSON.parse(fs.readFileSync(path.join(PACKS_DIR, "talents.db"), "utf8").split("\n")[0]);
+    const master = talent.img;
+    const thumb = master.replace(/\/([^/]+)$/, "/64/$1");
+    fs.writeFileSync(manifestPath, JSON.stringify({
+        version: 1,
+        sizes: [64, 512],
+        icons: { [master]: { "64": thumb, "512": master } }
+    }));
+    try {
+        runRebuild(["--list-icon-size", "64"]);
+        const lines = fs.readFileSync(path.join(PACKS_DIR, "talents.db"), "utf8").split("\n");
+        const rebuilt = JSON.parse(lines[0]);
+        assert.equal(rebuilt.img, thumb);
+        assert.deepEqual(rebuilt.flags["laundry-rpg"].icons, { master, "64": thumb, "512": master });
+        const allItems = fs.readFileSync(path.join(PACKS_DIR, "all-items.db"), "utf8");
+        assert.ok(allItems.includes(JSON.stringify(thumb)));
+    } finally {
+        if (previous === null) fs.rmSync(manifestPath);
+        else fs.writeFileSync(manifestPath, previous);
+        runRebuild();
+    }
+    assert.deepEqual(snapshotHashes(), full);
+});
+
+test("rebuild leaves unchanged packs untouched and writes no temp files", () => {
+    runRebuild();
+    const mtimes = Object.fromEntries(PACK_FILES.map((filename) => [
+        filename,
+        fs.statSync(path.join(PACKS_DIR, filename)).mtimeMs
+    ]));
+    runRebuild();
+    for (const filename of PACK_FILES) {
+        assert.equal(fs.statSync(path.join(PACKS_DIR, filename)).mtimeMs, mtimes[filename], filename);
+    }
+    assert.deepEqual(fs.readdirSync(PACKS_DIR).filter((name) => name.endsWith(".tmp")), []);
+});
+
+test("parallel rebuild matches serial output", () => {
+    runRebuild();
+    const serial = snapshotHashes();
+    fs.rmSync(path.join(PACKS_DIR, "all-items.db"));
+    runRebuild(["--jobs", "3"]);
+    assert.deepEqual(snapshotHashes(), serial);
+});
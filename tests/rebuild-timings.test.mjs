@@ -0,0 +1,39 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+test("--trace records a span per builder and pack in Chrome trace format", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-trace-"));
+    const tracePath = path.join(scratch, "trace.json");
+    try {
+        const run = spawnSync("python3", ["scripts/rebuild_packs_from_json.py", "--trace", tracePath], {
+            cwd: ROOT,
+            encoding: "utf8"
+        });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.match(run.stdout, /^ {2}span +wall ms +cpu ms +docs +bytes +peak KiB$/m);
+
+        const { traceEvents } = JSON.parse(fs.readFileSync(tracePath, "utf8"));
+        const system = JSON.parse(fs.readFileSync(path.join(ROOT, "system.json"), "utf8"));
+        const names = new Set(traceEvents.map((event) => event.name));
+        for (const pack of system.packs) {
+            const filename = path.basename(pack.path);
+            assert.ok(names.has(`write ${filename}`), `missing write ${filename}`);
+            const write = traceEvents.find((event) => event.name === `write ${filename}`);
+            assert.equal(write.args.bytes, fs.statSync(path.join(ROOT, "packs", filename)).size);
+        }
+        assert.equal(traceEvents.filter((event) => event.cat === "builder").length, system.packs.length);
+        for (const event of traceEvents) {
+            assert.equal(event.ph, "X");
+            assert.ok(event.ts >= 0 && event.dur >= 0, event.name);
+            assert.ok(event.args.cpuMs >= 0 && event.args.peakBytes >= 0, event.name);
+        }
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
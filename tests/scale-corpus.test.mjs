@@ -0,0 +1,88 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+const SCALE = 2;
+const SCALED_SOURCES = [
+    "talents.json",
+    "gear.json",
+    "spells.json",
+    "enemies.json",
+    "servant-tables.json",
+    "gm.json",
+    "servant.json",
+    "vashnotik.json",
+    "assignments.json"
+];
+
+function run(args, env = {}) {
+    const result = spawnSync("python3", args, { cwd: ROOT, encoding: "utf8", env: { ...process.env, ...env } });
+    assert.equal(result.status, 0, result.stdout + result.stderr);
+    return result.stdout;
+}
+
+function readJson(root, filename) {
+    return JSON.parse(fs.readFileSync(path.join(root, filename), "utf8"));
+}
+
+function median(values) {
+    const sorted = [...values].sort((a, b) => a - b);
+    return sorted[Math.floor(sorted.length / 2)];
+}
+
+test("scale corpus is deterministic, scaled and buildable from a scratch root", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-corpus-"));
+    const first = path.join(scratch, "a");
+    const second = path.join(scratch, "b");
+    try {
+        run(["benchmarks/scale_corpus.py", first, "--scale", String(SCALE)]);
+        run(["benchmarks/scale_corpus.py", second, "--scale", String(SCALE)]);
+
+        for (const filename of SCALED_SOURCES) {
+            const payload = fs.readFileSync(path.join(first, filename), "utf8");
+            assert.equal(fs.readFileSync(path.join(second, filename), "utf8"), payload, `${filename} differs between runs`);
+            const shipped = readJson(ROOT, filename);
+            const generated = JSON.parse(payload);
+            assert.equal(generated.length, shipped.length * SCALE, filename);
+            const names = new Set(generated.map((record) => record.name.toLowerCase()));
+            assert.equal(names.size, generated.length, `${filename}: duplicate names`);
+            const shippedLength = median(shipped.map((record) => JSON.stringify(record).length));
+            const generatedLength = median(generated.map((record) => JSON.stringify(record).length));
+            assert.ok(Math.abs(generatedLength - shippedLength) / shippedLength < 0.3, `${filename}: ${generatedLength} vs ${shippedLength}`);
+        }
+
+        // Assignment validation rejects unknown talents, so a clean build proves the references resolve.
+        const output = run(["scripts/rebuild_packs_from_json.py"], { LAUNDRY_RPG_ROOT: first });
+        const talents = fs.readFileSync(path.join(first, "packs", "talents.db"), "utf8").split("\n").filter(Boolean);
+        assert.equal(talents.length, readJson(ROOT, "talents.json").length * SCALE);
+        assert.match(output, /search-index\.json/);
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
+
+test("scale corpus only replaces directories it generated", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-corpus-guard-"));
+    try {
+        const foreign = path.join(scratch, "foreign");
+        fs.mkdirSync(foreign);
+        fs.writeFileSync(path.join(foreign, "keep.txt"), "precious\n");
+        const refused = spawnSync("python3", ["benchmarks/scale_corpus.py", foreign, "--scale", "1"], { cwd: ROOT, encoding: "utf8" });
+        assert.notEqual(refused.status, 0);
+        assert.match(refused.stderr, /not generated by scale_corpus\.py/);
+        assert.equal(fs.readFileSync(path.join(foreign, "keep.txt"), "utf8"), "precious\n");
+
+        const corpus = path.join(scratch, "corpus");
+        run(["benchmarks/scale_corpus.py", corpus, "--scale", "1"]);
+        fs.writeFileSync(path.join(corpus, "leftover.txt"), "stale\n");
+        run(["benchmarks/scale_corpus.py", corpus, "--scale", "1"]);
+        assert.equal(fs.existsSync(path.join(corpus, "leftover.txt")), false);
+        assert.ok(fs.existsSync(path.join(corpus, "talents.json")));
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
@@ -0,0 +1,74 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import path from "node:path";
+import test from "node:test";
+
+const ROOT = process.cwd();
+const PACKS_DIR = path.join(ROOT, "packs");
+const TOKEN_PATTERN = /[\p{L}\p{N}]+/gu;
+
+function loadIndex() {
+    return JSON.parse(fs.readFileSync(path.join(PACKS_DIR, "search-index.json"), "utf8"));
+}
+
+function tokens(values) {
+    const out = new Set();
+    for (const value of values) {
+        for (const token of String(value ?? "").toLowerCase().match(TOKEN_PATTERN) ?? []) {
+            if (token.length > 1 || /^\d+$/.test(token)) out.add(token);
+        }
+    }
+    return out;
+}
+
+function lookupPrefix(index, query) {
+    const needle = query.toLowerCase();
+    const bucket = index.prefixes[needle.slice(0, index.prefixLength)];
+    if (!bucket) return [];
+    const hits = new Set();
+    for (let termIndex = bucket[0]; termIndex < bucket[1]; termIndex += 1) {
+        if (!index.terms[termIndex].startsWith(needle)) continue;
+        for (const docIndex of index.postings[termIndex]) hits.add(docIndex);
+    }
+    return [...hits].sort((a, b) => a - b).map((docIndex) => index.documents[docIndex]);
+}
+
+test("search index postings cover every document's search terms", () => {
+    const index = loadIndex();
+    assert.equal(index.version, 1);
+    assert.deepEqual([...index.terms].sort(), index.terms);
+    const position = new Map(index.documents.map(([pack, id], docIndex) => [`${pack}/${id}`, docIndex]));
+    const termIndex = new Map(index.terms.map((term, i) => [term, i]));
+
+    // all-items.db repeats the per-type documents, so it is left out of the index.
+    assert.equal(index.documents.some(([pack]) => pack === "all-items"), false);
+    const ids = index.documents.map(([, id]) => id);
+    assert.equal(new Set(ids).size, ids.length, "a document is indexed twice");
+    for (const file of fs.readdirSync(PACKS_DIR).filter((name) => name.endsWith(".db") && name !== "all-items.db")) {
+        const pack = path.basename(file, ".db");
+        for (const line of fs.readFileSync(path.join(PACKS_DIR, file), "utf8").split("\n").filter(Boolean)) {
+            const doc = JSON.parse(line);
+            const terms = doc.flags?.["laundry-rpg"]?.searchTerms;
+            if (!terms?.length) continue;
+            const docIndex = position.get(`${pack}/${doc._id}`);
+            assert.notEqual(docIndex, undefined, `${pack}/${doc._id} missing from index`);
+            for (const token of tokens([doc.name, ...terms])) {
+                assert.ok(index.postings[termIndex.get(token)]?.includes(docIndex), `${pack}/${doc._id}: ${token}`);
+            }
+        }
+    }
+    for (const posting of index.postings) {
+        assert.deepEqual([...posting].sort((a, b) => a - b), posting);
+    }
+});
+
+test("search index prefix buckets answer type-ahead queries", () => {
+    const index = loadIndex();
+    const [pack, id, name] = index.documents.find(([docPack]) => docPack === "talents");
+    const word = name.toLowerCase().match(TOKEN_PATTERN).find((token) => token.length > 3);
+    for (const length of [1, 2, 3, word.length]) {
+        const hits = lookupPrefix(index, word.slice(0, length));
+        assert.ok(hits.some(([hitPack, hitId]) => hitPack === pack && hitId === id), `${word.slice(0, length)} -> ${name}`);
+    }
+    assert.deepEqual(lookupPrefix(index, "zzzzqx"), []);
+});
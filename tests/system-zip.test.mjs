@@ -0,0 +1,264 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+
+// Packages a small scratch tree (one pack, one icon) so sources can be edited between builds.
+const SCRIPT = `
+import json, os, shutil, sys, zipfile
+sys.path.insert(0, 'scripts')
+import build_system_zip as archive
+
+scratch = sys.argv[1]
+for name in ('system.json', 'packs/weapons.db', 'icons/generated/notes.txt'):
+    os.makedirs(os.path.join(scratch, os.path.dirname(name)), exist_ok=True)
+shutil.copyfile('system.json', os.path.join(scratch, 'system.json'))
+shutil.copyfile('packs/weapons.db', os.path.join(scratch, 'packs', 'weapons.db'))
+shutil.copyfile(os.path.join('tests', 'fixtures', 'handbook-sample.pdf'), os.path.join(scratch, 'packs', 'skipped.pdf'))
+with open(os.path.join(scratch, 'icons', 'generated', 'notes.txt'), 'w') as handle:
+    handle.write('icons ' * 200)
+icon = next(os.path.join(root, name) for root, _, files in os.walk('icons') for name in sorted(files) if name.endswith('.webp'))
+shutil.copyfile(icon, os.path.join(scratch, 'icons', 'generated', 'probe.webp'))
+
+archive.ROOT = scratch
+archive.MEMBER_MANIFEST = os.path.join(scratch, '.cache', 'archive', 'members.json')
+out = os.path.join(scratch, 'out')
+
+def read(path):
+    with open(path, 'rb') as handle:
+        return handle.read()
+
+archive.write_archive(os.path.join(out, 'first.zip'))
+archive.write_archive(os.path.join(out, 'second.zip'))
+reproducible = read(os.path.join(out, 'first.zip')) == read(os.path.join(out, 'second.zip'))
+with open(os.path.join(scratch, 'system.json'), 'a') as handle:
+    handle.write('\\n')
+archive.write_archive(os.path.join(out, 'first.zip'), incremental=True)
+archive.write_archive(os.path.join(out, 'full.zip'))
+with zipfile.ZipFile(os.path.join(out, 'full.zip')) as zf:
+    assert zf.testzip() is None
+    members = {info.filename: [info.compress_type, info.date_time[0], info.external_attr >> 16] for info in zf.infolist()}
+    names = zf.namelist()
+print(json.dumps({
+    'identical': read(os.path.join(out, 'first.zip')) == read(os.path.join(out, 'full.zip')),
+    'reproducible': reproducible,
+    'edited': read(os.path.join(out, 'second.zip')) != read(os.path.join(out, 'full.zip')),
+    'names': names,
+    'members': members,
+}))
+`;
+
+test("archives are reproducible, store compressed media and reuse unchanged members incrementally", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-zip-"));
+    try {
+        const run = spawnSync("python3", ["-c", SCRIPT, scratch], { cwd: ROOT, encoding: "utf8" });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        const [first, second, incremental, full] = run.stdout.trim().split("\n").slice(0, 4);
+        const result = JSON.parse(run.stdout.trim().split("\n").at(-1));
+
+        assert.match(first, /4 members \(3 deflated, 1 stored, 0 reused\)/);
+        assert.match(second, /\(3 deflated, 1 stored, 0 reused\)/);
+        assert.match(incremental, /\(1 deflated, 0 stored, 3 reused\)/);
+        assert.match(full, /\(3 deflated, 1 stored, 0 reused\)/);
+        assert.ok(result.identical, "incremental archive differs from a full build");
+        assert.ok(result.reproducible, "identical inputs gave different archives");
+        assert.ok(result.edited, "edited source did not change the archive");
+
+        assert.deepEqual(result.names, ["icons/generated/notes.txt", "icons/generated/probe.webp", "packs/weapons.db", "system.json"]);
+        assert.deepEqual(result.members["icons/generated/probe.webp"], [0, 1980, 0o100644]);
+        assert.deepEqual(result.members["packs/weapons.db"], [8, 1980, 0o100644]);
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
+
+test("parallel member compression writes the same archive as the serial path", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-zip-jobs-"));
+    try {
+        const script = [
+            "import os, sys",
+            "sys.path.insert(0, 'scripts')",
+            "import build_system_zip as archive",
+            "archive.MEMBER_MANIFEST = os.path.join(sys.argv[1], 'members.json')",
+            "archive.INCLUDE = ['system.json', 'module', 'templates', 'lang', 'packs']",
+            "archive.PENDING_PER_JOB = 1",
+            "for jobs in (1, 3):",
+            "    archive.write_archive(os.path.join(sys.argv[1], f'jobs-{jobs}.zip'), jobs=jobs)"
+        ].join("\n");
+        const run = spawnSync("python3", ["-c", script, scratch], { cwd: ROOT, encoding: "utf8" });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        assert.match(run.stdout, /with 3 job\(s\)/);
+        assert.ok(fs.readFileSync(path.join(scratch, "jobs-1.zip")).equals(fs.readFileSync(path.join(scratch, "jobs-3.zip"))));
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
+
+const DELTA_SCRIPT = `
+import json, os, shutil, sys, zipfile
+sys.path.insert(0, 'scripts')
+import build_system_zip as archive
+
+scratch = sys.argv[1]
+tree = os.path.join(scratch, 'tree')
+for name in ('system.json', 'packs/weapons.db', 'packs/armour.db', 'lang/en.json'):
+    os.makedirs(os.path.join(tree, os.path.dirname(name)), exist_ok=True)
+    shutil.copyfile(name, os.path.join(tree, name))
+archive.ROOT = tree
+archive.MEMBER_MANIFEST = os.path.join(scratch, 'members.json')
+v1 = os.path.join(scratch, 'v1.zip')
+archive.write_archive(v1)
+
+with open(os.path.join(tree, 'system.json'), 'a') as handle:
+    handle.write('\\n')
+os.remove(os.path.join(tree, 'packs', 'armour.db'))
+os.makedirs(os.path.join(tree, 'packs', 'new'))
+with open(os.path.join(tree, 'packs', 'new', 'spells.db'), 'w') as handle:
+    handle.write('{}\\n')
+archive.write_archive(os.path.join(scratch, 'v2.zip'))
+manifest = archive.write_delta(os.path.join(scratch, 'delta.zip'), archive.previous_release_files(v1))
+with open(os.path.join(scratch, 'v2-manifest.json'), 'w') as handle:
+    with zipfile.ZipFile(os.path.join(scratch, 'delta.zip')) as delta:
+        handle.write(delta.read(archive.DELTA_MANIFEST).decode('utf-8'))
+        shipped = sorted(delta.namelist())
+again = archive.write_delta(os.path.join(scratch, 'empty.zip'), archive.previous_release_files(os.path.join(scratch, 'v2-manifest.json')))
+print(json.dumps({'manifest': {key: manifest[key] for key in ('added', 'changed', 'deleted')}, 'shipped': shipped,
+                  'again': [len(again[key]) for key in ('added', 'changed', 'deleted')]}))
+`;
+
+function apply(args) {
+    return spawnSync("python3", ["scripts/apply_system_delta.py", ...args], { cwd: ROOT, encoding: "utf8" });
+}
+
+function extract(zipPath, dest) {
+    const run = spawnSync("python3", ["-m", "zipfile", "-e", zipPath, dest], { encoding: "utf8" });
+    assert.equal(run.status, 0, run.stderr);
+}
+
+function snapshot(root) {
+    const out = {};
+    for (const entry of fs.readdirSync(root, { recursive: true })) {
+        const full = path.join(root, entry);
+        if (fs.statSync(full).isFile()) out[entry.split(path.sep).join("/")] = fs.readFileSync(full, "base64");
+    }
+    return out;
+}
+
+test("delta packages rebuild the next release from the previous tree and verify it", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-zip-delta-"));
+    try {
+        const run = spawnSync("python3", ["-c", DELTA_SCRIPT, scratch], { cwd: ROOT, encoding: "utf8" });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        const result = JSON.parse(run.stdout.trim().split("\n").at(-1));
+        assert.deepEqual(result.manifest, { added: ["packs/new/spells.db"], changed: ["system.json"], deleted: ["packs/armour.db"] });
+        assert.deepEqual(result.shipped, ["delta-manifest.json", "packs/new/spells.db", "system.json"]);
+        assert.deepEqual(result.again, [0, 0, 0]);
+
+        const installed = path.join(scratch, "installed");
+        const expected = path.join(scratch, "expected");
+        extract(path.join(scratch, "v1.zip"), installed);
+        extract(path.join(scratch, "v2.zip"), expected);
+        const before = snapshot(installed);
+
+        const tampered = path.join(scratch, "tampered");
+        fs.cpSync(installed, tampered, { recursive: true });
+        fs.appendFileSync(path.join(tampered, "lang", "en.json"), " ");
+        const rejected = apply([tampered, path.join(scratch, "delta.zip")]);
+        assert.notEqual(rejected.status, 0);
+        assert.match(rejected.stderr, /lang\/en\.json: sha256 mismatch/);
+        assert.equal(fs.existsSync(`${tampered}.delta-tmp`), false);
+
+        const copied = apply([installed, path.join(scratch, "delta.zip"), "--out", path.join(scratch, "copy")]);
+        assert.equal(copied.status, 0, copied.stdout + copied.stderr);
+        assert.deepEqual(snapshot(installed), before);
+
+        const updated = apply([installed, path.join(scratch, "delta.zip")]);
+        assert.equal(updated.status, 0, updated.stdout + updated.stderr);
+        assert.match(updated.stdout, /1 added, 1 changed, 1 deleted, 4 files verified/);
+        assert.deepEqual(snapshot(installed), snapshot(expected));
+        assert.deepEqual(snapshot(path.join(scratch, "copy")), snapshot(expected));
+        assert.equal(apply([installed, path.join(scratch, "delta.zip"), "--verify-only"]).status, 0);
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
+
+test("delta updates keep Foundry's LevelDB directories for unchanged packs and skip them when verifying", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-zip-delta-leveldb-"));
+    try {
+        const run = spawnSync("python3", ["-c", DELTA_SCRIPT, scratch], { cwd: ROOT, encoding: "utf8" });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        const installed = path.join(scratch, "installed");
+        extract(path.join(scratch, "v1.zip"), installed);
+        // What Foundry leaves behind after migrating the installed NeDB packs.
+        for (const pack of ["weapons", "armour"]) {
+            fs.mkdirSync(path.join(installed, "packs", pack));
+            fs.writeFileSync(path.join(installed, "packs", pack, "CURRENT"), "MANIFEST-000001\n");
+        }
+
+        const updated = apply([installed, path.join(scratch, "delta.zip")]);
+        assert.equal(updated.status, 0, updated.stdout + updated.stderr);
+        assert.equal(fs.readFileSync(path.join(installed, "packs", "weapons", "CURRENT"), "utf8"), "MANIFEST-000001\n");
+        // armour.db was deleted, so its directory goes with it.
+        assert.equal(fs.existsSync(path.join(installed, "packs", "armour")), false);
+
+        const verified = apply([installed, path.join(scratch, "delta.zip"), "--verify-only"]);
+        assert.equal(verified.status, 0, verified.stdout + verified.stderr);
+        assert.equal(verified.stdout, "");
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
+
+test("sidecars precompress text assets that pay off and report the savings", () => {
+    const scratch = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-zip-sidecars-"));
+    try {
+        const script = [
+            "import gzip, json, os, sys, zipfile",
+            "sys.path.insert(0, 'scripts')",
+            "import build_system_zip as archive",
+            "tree = os.path.join(sys.argv[1], 'tree')",
+            "os.makedirs(os.path.join(tree, 'styles'))",
+            "os.makedirs(os.path.join(tree, 'lang'))",
+            "os.makedirs(os.path.join(tree, 'icons'))",
+            "open(os.path.join(tree, 'styles', 'sheet.css'), 'w').write('.laundry { color: red; }\\n' * 400)",
+            "open(os.path.join(tree, 'lang', 'en.json'), 'w').write('{}\\n')",
+            "open(os.path.join(tree, 'styles', 'noise.txt'), 'wb').write(os.urandom(4096))",
+            "open(os.path.join(tree, 'icons', 'a.webp'), 'wb').write(b'RIFF' * 1000)",
+            "archive.ROOT = tree",
+            "archive.MEMBER_MANIFEST = os.path.join(sys.argv[1], 'members.json')",
+            "members, report = archive.sidecar_members(archive.archive_members(), jobs=2)",
+            "archive.write_sidecar_report(report, os.path.join(sys.argv[1], 'report.json'))",
+            "out = os.path.join(sys.argv[1], 'system.zip')",
+            "archive.write_archive(out, members=members)",
+            "with zipfile.ZipFile(out) as zf:",
+            "    names = zf.namelist()",
+            "    roundtrip = gzip.decompress(zf.read('styles/sheet.css.gz')) == zf.read('styles/sheet.css')",
+            "    stored = zf.getinfo('styles/sheet.css.gz').compress_type == zipfile.ZIP_STORED",
+            "print(json.dumps({'names': names, 'roundtrip': roundtrip, 'stored': stored}))"
+        ].join("\n");
+        const run = spawnSync("python3", ["-c", script, scratch], { cwd: ROOT, encoding: "utf8" });
+        assert.equal(run.status, 0, run.stdout + run.stderr);
+        const result = JSON.parse(run.stdout.trim().split("\n").at(-1));
+        const report = JSON.parse(fs.readFileSync(path.join(scratch, "report.json"), "utf8"));
+
+        const sidecars = report.brotli ? ["styles/sheet.css.br", "styles/sheet.css.gz"] : ["styles/sheet.css.gz"];
+        assert.deepEqual(result.names, ["icons/a.webp", "lang/en.json", "styles/noise.txt", "styles/sheet.css", ...sidecars]);
+        assert.ok(result.roundtrip);
+        assert.ok(result.stored);
+
+        const rows = Object.fromEntries(report.files.map((row) => [row.path, row]));
+        assert.deepEqual(Object.keys(rows).sort(), ["lang/en.json", "styles/noise.txt", "styles/sheet.css"]);
+        assert.equal(rows["lang/en.json"].gzip, null);
+        assert.equal(rows["styles/noise.txt"].gzip, null);
+        assert.ok(rows["styles/sheet.css"].gzip < rows["styles/sheet.css"].size / 10);
+        assert.equal(report.totals.sidecars, sidecars.length);
+        assert.equal(report.totals[".gz"], 3 + 4096 + rows["styles/sheet.css"].gzip);
+    } finally {
+        fs.rmSync(scratch, { recursive: true, force: true });
+    }
+});
@@ -0,0 +1,83 @@
+import assert from "node:assert/strict";
+import fs from "node:fs";
+import os from "node:os";
+import path from "node:path";
+import { spawn } from "node:child_process";
+import test from "node:test";
+
+const ROOT = process.cwd();
+const SKIP_ENTRIES = new Set([".git", "icons", "node_modules"]);
+const WAIT_MS = 30000;
+
+// The watcher edits sources, so it runs on a scratch copy of the tree rather than racing other tests.
+function copyTree() {
+    const root = fs.mkdtempSync(path.join(os.tmpdir(), "laundry-watch-"));
+    for (const entry of fs.readdirSync(ROOT)) {
+        if (!SKIP_ENTRIES.has(entry)) fs.cpSync(path.join(ROOT, entry), path.join(root, entry), { recursive: true });
+    }
+    return root;
+}
+
+function startWatcher(root) {
+    const child = spawn("python3", ["-u", "scripts/rebuild_packs_from_json.py", "--watch"], { cwd: root });
+    let output = "";
+    const waiters = [];
+    const onData = (chunk) => {
+        output += chunk;
+        for (const waiter of [...waiters]) waiter();
+    };
+    child.stdout.setEncoding("utf8").on("data", onData);
+    child.stderr.setEncoding("utf8").on("data", onData);
+    // Resolves with the first complete line matching pattern that appears after `from` in the output.
+    const waitFor = (pattern, from = 0) => new Promise((resolve, reject) => {
+        const timer = setTimeout(() => reject(new Error(`timed out waiting for ${pattern}:\n${output}`)), WAIT_MS);
+        const check = () => {
+            const line = output.slice(from, output.lastIndexOf("\n") + 1).split("\n").find((candidate) => pattern.test(candidate));
+            if (line === undefined) return;
+            clearTimeout(timer);
+            waiters.splice(waiters.indexOf(check), 1);
+            resolve(line);
+        };
+        waiters.push(check);
+        check();
+    });
+    return { child, waitFor, offset: () => output.length };
+}
+
+test("watch mode rewrites only the packs downstream of an edited source", async () => {
+    const root = copyTree();
+    const source = path.join(root, "weapons.json");
+    const readPack = (filename) => fs.readFileSync(path.join(root, "packs", filename), "utf8");
+    const original = fs.readFileSync(source, "utf8");
+    const packsBefore = Object.fromEntries(["weapons.db", "all-items.db", "talents.db"].map((name) => [name, readPack(name)]));
+    const watcher = startWatcher(root);
+    try {
+        await watcher.waitFor(/^watching \d+ source files/);
+
+        const weapons = JSON.parse(original);
+        weapons[0].name = `${weapons[0].name} (Watched)`;
+        let mark = watcher.offset();
+        fs.writeFileSync(source, `${JSON.stringify(weapons, null, 2)}\n`);
+        const rebuilt = await watcher.waitFor(/^rebuilt /, mark);
+        assert.match(rebuilt, /^rebuilt weapons\.db, gear\.db, all-items\.db after editing weapons\.json in \d+ ms$/);
+        assert.ok(readPack("weapons.db").includes("(Watched)"));
+        assert.ok(readPack("all-items.db").includes("(Watched)"));
+
+        // Valid JSON of the wrong shape fails inside the normalizers; the watcher reports it and keeps going.
+        mark = watcher.offset();
+        fs.writeFileSync(source, "[1, 2]\n");
+        const failed = await watcher.waitFor(/^rebuild failed /, mark);
+        assert.match(failed, /^rebuild failed for weapons\.json: \w+Error: /);
+        assert.ok(readPack("weapons.db").includes("(Watched)"));
+
+        mark = watcher.offset();
+        fs.writeFileSync(source, original);
+        await watcher.waitFor(/^rebuilt /, mark);
+        for (const [name, payload] of Object.entries(packsBefore)) {
+            assert.equal(readPack(name), payload, `${name} differs after restoring the source`);
+        }
+    } finally {
+        watcher.child.kill();
+        fs.rmSync(root, { recursive: true, force: true });
+    }
+});